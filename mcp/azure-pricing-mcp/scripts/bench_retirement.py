@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for VM retirement checks.
+
+Compares the per-item regex and linear case-insensitive scan that retirement
+checks used to do with the compiled RetirementTable and memoized series
+extraction, over a synthetic result set of VM price items.
+
+Usage: python scripts/bench_retirement.py [--items 5000] [--repeat 20]
+"""
+
+import argparse
+import re
+import time
+from typing import Any
+
+from azure_pricing_mcp.services.retirement import FALLBACK_RETIREMENT_DATA, RetirementTable, series_from_sku
+
+SERIES = ["D{}s_v3", "D{}_v2", "E{}ds_v4", "F{}s_v2", "D{}as_v5", "L{}s", "G{}", "E{}s_v3", "B{}ms", "M{}ms_v2"]
+SIZES = [1, 2, 4, 8, 16, 32, 48, 64]
+REGIONS = ["eastus", "westus2", "westeurope", "northeurope", "southeastasia", "japaneast"]
+
+
+def make_items(count: int) -> list[dict[str, Any]]:
+    """Build VM price items cycling through sizes, series and regions."""
+    items = []
+    for i in range(count):
+        sku = SERIES[i % len(SERIES)].format(SIZES[i // len(SERIES) % len(SIZES)])
+        items.append(
+            {
+                "armSkuName": f"Standard_{sku}",
+                "skuName": sku.replace("_", " "),
+                "armRegionName": REGIONS[i % len(REGIONS)],
+            }
+        )
+    return items
+
+
+def legacy_series_from_sku(sku_name: str) -> str | None:
+    """Series extraction as it was: prefix loop and an uncompiled regex per call."""
+    if not sku_name:
+        return None
+    normalized = sku_name.strip()
+    for prefix in ["Standard_", "Basic_", "standard_", "basic_"]:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix) :]
+            break
+    normalized = normalized.replace("_", " ")
+    match = re.match(r"^([A-Za-z]+)\d*([a-z]*)\s*v?(\d+)?", normalized, re.IGNORECASE)
+    if match:
+        series_key = f"{match.group(1)}{match.group(2) or ''}"
+        if match.group(3):
+            series_key += f"v{match.group(3)}"
+        return series_key
+    return None
+
+
+def legacy_match(series_key: str, retirement_data: dict[str, Any]) -> Any:
+    """Series matching as it was: a lowered key list and linear scan on every miss."""
+    if series_key in retirement_data:
+        return retirement_data[series_key]
+    match = re.match(r"^([A-Za-z]+)(v\d+)?$", series_key, re.IGNORECASE)
+    if match and match.group(2) and series_key.lower() in [k.lower() for k in retirement_data]:
+        for k, v in retirement_data.items():
+            if k.lower() == series_key.lower():
+                return v
+    return None
+
+
+def legacy_check(items: list[dict[str, Any]], retirement_data: dict[str, Any]) -> int:
+    """Per-item work of the old check, matching every item's series."""
+    found = 0
+    for item in items:
+        series_key = legacy_series_from_sku(item.get("skuName") or item.get("armSkuName") or "")
+        if series_key and legacy_match(series_key, retirement_data):
+            found += 1
+    return found
+
+
+def compiled_check(table: RetirementTable, items: list[dict[str, Any]]) -> int:
+    """Per-item work with the compiled table and memoized series extraction."""
+    found = 0
+    for item in items:
+        series_key = series_from_sku(item.get("skuName") or item.get("armSkuName") or "")
+        if series_key and table.match(series_key):
+            found += 1
+    return found
+
+
+def best_of(repeat: int, run: Any) -> float:
+    """Best wall time of several runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000, help="Items per check (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per variant; the best is reported")
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    # A table larger than the fallback, like the parsed docs, and upper-cased SKUs that miss exact lookups
+    retirement_data = dict(FALLBACK_RETIREMENT_DATA)
+    for i in range(200):
+        retirement_data[f"X{i}sv{i % 7}"] = FALLBACK_RETIREMENT_DATA["Dv2"]
+    for item in items[::3]:
+        item["skuName"] = item["skuName"].upper()
+
+    # Compile the table the way the service does on refresh
+    table = RetirementTable(retirement_data)
+
+    expected = legacy_check(items, retirement_data)
+    assert compiled_check(table, items) == expected
+
+    legacy = best_of(args.repeat, lambda: legacy_check(items, retirement_data))
+    compiled = best_of(args.repeat, lambda: compiled_check(table, items))
+
+    print(f"{args.items} items, {len(retirement_data)} series, {expected} matches")
+    print(f"legacy:   {legacy * 1000:8.2f} ms  ({legacy / args.items * 1e6:.2f} us/item)")
+    print(f"compiled: {compiled * 1000:8.2f} ms  ({compiled / args.items * 1e6:.2f} us/item)")
+    print(f"speedup:  {legacy / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Micro-batching of concurrent price queries into combined OR filters.
+
+Under fan-out load (a region comparison, or several sessions asking for
+different SKUs of one service) many concurrent queries differ in a single
+condition. `QueryBatcher` holds such queries for a short window and sends them
+upstream as one query, for example
+`serviceName eq 'X' and (armRegionName eq 'a' or armRegionName eq 'b')`. It
+then routes the items back to each caller by re-applying that caller's own
+condition locally.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .budget import current_budget, request_budget
+from .cache import normalize_filter_conditions
+from .config import BATCH_MAX_PAGES, BATCH_MAX_QUERIES, BATCH_WINDOW_SECONDS, TOOL_TIMEOUT_SECONDS
+from .filters import Comparison, Contains, FilterEvaluationError, FilterSyntaxError, compile_predicate, parse_filter
+
+logger = logging.getLogger(__name__)
+
+# Fields a batch may vary between its queries, in order of preference when a query filters on several
+BATCH_FIELDS = ("armRegionName", "skuName", "armSkuName", "productName", "meterName", "serviceName")
+
+_PAGING_PARAMS = ("$filter", "$top", "$skip")
+
+# Fetches one page: fetch_page(url=..., params=..., conditions=...)
+FetchPage = Callable[..., Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class _Query:
+    """One distinct query of a batch and the callers waiting for it."""
+
+    condition: str
+    limit: int | None
+    futures: list[asyncio.Future[dict[str, Any] | None]] = field(default_factory=list)
+
+
+@dataclass
+class _Batch:
+    """Pending queries that share every parameter except one condition."""
+
+    params: dict[str, str]
+    shared_conditions: list[str]
+    queries: dict[tuple[str, int | None], _Query] = field(default_factory=dict)
+    timer: asyncio.TimerHandle | None = None
+    # Deadline of the merged fetch: the most time any caller has left
+    timeout: float = 0.0
+
+
+def split_batch_condition(conditions: list[str]) -> tuple[str, list[str]] | None:
+    """Pick the condition a query can be batched on.
+
+    Returns:
+        Tuple of (varying condition, remaining shared conditions), or None if
+        the query has no `field eq 'value'` or `contains(field, 'value')`
+        condition on a batchable field
+    """
+    candidates: dict[str, str] = {}
+    for condition in conditions:
+        try:
+            node = parse_filter(condition)
+        except FilterSyntaxError:
+            continue
+        if isinstance(node, Contains) or (
+            isinstance(node, Comparison) and node.op == "eq" and isinstance(node.value, str)
+        ):
+            candidates.setdefault(node.field, condition)
+
+    for batch_field in BATCH_FIELDS:
+        if batch_field in candidates:
+            condition = candidates[batch_field]
+            return condition, [other for other in conditions if other != condition]
+    return None
+
+
+class QueryBatcher:
+    """Merge concurrent compatible queries into one upstream query.
+
+    Queries are compatible when their parameters (such as currency) and all
+    conditions but one are equal. The first query of a group opens a window of
+    `window` seconds; when it closes, or once `max_queries` distinct queries
+    are waiting, the group is fetched as one OR-filtered query of at most
+    `max_pages` pages. Each caller receives the items matching its own
+    condition, as one page with `HasMore` set when its limit cut them short.
+
+    A caller gets None, meaning "fetch it yourself", if its query ended up
+    alone in the window, if the merged query failed or was served stale, or
+    if its share cannot be determined exactly. That happens when the merged
+    result was cut off by `max_pages` before the caller's limit was reached,
+    or when a match would depend on letter case. Fallback requests then run in
+    the caller's own context and budget.
+
+    Each caller's budget is charged one upstream call for joining a batch,
+    refunded when the caller has to fetch the query itself, and a caller stops
+    waiting when its deadline passes. The merged fetch runs in a fresh context
+    under its own budget, so no single caller pays for it.
+    """
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_queries: int = BATCH_MAX_QUERIES,
+        max_pages: int = BATCH_MAX_PAGES,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            fetch_page: Fetches one page given `url` or `params` plus `conditions`
+            window: Seconds to hold the first query of a group
+            max_queries: Distinct queries that trigger an immediate flush
+            max_pages: Pages followed for one merged query
+        """
+        self._fetch_page = fetch_page
+        self._window = window
+        self._max_queries = max_queries
+        self._max_pages = max_pages
+        self._pending: dict[tuple[Any, ...], _Batch] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.batched_queries = 0
+        self.fallbacks = 0
+
+    async def submit(
+        self, params: dict[str, str], conditions: list[str], limit: int | None = None
+    ) -> dict[str, Any] | None:
+        """Queue a query for the next batch of compatible queries.
+
+        Args:
+            params: Request parameters of the query on its own
+            conditions: Its normalized filter conditions
+            limit: Maximum number of items wanted
+
+        Returns:
+            A page holding the query's items, or None if the caller should
+            fetch the query itself
+
+        Raises:
+            BudgetExceededError: If the caller's budget runs out before the batch is answered
+        """
+        if "$skip" in params:
+            return None
+        split = split_batch_condition(conditions)
+        if split is None:
+            return None
+        condition, shared_conditions = split
+        budget = current_budget()
+        if budget is not None:
+            budget.charge()
+
+        shared_params = {name: value for name, value in params.items() if name not in _PAGING_PARAMS}
+        group = (tuple(sorted(shared_params.items())), tuple(shared_conditions))
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(group)
+        if batch is None:
+            batch = self._pending[group] = _Batch(shared_params, shared_conditions)
+            batch.timer = loop.call_later(self._window, self._flush, group)
+        batch.timeout = max(batch.timeout, budget.remaining if budget is not None else TOOL_TIMEOUT_SECONDS)
+
+        query = batch.queries.setdefault((condition, limit), _Query(condition, limit))
+        future: asyncio.Future[dict[str, Any] | None] = loop.create_future()
+        query.futures.append(future)
+        if len(batch.queries) >= self._max_queries:
+            self._flush(group)
+        # Shielded so a cancelled caller does not cancel the result shared with other callers
+        if budget is None:
+            return await asyncio.shield(future)
+        try:
+            page = await asyncio.wait_for(asyncio.shield(future), budget.remaining)
+        except asyncio.TimeoutError:
+            raise budget.exceed(f"deadline of {budget.timeout:g}s reached while batched") from None
+        if page is None:
+            # The fallback request is charged on its own
+            budget.refund()
+        return page
+
+    def _flush(self, group: tuple[Any, ...]) -> None:
+        """Close a group's window and fetch it in the background."""
+        batch = self._pending.pop(group, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        # An empty context, so the task does not inherit the budget of the caller that triggered the flush
+        task = contextvars.Context().run(asyncio.ensure_future, self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        """Fetch a batch and resolve every caller's future."""
+        queries = list(batch.queries.values())
+        try:
+            if len({query.condition for query in queries}) < 2:
+                return
+            try:
+                with request_budget(timeout=batch.timeout):
+                    metadata, items, complete = await self._fetch_merged(batch, queries)
+            except Exception as e:
+                logger.debug(f"Merged query of {len(queries)} queries failed, callers fetch separately: {e}")
+                return
+
+            self.batches += 1
+            for query in queries:
+                page = self._route(query, metadata, items, complete)
+                if page is None:
+                    self.fallbacks += 1
+                else:
+                    self.batched_queries += 1
+                for future in query.futures:
+                    if not future.done():
+                        future.set_result(page)
+        finally:
+            for query in queries:
+                for future in query.futures:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def _fetch_merged(
+        self, batch: _Batch, queries: list[_Query]
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], bool]:
+        """Fetch the OR-combined query.
+
+        Returns:
+            Tuple of (response metadata, items, whether every match was fetched)
+
+        Raises:
+            RuntimeError: If the merged response was served stale
+        """
+        varying = sorted({query.condition for query in queries})
+        conditions = normalize_filter_conditions([*batch.shared_conditions, "(" + " or ".join(varying) + ")"])
+        params = {**batch.params, "$filter": " and ".join(conditions)}
+
+        page = await self._fetch_page(params=params, conditions=conditions)
+        items = list(page.get("Items", []))
+        pages = 1
+        stale = bool(page.get("Stale"))
+        while page.get("NextPageLink") and pages < self._max_pages:
+            page = await self._fetch_page(url=page["NextPageLink"])
+            items.extend(page.get("Items", []))
+            pages += 1
+            stale = stale or bool(page.get("Stale"))
+        if stale:
+            raise RuntimeError("merged response is stale")
+
+        metadata = {name: value for name, value in page.items() if name not in ("Items", "Count", "NextPageLink")}
+        complete = not page.get("NextPageLink") and not page.get("HasMore")
+        logger.debug(f"Merged {len(varying)} queries into one request: {len(items)} items in {pages} pages")
+        return metadata, items, complete
+
+    @staticmethod
+    def _route(
+        query: _Query, metadata: dict[str, Any], items: list[dict[str, Any]], complete: bool
+    ) -> dict[str, Any] | None:
+        """Select one query's items from a merged result, or None if that cannot be done exactly."""
+        node = parse_filter(query.condition)
+        matches = compile_predicate(node)
+        folded_matches = compile_predicate(node, casefold=True)
+        selected = []
+        try:
+            for item in items:
+                hit = matches(item)
+                if hit != folded_matches(item):
+                    return None
+                if hit:
+                    selected.append(item)
+        except FilterEvaluationError:
+            return None
+
+        limit = query.limit
+        if not complete and (limit is None or len(selected) < limit):
+            # Missing matches may be on pages that were not fetched
+            return None
+        page = dict(metadata)
+        page["Items"] = selected[:limit] if limit is not None else selected
+        page["Count"] = len(page["Items"])
+        page["NextPageLink"] = None
+        page["HasMore"] = not complete or len(selected) > len(page["Items"])
+        return page
+
+    async def aclose(self) -> None:
+        """Flush pending windows and cancel batches in flight (their callers fetch separately)."""
+        for group in list(self._pending):
+            batch = self._pending.pop(group)
+            if batch.timer is not None:
+                batch.timer.cancel()
+            for query in batch.queries.values():
+                for future in query.futures:
+                    if not future.done():
+                        future.set_result(None)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,116 @@
+"""Per-tool-call deadlines and upstream request budgets.
+
+Each tool invocation runs inside a `RequestBudget` carried by a context variable,
+so the client and services can check it without threading it through every call.
+The client charges one unit per upstream HTTP attempt and caps timeouts at the
+remaining time; services catch `BudgetExceededError` and return what they have.
+The budget also records when stale cached data was served, so the tool response
+can say so.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from .config import TOOL_MAX_UPSTREAM_CALLS, TOOL_TIMEOUT_SECONDS
+
+
+class BudgetExceededError(Exception):
+    """Raised when a tool call runs out of time or upstream calls."""
+
+
+@dataclass
+class RequestBudget:
+    """Deadline and upstream call allowance for one tool invocation."""
+
+    timeout: float = TOOL_TIMEOUT_SECONDS
+    max_upstream_calls: int | None = TOOL_MAX_UPSTREAM_CALLS
+    upstream_calls: int = 0
+    exceeded_reason: str | None = None
+    stale_age: float | None = None
+    deadline: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.deadline = time.monotonic() + self.timeout
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def truncated(self) -> bool:
+        """Whether any part of the work was cut short by this budget."""
+        return self.exceeded_reason is not None
+
+    def exceed(self, reason: str) -> BudgetExceededError:
+        """Record that the budget ran out and return the error to raise."""
+        if self.exceeded_reason is None:
+            self.exceeded_reason = reason
+        return BudgetExceededError(reason)
+
+    def check(self) -> None:
+        """Raise BudgetExceededError if the deadline has passed."""
+        if self.remaining <= 0:
+            raise self.exceed(f"deadline of {self.timeout:g}s reached")
+
+    def charge(self) -> None:
+        """Account for one upstream call, raising if the budget is exhausted."""
+        self.check()
+        if self.max_upstream_calls is not None and self.upstream_calls >= self.max_upstream_calls:
+            raise self.exceed(f"limit of {self.max_upstream_calls} upstream calls reached")
+        self.upstream_calls += 1
+
+    def refund(self) -> None:
+        """Give back one charged upstream call that was never made."""
+        self.upstream_calls = max(0, self.upstream_calls - 1)
+
+    def note(self) -> str:
+        """Human-readable note for truncated results."""
+        return f"Results truncated due to budget: {self.exceeded_reason}."
+
+    def mark_stale(self, age: float) -> None:
+        """Record that a stale cached response of the given age (seconds) was used."""
+        self.stale_age = max(age, self.stale_age or 0.0)
+
+    def stale_note(self) -> str:
+        """Human-readable note for results served from stale cached data."""
+        age = self.stale_age or 0.0
+        if age < 120:
+            age_text = f"{age:.0f} seconds"
+        elif age < 7200:
+            age_text = f"{age / 60:.0f} minutes"
+        else:
+            age_text = f"{age / 3600:.1f} hours"
+        return f"Azure Retail Prices API is unavailable; showing cached prices up to {age_text} old."
+
+
+_current_budget: ContextVar[RequestBudget | None] = ContextVar("azure_pricing_request_budget", default=None)
+
+
+def current_budget() -> RequestBudget | None:
+    """Return the budget of the tool call running in this context, if any."""
+    return _current_budget.get()
+
+
+@contextmanager
+def request_budget(
+    timeout: float = TOOL_TIMEOUT_SECONDS, max_upstream_calls: int | None = TOOL_MAX_UPSTREAM_CALLS
+) -> Iterator[RequestBudget]:
+    """Run the enclosed block under a new request budget.
+
+    Args:
+        timeout: Seconds until the deadline
+        max_upstream_calls: Maximum upstream HTTP attempts, or None for no limit
+
+    Yields:
+        The active RequestBudget
+    """
+    budget = RequestBudget(timeout=timeout, max_upstream_calls=max_upstream_calls)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -0,0 +1,229 @@
+"""In-memory response cache for Azure Pricing API requests."""
+
+import json
+import logging
+from typing import Any
+
+from cachetools import TTLCache
+
+from .config import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from .filters import FilterEvaluationError, FilterSyntaxError, compile_predicate, parse_conditions
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+# Query parameters that select a subset of a result rather than changing what matches
+_PAGING_PARAMS = ("$filter", "$top", "$skip")
+
+
+def normalize_filter_conditions(filter_conditions: list[str] | None) -> list[str]:
+    """Normalize OData filter conditions so equivalent queries share a cache key.
+
+    Conditions are joined with 'and', so order does not matter: whitespace is
+    collapsed, duplicates are dropped and the result is sorted.
+    """
+    if not filter_conditions:
+        return []
+    normalized = {" ".join(condition.split()) for condition in filter_conditions if condition and condition.strip()}
+    return sorted(normalized)
+
+
+def is_complete_response(params: dict[str, Any] | None, data: dict[str, Any]) -> bool:
+    """Whether a response holds every item matching its filter.
+
+    A response is incomplete if it has a next page, was requested with `$skip`,
+    filled its `$top` limit or was served stale.
+    """
+    params = params or {}
+    if data.get("NextPageLink") or data.get("HasMore") or data.get("Stale") or "$skip" in params:
+        return False
+    top = params.get("$top")
+    return top is None or len(data.get("Items", [])) < int(top)
+
+
+def _scope(key: CacheKey) -> CacheKey:
+    """The part of a cache key that must match for one result to answer another query."""
+    url, params = key
+    return url, tuple(param for param in params if param[0] not in _PAGING_PARAMS)
+
+
+def _estimate_size(value: dict[str, Any]) -> int:
+    """Approximate the memory footprint of a response by its JSON length."""
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+class PriceCache:
+    """TTL + LRU cache for Retail Prices API responses.
+
+    Entries expire after `ttl` seconds; when full, the least recently used
+    entry is evicted. The cache is bounded by entry count, or by approximate
+    size in bytes when `max_bytes` is set.
+
+    Entries stored with their filter conditions are known to be complete and
+    can answer narrower queries (see `derive`).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ) -> None:
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._cache: TTLCache | None
+        if max_bytes > 0:
+            self._cache = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=_estimate_size)
+        elif max_entries > 0:
+            self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+        else:
+            self._cache = None
+        # Complete entries: cache key -> (scope, filter conditions)
+        self._complete: dict[CacheKey, tuple[CacheKey, frozenset[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.derived_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self._cache is not None
+
+    @staticmethod
+    def make_key(url: str, params: dict[str, Any] | None = None) -> CacheKey:
+        """Build a hashable cache key from a request URL and its query parameters."""
+        return (url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return self._cache is not None and key in self._cache
+
+    def get(self, key: CacheKey) -> dict[str, Any] | None:
+        """Return a cached response, or None on a miss."""
+        if self._cache is None:
+            return None
+        value: dict[str, Any] | None = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: CacheKey, value: dict[str, Any], conditions: list[str] | None = None) -> None:
+        """Store a response in the cache.
+
+        Args:
+            key: Cache key of the request
+            value: Response to store
+            conditions: Normalized filter conditions of a complete response (one
+                holding every match of its filter); None for partial responses
+        """
+        if self._cache is None:
+            return
+        try:
+            self._cache[key] = value
+        except ValueError:
+            # Larger than the whole cache; skip rather than evicting everything
+            logger.debug("Response too large to cache")
+            return
+
+        if conditions is None:
+            self._complete.pop(key, None)
+            return
+        self._complete[key] = (_scope(key), frozenset(conditions))
+        if len(self._complete) > 2 * len(self._cache):
+            # Forget entries the TTL/LRU policy has already evicted
+            self._complete = {k: v for k, v in self._complete.items() if k in self._cache}
+
+    def derive(
+        self,
+        key: CacheKey,
+        conditions: list[str],
+        limit: int | None = None,
+        skip: int | None = None,
+    ) -> dict[str, Any] | None:
+        """Answer a query by filtering a cached complete response with a broader filter.
+
+        A complete entry whose conditions are a subset of `conditions` (and
+        whose other parameters, such as currency, match) holds every item the
+        narrower query can return, so applying the extra conditions locally
+        gives the same result as the API. The narrowest such entry is used.
+        Extra conditions outside the parser's subset, items whose fields cannot
+        be compared with certainty and matches that would change with the case
+        of a string are all refused, so the caller falls back to the API.
+
+        Args:
+            key: Cache key of the narrower request
+            conditions: Its normalized filter conditions
+            limit: Maximum number of items to return
+            skip: Number of matching items to skip
+
+        Returns:
+            A response page with `HasMore` set when `limit` cut the matches
+            short, or None if no cached entry can answer the query
+        """
+        if self._cache is None or not self._complete:
+            return None
+        scope = _scope(key)
+        wanted = frozenset(conditions)
+        candidates = []
+        for entry_key, (entry_scope, entry_conditions) in list(self._complete.items()):
+            if entry_scope != scope or not entry_conditions <= wanted:
+                continue
+            value = self._cache.get(entry_key)
+            if value is None:
+                del self._complete[entry_key]
+                continue
+            candidates.append((entry_conditions, value))
+        candidates.sort(key=lambda candidate: (-len(candidate[0]), len(candidate[1].get("Items", []))))
+
+        for entry_conditions, value in candidates:
+            try:
+                node = parse_conditions(sorted(wanted - entry_conditions))
+                matches = compile_predicate(node)
+                folded_matches = compile_predicate(node, casefold=True)
+                items = []
+                for item in value.get("Items", []):
+                    selected = matches(item)
+                    if selected != folded_matches(item):
+                        # The API's case handling would decide this item; do not guess
+                        raise FilterEvaluationError("match depends on letter case")
+                    if selected:
+                        items.append(item)
+            except (FilterSyntaxError, FilterEvaluationError) as e:
+                logger.debug(f"Cached result cannot answer narrower query: {e}")
+                continue
+
+            self.hits += 1
+            self.derived_hits += 1
+            start = skip or 0
+            end = start + limit if limit else None
+            page = {field: data for field, data in value.items() if field not in ("Items", "Count", "NextPageLink")}
+            page["Items"] = items[start:end]
+            page["Count"] = len(page["Items"])
+            page["NextPageLink"] = None
+            page["HasMore"] = end is not None and len(items) > end
+            return page
+        return None
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        if self._cache is not None:
+            self._cache.clear()
+        self._complete.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "derived_hits": self.derived_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._cache) if self._cache is not None else 0,
+            "size": self._cache.currsize if self._cache is not None else 0,
+            "max_size": self._cache.maxsize if self._cache is not None else 0,
+            "size_unit": "bytes" if self._max_bytes > 0 else "entries",
+            "ttl_seconds": self._ttl,
+        }
@@ -0,0 +1,379 @@
+"""Offline mirror of the Azure Retail Prices catalog.
+
+`azure-pricing-mcp catalog sync` downloads every price for the chosen currencies
+into a local SQLite database. A server started with `--catalog` answers
+`fetch_prices` queries (and therefore price search, RI pricing and SKU
+discovery) from that database without touching the network. Queries whose
+filters the local engine does not understand still go to the API.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .config import CATALOG_PATH, DEFAULT_API_VERSION, DEFAULT_CATALOG_PATH, MAX_RESULTS_PER_REQUEST
+from .filters import BoolOp, Comparison, Contains, FilterNode, FilterSyntaxError, parse_conditions
+
+logger = logging.getLogger(__name__)
+
+# Item fields stored in indexed (or at least typed) columns; other fields are read from the JSON
+_COLUMNS = {
+    "serviceName": "service_name",
+    "serviceFamily": "service_family",
+    "armRegionName": "arm_region_name",
+    "armSkuName": "arm_sku_name",
+    "skuName": "sku_name",
+    "productName": "product_name",
+    "meterName": "meter_name",
+    "priceType": "price_type",
+    "retailPrice": "retail_price",
+}
+
+# Scheme of the NextPageLink on catalog pages; the client routes these links back to the catalog
+CATALOG_LINK_PREFIX = "catalog:"
+
+_SQL_OPERATORS = {"eq": "=", "ne": "!=", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+_COLUMN_DEFINITIONS = ",\n    ".join(
+    f"{column} REAL" if column == "retail_price" else f"{column} TEXT" for column in _COLUMNS.values()
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS prices (
+    currency TEXT NOT NULL,
+    {_COLUMN_DEFINITIONS},
+    item TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_prices_service;
+DROP INDEX IF EXISTS idx_prices_region;
+DROP INDEX IF EXISTS idx_prices_arm_sku;
+DROP INDEX IF EXISTS idx_prices_price_type;
+CREATE INDEX IF NOT EXISTS idx_prices_service_nocase ON prices (currency, service_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_prices_region_nocase ON prices (currency, arm_region_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_prices_arm_sku_nocase ON prices (currency, arm_sku_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_prices_price_type_nocase ON prices (currency, price_type COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS syncs (
+    currency TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    items INTEGER NOT NULL
+);
+"""
+
+
+def _compile_sql(node: FilterNode, params: list[Any]) -> str:
+    """Compile a parsed filter into a SQL WHERE expression, appending bind parameters.
+
+    String comparisons ignore case, as the Retail Prices API does, so a query
+    spelled differently from the stored values still finds them.
+    """
+    if isinstance(node, BoolOp):
+        joiner = " AND " if node.op == "and" else " OR "
+        return "(" + joiner.join(_compile_sql(operand, params) for operand in node.operands) + ")"
+
+    column = _COLUMNS.get(node.field)
+    if column is None:
+        params.append(f"$.{node.field}")
+        column = "json_extract(item, ?)"
+    if isinstance(node, Contains):
+        params.append(node.value)
+        return f"instr(lower({column}), lower(?)) > 0"
+    assert isinstance(node, Comparison)
+    params.append(node.value)
+    collation = " COLLATE NOCASE" if isinstance(node.value, str) else ""
+    return f"{column} {_SQL_OPERATORS[node.op]} ?{collation}"
+
+
+class PriceCatalog:
+    """SQLite store of Retail Prices items with indexes on the common filter fields.
+
+    Methods are synchronous and thread-safe; call them through `asyncio.to_thread`
+    from async code.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open (or create) the catalog database.
+
+        Args:
+            path: Database file path; parent directories are created
+        """
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._synced = self._load_synced()
+
+    def _load_synced(self) -> dict[str, float]:
+        """Currencies with a completed sync and when they were synced."""
+        with self._lock:
+            rows = self._conn.execute("SELECT currency, synced_at FROM syncs").fetchall()
+        return dict(rows)
+
+    def has_currency(self, currency_code: str) -> bool:
+        """Whether a complete snapshot exists for a currency."""
+        return currency_code in self._synced
+
+    def query(
+        self,
+        filter_conditions: list[str],
+        currency_code: str = "USD",
+        limit: int | None = None,
+        skip: int | None = None,
+        after: int | None = None,
+    ) -> dict[str, Any] | None:
+        """Answer a fetch_prices query locally.
+
+        Results come in pages of at most MAX_RESULTS_PER_REQUEST items, like the
+        API. A page that is not the last one carries a `catalog:` NextPageLink
+        (see `query_next_page`) that resumes after its last row.
+
+        Args:
+            filter_conditions: List of OData filter conditions
+            currency_code: Currency code for prices
+            limit: Maximum number of results across all pages
+            skip: Number of items to skip (page offset)
+            after: Only return rows after this rowid (page cursor)
+
+        Returns:
+            An API-shaped page, with `HasMore` set when `limit` cut the results
+            short; or None when the currency has not been synced or the filters
+            use unsupported syntax.
+        """
+        if not self.has_currency(currency_code):
+            return None
+        try:
+            node = parse_conditions(filter_conditions)
+        except FilterSyntaxError as e:
+            logger.debug(f"Catalog cannot answer filter, falling back to the API: {e}")
+            return None
+
+        page_size = MAX_RESULTS_PER_REQUEST if limit is None else min(limit, MAX_RESULTS_PER_REQUEST)
+        params: list[Any] = [currency_code]
+        sql = "SELECT rowid, item FROM prices WHERE currency = ?"
+        if after is not None:
+            sql += " AND rowid > ?"
+            params.append(after)
+        if node is not None:
+            sql += " AND " + _compile_sql(node, params)
+        # One extra row tells whether more results exist
+        sql += " ORDER BY rowid LIMIT ?"
+        params.append(page_size + 1)
+        if skip:
+            sql += " OFFSET ?"
+            params.append(skip)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        remaining = None if limit is None else limit - len(rows)
+        next_link = None
+        if more and (remaining is None or remaining > 0):
+            link: dict[str, Any] = {
+                "currency": currency_code,
+                "filter": json.dumps(filter_conditions),
+                "after": rows[-1][0],
+            }
+            if remaining is not None:
+                link["limit"] = remaining
+            next_link = CATALOG_LINK_PREFIX + "?" + urlencode(link)
+        items = [json.loads(row[1]) for row in rows]
+        return {
+            "BillingCurrency": currency_code,
+            "Items": items,
+            "NextPageLink": next_link,
+            "Count": len(items),
+            "HasMore": more and next_link is None,
+            "Source": "catalog",
+        }
+
+    def query_next_page(self, link: str) -> dict[str, Any] | None:
+        """Answer a `catalog:` NextPageLink from an earlier page.
+
+        Returns:
+            The next page, or None if the link is malformed or the currency is
+            no longer in the catalog
+        """
+        try:
+            query = {name: values[0] for name, values in parse_qs(urlsplit(link).query).items()}
+            conditions = json.loads(query["filter"])
+            after = int(query["after"])
+            limit = int(query["limit"]) if "limit" in query else None
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Invalid catalog page link {link!r}: {e}")
+            return None
+        return self.query(conditions, query["currency"], limit=limit, after=after)
+
+    def distinct_skus(self, service_name: str, currency_code: str = "USD") -> list[dict[str, Any]] | None:
+        """First item of each distinct (skuName, armSkuName, productName) of a service.
+
+        Returns:
+            Items in catalog order, or None when the currency has not been synced
+        """
+        if not self.has_currency(currency_code):
+            return None
+        sql = (
+            "SELECT item, MIN(rowid) FROM prices WHERE currency = ? AND service_name = ? COLLATE NOCASE"
+            " GROUP BY sku_name, arm_sku_name, product_name ORDER BY MIN(rowid)"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (currency_code, service_name)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def distinct_services(self, currency_code: str = "USD") -> list[dict[str, Any]] | None:
+        """First item of each distinct (serviceName, productName) in the catalog.
+
+        This scans the whole currency snapshot; callers cache the result.
+
+        Returns:
+            Items in catalog order, or None when the currency has not been synced
+        """
+        if not self.has_currency(currency_code):
+            return None
+        sql = (
+            "SELECT item, MIN(rowid) FROM prices WHERE currency = ?"
+            " GROUP BY service_name, product_name ORDER BY MIN(rowid)"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (currency_code,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def replace_currency(self, currency_code: str, pages: list[list[dict[str, Any]]]) -> int:
+        """Replace all items of a currency with the given pages in one transaction."""
+        self.begin_sync(currency_code)
+        for items in pages:
+            self.add_items(currency_code, items)
+        return self.finish_sync(currency_code)
+
+    def begin_sync(self, currency_code: str) -> None:
+        """Start replacing a currency; readers keep seeing the old rows until finish_sync."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM prices WHERE currency = ?", (currency_code,))
+
+    def add_items(self, currency_code: str, items: list[dict[str, Any]]) -> None:
+        """Insert one page of items inside a sync."""
+        rows = [
+            (currency_code, *(item.get(field) for field in _COLUMNS), json.dumps(item, separators=(",", ":")))
+            for item in items
+        ]
+        placeholders = ", ".join("?" * (len(_COLUMNS) + 2))
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO prices (currency, {', '.join(_COLUMNS.values())}, item) VALUES ({placeholders})", rows
+            )
+
+    def finish_sync(self, currency_code: str) -> int:
+        """Commit a sync and return the number of items stored for the currency."""
+        now = time.time()
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM prices WHERE currency = ?", (currency_code,)).fetchone()[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs (currency, synced_at, items) VALUES (?, ?, ?)",
+                (currency_code, now, count),
+            )
+            self._conn.execute("COMMIT")
+        self._synced[currency_code] = now
+        return int(count)
+
+    def abort_sync(self) -> None:
+        """Roll back an unfinished sync, keeping the previous snapshot."""
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+
+    def stats(self) -> dict[str, Any]:
+        """Return per-currency item counts and sync times."""
+        with self._lock:
+            rows = self._conn.execute("SELECT currency, synced_at, items FROM syncs ORDER BY currency").fetchall()
+        return {
+            "path": str(self.path),
+            "currencies": {currency: {"synced_at": synced_at, "items": items} for currency, synced_at, items in rows},
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+async def sync_catalog(client: Any, catalog: PriceCatalog, currency_code: str) -> int:
+    """Download the full Retail Prices catalog for one currency into the store.
+
+    Pages are fetched sequentially by following NextPageLink (paced by the
+    client's rate limiter) and bypass the response caches. The previous
+    snapshot stays visible until the new one is complete.
+
+    Args:
+        client: An open AzurePricingClient
+        catalog: Destination store
+        currency_code: Currency to download
+
+    Returns:
+        Number of items stored
+    """
+    params = {"api-version": DEFAULT_API_VERSION, "currencyCode": currency_code}
+    await asyncio.to_thread(catalog.begin_sync, currency_code)
+    try:
+        page = await client.make_request(params=params)
+        pages = 1
+        while True:
+            await asyncio.to_thread(catalog.add_items, currency_code, page.get("Items", []))
+            next_link = page.get("NextPageLink")
+            if not next_link:
+                break
+            if pages % 100 == 0:
+                logger.info(f"Catalog sync ({currency_code}): {pages} pages downloaded")
+            page = await client.make_request(url=next_link)
+            pages += 1
+    except BaseException:
+        await asyncio.to_thread(catalog.abort_sync)
+        raise
+    count = await asyncio.to_thread(catalog.finish_sync, currency_code)
+    logger.info(f"Catalog sync ({currency_code}) complete: {count} items in {pages} pages")
+    return count
+
+
+async def catalog_main(argv: list[str]) -> None:
+    """Entry point for `azure-pricing-mcp catalog ...` commands."""
+    from .client import AzurePricingClient
+
+    parser = argparse.ArgumentParser(prog="azure-pricing-mcp catalog", description="Manage the offline price catalog")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subcommands.add_parser("sync", help="Download the full price catalog")
+    sync_parser.add_argument(
+        "--currency",
+        action="append",
+        dest="currencies",
+        help="Currency to download; repeat for several (default: USD)",
+    )
+    for subparser in (sync_parser, subcommands.add_parser("info", help="Show catalog contents")):
+        subparser.add_argument(
+            "--path",
+            default=CATALOG_PATH or DEFAULT_CATALOG_PATH,
+            help="Catalog database file (default: AZURE_PRICING_CATALOG or %(default)s)",
+        )
+    args = parser.parse_args(argv)
+
+    catalog = PriceCatalog(args.path)
+    try:
+        if args.command == "sync":
+            async with AzurePricingClient() as client:
+                for currency_code in args.currencies or ["USD"]:
+                    count = await sync_catalog(client, catalog, currency_code)
+                    print(f"{currency_code}: {count} items")
+        print(json.dumps(catalog.stats(), indent=2))
+    finally:
+        catalog.close()
@@ -0,0 +1,104 @@
+"""Circuit breaker for the Azure Retail Prices API."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+
+from .config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_PROBE_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit is open."""
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an exception means the API is degraded (as opposed to a bad request)."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a background recovery probe.
+
+    After `failure_threshold` consecutive upstream failures the circuit opens
+    and requests fail fast, so callers can answer from cached data right away
+    instead of paying the retry ladder. While open, a background task calls
+    `probe` every `probe_interval` seconds and closes the circuit once it
+    succeeds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        probe_interval: float = CIRCUIT_PROBE_INTERVAL_SECONDS,
+        probe: Callable[[], Awaitable[bool]] | None = None,
+    ) -> None:
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit; 0 disables the breaker
+            probe_interval: Seconds between recovery probes while open
+            probe: Coroutine function returning True when the API is healthy again
+        """
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self.probe = probe
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_task: asyncio.Task[None] | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests should currently fail fast."""
+        return self._opened_at is not None
+
+    @property
+    def state(self) -> str:
+        """Circuit state: 'open' or 'closed'."""
+        return "open" if self.is_open else "closed"
+
+    def record_success(self) -> None:
+        """Reset the failure count and close the circuit."""
+        self._failures = 0
+        if self._opened_at is not None:
+            logger.info(f"Circuit closed after {time.monotonic() - self._opened_at:.0f}s: Azure Pricing API recovered")
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count an upstream failure, opening the circuit at the threshold."""
+        self._failures += 1
+        if self._failure_threshold <= 0 or self.is_open or self._failures < self._failure_threshold:
+            return
+        self._opened_at = time.monotonic()
+        logger.warning(f"Circuit opened after {self._failures} consecutive failures; serving cached data")
+        if self.probe is not None and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.ensure_future(self._probe_until_closed())
+
+    async def _probe_until_closed(self) -> None:
+        """Probe the API in the background until it responds again."""
+        assert self.probe is not None
+        while self.is_open:
+            await asyncio.sleep(self._probe_interval)
+            try:
+                healthy = await self.probe()
+            except Exception as e:
+                logger.debug(f"Circuit probe failed: {e}")
+                healthy = False
+            if healthy:
+                self.record_success()
+
+    async def aclose(self) -> None:
+        """Stop the background probe."""
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+        self._probe_task = None
@@ -1,31 +1,124 @@
 """HTTP client for Azure Pricing API."""
 
 import asyncio
+import contextvars
+import json
 import logging
 import ssl
-from typing import Any
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
 
 import aiohttp
+from cachetools import LRUCache
 
+from .batching import QueryBatcher
+from .budget import RequestBudget, current_budget, request_budget
+from .cache import CacheKey, PriceCache, is_complete_response, normalize_filter_conditions
+from .catalog import CATALOG_LINK_PREFIX, PriceCatalog
+from .circuit import CircuitBreaker, CircuitOpenError, is_upstream_failure
 from .config import (
     AZURE_PRICING_BASE_URL,
+    BATCH_WINDOW_SECONDS,
     DEFAULT_API_VERSION,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_PAGES_PER_QUERY,
     MAX_RESULTS_PER_REQUEST,
     MAX_RETRIES,
-    RATE_LIMIT_RETRY_BASE_WAIT,
     SSL_VERIFY,
+    STALE_CACHE_MAX_ENTRIES,
 )
+from .disk_cache import DiskCache
+from .ratelimit import AdaptiveRateLimiter, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+@dataclass
+class _InFlight:
+    """A shared upstream request and the number of callers awaiting it."""
+
+    task: asyncio.Future[Any]
+    waiters: int = 0
+
+
+@dataclass
+class ConditionalText:
+    """Outcome of a conditional text fetch."""
+
+    text: str | None
+    etag: str | None
+    not_modified: bool = False
+
 
 class AzurePricingClient:
     """HTTP client for Azure Pricing API with retry logic."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: PriceCache | None = None,
+        disk_cache: DiskCache | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        catalog: PriceCatalog | None = None,
+        batch_window: float = BATCH_WINDOW_SECONDS,
+    ) -> None:
         self.session: aiohttp.ClientSession | None = None
         self._base_url = AZURE_PRICING_BASE_URL
         self._api_version = DEFAULT_API_VERSION
+        self._cache = cache if cache is not None else PriceCache()
+        self._disk_cache = disk_cache
+        self._rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        self._circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        if self._circuit_breaker.probe is None:
+            self._circuit_breaker.probe = self._probe_upstream
+        # Last good response per query with its fetch time, kept past the cache TTL for stale serving
+        self._last_good: LRUCache[CacheKey, tuple[dict[str, Any], float]] = LRUCache(
+            maxsize=max(1, STALE_CACHE_MAX_ENTRIES)
+        )
+        self._inflight: dict[Hashable, _InFlight] = {}
+        self._catalog = catalog
+        self._batcher = QueryBatcher(self._cached_request, window=batch_window) if batch_window > 0 else None
+
+    @property
+    def cache(self) -> PriceCache:
+        """Get the response cache."""
+        return self._cache
+
+    @property
+    def rate_limiter(self) -> AdaptiveRateLimiter:
+        """Get the shared rate limiter."""
+        return self._rate_limiter
+
+    @property
+    def disk_cache(self) -> DiskCache | None:
+        """Get the persistent disk cache, if configured."""
+        return self._disk_cache
+
+    @property
+    def catalog(self) -> PriceCatalog | None:
+        """Get the offline price catalog, if configured."""
+        return self._catalog
+
+    @property
+    def batcher(self) -> QueryBatcher | None:
+        """Get the micro-batcher for concurrent queries, if enabled."""
+        return self._batcher
+
+    @property
+    def inflight_requests(self) -> int:
+        """Number of distinct upstream requests currently in flight."""
+        return len(self._inflight)
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Get the circuit breaker guarding upstream requests."""
+        return self._circuit_breaker
 
     async def __aenter__(self) -> "AzurePricingClient":
         """Async context manager entry."""
@@ -37,20 +130,82 @@ class AzurePricingClient:
             ssl_context.verify_mode = ssl.CERT_NONE
             connector = aiohttp.TCPConnector(ssl=ssl_context)
             logger.warning("SSL verification is disabled. This is insecure and should only be used for debugging.")
-        self.session = aiohttp.ClientSession(connector=connector)
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS, sock_connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Async context manager exit."""
+        if self._batcher is not None:
+            await self._batcher.aclose()
+        await self._circuit_breaker.aclose()
         if self.session:
             await self.session.close()
             self.session = None
 
+    @staticmethod
+    def _request_timeout(budget: RequestBudget | None, total: float = HTTP_TIMEOUT_SECONDS) -> aiohttp.ClientTimeout:
+        """Build a request timeout that never runs past the active budget's deadline."""
+        if budget is not None:
+            total = min(total, budget.remaining)
+        return aiohttp.ClientTimeout(total=total, sock_connect=min(total, HTTP_CONNECT_TIMEOUT_SECONDS))
+
+    async def _acquire(self, budget: RequestBudget | None) -> None:
+        """Charge the active budget and wait for a rate limiter token within its deadline."""
+        if budget is None:
+            await self._rate_limiter.acquire()
+            return
+        budget.charge()
+        try:
+            await asyncio.wait_for(self._rate_limiter.acquire(), budget.remaining)
+        except asyncio.TimeoutError:
+            raise budget.exceed(f"deadline of {budget.timeout:g}s reached while rate limited") from None
+
     async def make_request(
         self, url: str | None = None, params: dict[str, Any] | None = None, max_retries: int = MAX_RETRIES
+    ) -> dict[str, Any]:
+        """Make HTTP request to Azure Pricing API through the circuit breaker.
+
+        Fails fast with CircuitOpenError while the circuit is open. Server errors,
+        exhausted 429 retries, connection errors and timeouts count as failures.
+
+        Args:
+            url: Optional URL to request (defaults to base pricing URL)
+            params: Query parameters for the request
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            JSON response as dictionary
+        """
+        if self._circuit_breaker.is_open:
+            raise CircuitOpenError("Azure Retail Prices API is unavailable (circuit open)")
+        try:
+            data = await self._request_with_retries(url=url, params=params, max_retries=max_retries)
+        except Exception as e:
+            if is_upstream_failure(e):
+                self._circuit_breaker.record_failure()
+            raise
+        self._circuit_breaker.record_success()
+        return data
+
+    async def _probe_upstream(self) -> bool:
+        """Check whether the API answers a minimal query (used by the circuit breaker)."""
+        if not self.session:
+            return False
+        params = {"api-version": self._api_version, "$top": "1"}
+        async with self.session.get(self._base_url, params=params, timeout=self._request_timeout(None)) as response:
+            return response.status < 500 and response.status != 429
+
+    async def _request_with_retries(
+        self, url: str | None = None, params: dict[str, Any] | None = None, max_retries: int = MAX_RETRIES
     ) -> dict[str, Any]:
         """Make HTTP request to Azure Pricing API with retry logic for rate limiting.
 
+        Every attempt first acquires a token from the shared rate limiter. A 429
+        slows the limiter down (honouring Retry-After when present) and retries.
+        Inside a tool call, each attempt is charged to the request budget and the
+        request timeout is capped at the time left before its deadline.
+
         Args:
             url: Optional URL to request (defaults to base pricing URL)
             params: Query parameters for the request
@@ -61,6 +216,7 @@ class AzurePricingClient:
 
         Raises:
             RuntimeError: If session not initialized
+            BudgetExceededError: If the tool call's deadline or upstream call budget runs out
             aiohttp.ClientError: On HTTP errors after retries exhausted
         """
         if not self.session:
@@ -68,39 +224,42 @@ class AzurePricingClient:
 
         request_url = url or self._base_url
         last_exception = None
+        budget = current_budget()
 
         for attempt in range(max_retries + 1):
+            await self._acquire(budget)
+            timeout = self._request_timeout(budget)
             try:
-                async with self.session.get(request_url, params=params) as response:
+                async with self.session.get(request_url, params=params, timeout=timeout) as response:
                     if response.status == 429:  # Too Many Requests
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        await self._rate_limiter.on_throttle(retry_after)
                         if attempt < max_retries:
-                            wait_time = RATE_LIMIT_RETRY_BASE_WAIT * (attempt + 1)
-                            logger.warning(
-                                f"Rate limited (429). Retrying in {wait_time} seconds... "
-                                f"(attempt {attempt + 1}/{max_retries + 1})"
-                            )
-                            await asyncio.sleep(wait_time)
+                            logger.warning(f"Rate limited (429). Retrying... (attempt {attempt + 1}/{max_retries + 1})")
                             continue
                         else:
                             response.raise_for_status()
 
                     response.raise_for_status()
                     json_data: dict[str, Any] = await response.json()
+                    await self._rate_limiter.on_success()
                     return json_data
 
             except aiohttp.ClientResponseError as e:
                 if e.status == 429 and attempt < max_retries:
-                    wait_time = RATE_LIMIT_RETRY_BASE_WAIT * (attempt + 1)
-                    logger.warning(
-                        f"Rate limited (429). Retrying in {wait_time} seconds... "
-                        f"(attempt {attempt + 1}/{max_retries + 1})"
-                    )
-                    await asyncio.sleep(wait_time)
+                    retry_after = parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+                    await self._rate_limiter.on_throttle(retry_after)
+                    logger.warning(f"Rate limited (429). Retrying... (attempt {attempt + 1}/{max_retries + 1})")
                     last_exception = e
                     continue
                 else:
                     logger.error(f"HTTP request failed: {e}")
                     raise
+            except asyncio.TimeoutError as e:
+                if budget is not None and budget.remaining <= 0:
+                    raise budget.exceed(f"deadline of {budget.timeout:g}s reached") from e
+                logger.error(f"HTTP request timed out after {timeout.total:g}s: {request_url}")
+                raise
             except aiohttp.ClientError as e:
                 logger.error(f"HTTP request failed: {e}")
                 raise
@@ -117,13 +276,18 @@ class AzurePricingClient:
         filter_conditions: list[str] | None = None,
         currency_code: str = "USD",
         limit: int | None = None,
+        skip: int | None = None,
     ) -> dict[str, Any]:
         """Fetch prices from Azure Pricing API.
 
+        With an offline catalog configured, queries it can answer are served
+        locally, in pages linked by `catalog:` NextPageLinks.
+
         Args:
             filter_conditions: List of OData filter conditions
             currency_code: Currency code for prices
             limit: Maximum number of results
+            skip: Number of items to skip (page offset)
 
         Returns:
             API response with Items and metadata
@@ -133,13 +297,390 @@ class AzurePricingClient:
             "currencyCode": currency_code,
         }
 
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
+        conditions = normalize_filter_conditions(filter_conditions)
+        if self._catalog is not None:
+            page = await asyncio.to_thread(self._catalog.query, conditions, currency_code, limit, skip)
+            if page is not None:
+                return page
+
+        if conditions:
+            params["$filter"] = " and ".join(conditions)
 
         if limit and limit < MAX_RESULTS_PER_REQUEST:
             params["$top"] = str(limit)
 
-        return await self.make_request(params=params)
+        if skip:
+            params["$skip"] = str(skip)
+
+        key = PriceCache.make_key(self._base_url, params)
+        if key not in self._cache:
+            # A cached complete result of a broader query may already hold every match
+            derived = self._cache.derive(key, conditions, limit, skip)
+            if derived is not None:
+                return derived
+
+            if self._batcher is not None:
+                batched = await self._batcher.submit(params, conditions, limit)
+                if batched is not None:
+                    complete = is_complete_response(params, batched)
+                    await self._store_response(key, batched, conditions if complete else None)
+                    return dict(batched)
+
+        return await self._cached_request(params=params, conditions=conditions)
+
+    async def _cached_request(
+        self,
+        url: str | None = None,
+        params: dict[str, Any] | None = None,
+        conditions: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Make a request, serving repeats from the response cache.
+
+        Cached responses are shared; callers must not mutate the returned Items.
+
+        Args:
+            url: Request URL (defaults to the API base URL)
+            params: Query parameters
+            conditions: Normalized filter conditions of a fetch_prices query, so
+                complete responses can answer narrower queries from the cache
+        """
+        key = PriceCache.make_key(url or self._base_url, params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        def complete_conditions(data: dict[str, Any]) -> list[str] | None:
+            if conditions is None or not is_complete_response(params, data):
+                return None
+            return conditions
+
+        async def fetch() -> dict[str, Any]:
+            disk_key = self._disk_key(key)
+            if self._disk_cache is not None:
+                entry = await asyncio.to_thread(self._disk_cache.get_with_age, disk_key)
+                if entry is not None:
+                    stored, age = entry
+                    self._cache.set(key, stored, complete_conditions(stored))
+                    self._last_good[key] = (stored, time.time() - age)
+                    return dict(stored)
+
+            try:
+                data = await self.make_request(url=url, params=params)
+            except Exception as e:
+                if not (isinstance(e, CircuitOpenError) or is_upstream_failure(e)):
+                    raise
+                stale = await self._stale_response(key, disk_key)
+                if stale is None:
+                    raise
+                logger.warning(f"Serving stale response ({stale['StaleAgeSeconds']}s old): {e}")
+                return stale
+
+            await self._store_response(key, data, complete_conditions(data))
+            return data
+
+        result = dict(await self._single_flight(key, fetch))
+        budget = current_budget()
+        if result.get("Stale") and budget is not None:
+            budget.mark_stale(result["StaleAgeSeconds"])
+        return result
+
+    async def _store_response(self, key: CacheKey, data: dict[str, Any], conditions: list[str] | None) -> None:
+        """Record a good response in the response cache, as the last good response and on disk.
+
+        Args:
+            key: Cache key of the request
+            data: The response
+            conditions: Filter conditions the response is complete for, if any
+        """
+        self._cache.set(key, data, conditions)
+        self._last_good[key] = (data, time.time())
+        if self._disk_cache is not None:
+            await asyncio.to_thread(self._disk_cache.set, self._disk_key(key), data)
+
+    @staticmethod
+    def _disk_key(key: CacheKey) -> str:
+        """Disk cache key of a response cache key."""
+        return f"prices:{json.dumps(key)}"
+
+    async def _stale_response(self, key: CacheKey, disk_key: str) -> dict[str, Any] | None:
+        """Return the last good response for a query, marked stale with its age, if one exists.
+
+        Looks in the in-memory last-good store first, then in the disk cache
+        (including expired entries that have not been evicted yet).
+        """
+        data: dict[str, Any] | None = None
+        age = 0.0
+        last_good = self._last_good.get(key)
+        if last_good is not None:
+            data, fetched_at = last_good
+            age = time.time() - fetched_at
+        elif self._disk_cache is not None:
+            entry = await asyncio.to_thread(self._disk_cache.get_entry, disk_key)
+            if entry is not None:
+                data, _, age = entry
+
+        if data is None:
+            return None
+        stale = dict(data)
+        stale["Stale"] = True
+        stale["StaleAgeSeconds"] = int(age)
+        return stale
+
+    async def _single_flight(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Share one in-flight request between concurrent callers with the same key.
+
+        The shared request runs in a fresh context under its own budget, since
+        it serves callers with different budgets. Each caller is charged one
+        upstream call when it joins and stops waiting at its own deadline.
+        Cancelling one caller does not cancel the request for the others; the
+        request itself is only cancelled when its last waiter leaves.
+
+        Raises:
+            BudgetExceededError: If the caller's budget runs out before the request completes
+        """
+        budget = current_budget()
+        if budget is not None:
+            budget.charge()
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            # An empty context, so the request does not run under the first caller's budget
+            task = contextvars.Context().run(asyncio.ensure_future, self._run_shared(factory))
+            entry = _InFlight(task=task)
+            self._inflight[key] = entry
+
+            def _remove(_: asyncio.Future[Any], entry: _InFlight = entry) -> None:
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+            entry.task.add_done_callback(_remove)
+
+        entry.waiters += 1
+        try:
+            # asyncio.wait neither cancels the shared task on timeout nor when this caller is cancelled
+            done, _ = await asyncio.wait({entry.task}, timeout=budget.remaining if budget is not None else None)
+            if not done:
+                assert budget is not None
+                if entry.waiters == 1:
+                    entry.task.cancel()
+                raise budget.exceed(f"deadline of {budget.timeout:g}s reached waiting for a shared request")
+            result: T = entry.task.result()
+            return result
+        except asyncio.CancelledError:
+            if entry.waiters == 1 and not entry.task.done():
+                entry.task.cancel()
+            raise
+        finally:
+            entry.waiters -= 1
+
+    @staticmethod
+    async def _run_shared(factory: Callable[[], Awaitable[T]]) -> T:
+        """Run a shared request under a budget of its own."""
+        with request_budget():
+            return await factory()
+
+    async def fetch_prices_sharded(
+        self,
+        filter_conditions: list[str] | None = None,
+        currency_code: str = "USD",
+        shard_field: str | None = None,
+        shard_values: list[str] | None = None,
+        max_pages: int = MAX_PAGES_PER_QUERY,
+        concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> dict[str, Any]:
+        """Fetch every page of a query using concurrent shards.
+
+        Two sharding modes are supported:
+        - Partition: when `shard_field` and `shard_values` are given, one shard per
+          value (e.g. `armRegionName`) is paged independently.
+        - Offset: otherwise pages are requested concurrently by `$skip` offset in
+          waves of `concurrency` until a short page marks the end of the data.
+
+        Results are merged in a stable order (shard value order, then page order).
+
+        Args:
+            filter_conditions: List of OData filter conditions shared by all shards
+            currency_code: Currency code for prices
+            shard_field: Field to partition on (e.g. 'armRegionName', 'serviceFamily')
+            shard_values: Values of `shard_field`, one shard each
+            max_pages: Maximum number of pages per shard (offset mode: in total)
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            Dict with merged Items, Count, Pages and whether the result is Complete
+        """
+        concurrency = max(1, concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        base_conditions = list(filter_conditions or [])
+
+        if shard_field and shard_values:
+            shards = await asyncio.gather(
+                *(
+                    self._fetch_partition(
+                        base_conditions + [f"{shard_field} eq '{value}'"], currency_code, max_pages, semaphore
+                    )
+                    for value in shard_values
+                )
+            )
+            items = [item for shard_items, _, _ in shards for item in shard_items]
+            return {
+                "Items": items,
+                "Count": len(items),
+                "Pages": sum(pages for _, pages, _ in shards),
+                "Complete": all(complete for _, _, complete in shards),
+            }
+
+        return await self._fetch_by_offset(base_conditions, currency_code, max_pages, concurrency, semaphore)
+
+    async def _fetch_partition(
+        self,
+        filter_conditions: list[str],
+        currency_code: str,
+        max_pages: int,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[list[dict[str, Any]], int, bool]:
+        """Page through a single partition shard, returning (items, pages, complete)."""
+        items: list[dict[str, Any]] = []
+        pages = 0
+        complete = True
+        async with semaphore:
+            async for page in self.iter_price_pages(
+                filter_conditions=filter_conditions,
+                currency_code=currency_code,
+                max_pages=max_pages,
+            ):
+                pages += 1
+                items.extend(page.get("Items", []))
+                complete = not page.get("NextPageLink")
+        return items, pages, complete
+
+    async def _fetch_by_offset(
+        self,
+        filter_conditions: list[str],
+        currency_code: str,
+        max_pages: int,
+        wave_size: int,
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, Any]:
+        """Fetch pages concurrently by `$skip` offset in waves."""
+
+        async def fetch_page(page_index: int) -> dict[str, Any]:
+            async with semaphore:
+                return await self.fetch_prices(
+                    filter_conditions=filter_conditions,
+                    currency_code=currency_code,
+                    skip=page_index * MAX_RESULTS_PER_REQUEST,
+                )
+
+        first = await fetch_page(0)
+        pages = [first]
+        complete = not first.get("NextPageLink")
+
+        while not complete and len(pages) < max_pages:
+            start = len(pages)
+            wave = range(start, min(start + wave_size, max_pages))
+            results = await asyncio.gather(*(fetch_page(index) for index in wave))
+            for page in results:
+                pages.append(page)
+                if len(page.get("Items", [])) < MAX_RESULTS_PER_REQUEST or not page.get("NextPageLink"):
+                    complete = True
+                    break
+
+        items = [item for page in pages for item in page.get("Items", [])]
+        return {
+            "Items": items,
+            "Count": len(items),
+            "Pages": len(pages),
+            "Complete": complete,
+        }
+
+    async def iter_price_pages(
+        self,
+        filter_conditions: list[str] | None = None,
+        currency_code: str = "USD",
+        limit: int | None = None,
+        max_pages: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over raw API pages, following NextPageLink lazily.
+
+        The next page is only requested when the consumer asks for it, so
+        breaking out of the loop early never costs an extra round trip.
+
+        Args:
+            filter_conditions: List of OData filter conditions
+            currency_code: Currency code for prices
+            limit: Stop once this many items have been yielded in total
+            max_pages: Stop after this many pages
+
+        Yields:
+            API response pages with Items and NextPageLink
+        """
+        page = await self.fetch_prices(
+            filter_conditions=filter_conditions,
+            currency_code=currency_code,
+            limit=limit,
+        )
+        pages = 1
+        seen = len(page.get("Items", []))
+        yield page
+
+        while True:
+            next_link = page.get("NextPageLink")
+            if not next_link:
+                return
+            if limit is not None and seen >= limit:
+                return
+            if max_pages is not None and pages >= max_pages:
+                return
+
+            page = await self._fetch_next_page(next_link)
+            pages += 1
+            seen += len(page.get("Items", []))
+            yield page
+
+    async def _fetch_next_page(self, next_link: str) -> dict[str, Any]:
+        """Follow a NextPageLink, answering `catalog:` links from the offline catalog."""
+        if next_link.startswith(CATALOG_LINK_PREFIX):
+            page = None
+            if self._catalog is not None:
+                page = await asyncio.to_thread(self._catalog.query_next_page, next_link)
+            if page is None:
+                raise ValueError(f"Cannot follow catalog page link: {next_link}")
+            return page
+        return await self._cached_request(url=next_link)
+
+    async def iter_prices(
+        self,
+        filter_conditions: list[str] | None = None,
+        currency_code: str = "USD",
+        limit: int | None = None,
+        max_pages: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over price items across all pages of a query.
+
+        Items are yielded page by page; stop iterating as soon as you have enough.
+
+        Args:
+            filter_conditions: List of OData filter conditions
+            currency_code: Currency code for prices
+            limit: Maximum number of items to yield
+            max_pages: Maximum number of pages to request
+
+        Yields:
+            Individual price items
+        """
+        yielded = 0
+        async for page in self.iter_price_pages(
+            filter_conditions=filter_conditions,
+            currency_code=currency_code,
+            limit=limit,
+            max_pages=max_pages,
+        ):
+            for item in page.get("Items", []):
+                if limit is not None and yielded >= limit:
+                    return
+                yielded += 1
+                yield item
 
     async def fetch_text(self, url: str, timeout: float = 10.0) -> str:
         """Fetch text content from a URL.
@@ -155,10 +696,43 @@ class AzurePricingClient:
             raise RuntimeError("HTTP session not initialized. Use 'async with' context manager.")
 
         try:
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
-                if response.status == 200:
-                    return await response.text()
-                return ""
+            response = await self.fetch_text_conditional(url, timeout=timeout)
         except Exception as e:
             logger.warning(f"Failed to fetch {url}: {e}")
             return ""
+        return response.text or ""
+
+    async def fetch_text_conditional(self, url: str, etag: str | None = None, timeout: float = 10.0) -> ConditionalText:
+        """Fetch text content with an `If-None-Match` conditional request.
+
+        Args:
+            url: URL to fetch
+            etag: ETag of the copy the caller already has, if any
+            timeout: Request timeout in seconds
+
+        Returns:
+            The new text and its ETag, or `not_modified` (with no text) when the
+            server answers 304 for the given ETag
+
+        Raises:
+            aiohttp.ClientError: On connection errors and statuses other than 200 and 304
+        """
+        if not self.session:
+            raise RuntimeError("HTTP session not initialized. Use 'async with' context manager.")
+
+        return await self._single_flight(
+            ("text", url, etag, timeout), lambda: self._fetch_text_conditional(url, etag, timeout)
+        )
+
+    async def _fetch_text_conditional(self, url: str, etag: str | None, timeout: float) -> ConditionalText:
+        """Fetch text content with a conditional request, without request coalescing."""
+        assert self.session is not None
+        headers = {"If-None-Match": etag} if etag else None
+        budget = current_budget()
+        if budget is not None:
+            budget.charge()
+        async with self.session.get(url, headers=headers, timeout=self._request_timeout(budget, timeout)) as response:
+            if response.status == 304:
+                return ConditionalText(text=None, etag=response.headers.get("ETag") or etag, not_modified=True)
+            response.raise_for_status()
+            return ConditionalText(text=await response.text(), etag=response.headers.get("ETag"))
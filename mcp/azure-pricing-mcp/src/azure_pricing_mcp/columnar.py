@@ -0,0 +1,225 @@
+"""Columnar price snapshots and vectorized analysis kernels.
+
+SKU comparisons and RI savings scan every item of a result that can hold tens
+of thousands of meters. `PriceColumns` turns a list of Retail Prices items into
+one array per field: `retailPrice` as float64, and the SKU and reservation term
+strings dictionary-encoded as integer codes. First rows per SKU and RI savings
+then run as NumPy array operations, and output dicts are only built for the
+rows that are kept. Per-region minimum prices are kept incrementally by
+`RegionMinimums` as result pages stream in.
+
+NumPy is optional (`pip install azure-pricing-mcp[columnar]`). Without it the
+same kernels run as plain Python loops and return identical results.
+"""
+
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+HOURS_PER_MONTH = 730
+HOURS_PER_YEAR = 8760
+
+# Code for a missing (None or empty) string value
+MISSING = -1
+
+
+def has_numpy() -> bool:
+    """Whether the vectorized NumPy kernels are available."""
+    return np is not None
+
+
+def reservation_term_hours(term: str | None) -> int:
+    """Hours covered by a reservation term such as "1 Year" or "3 Years"; 0 if unknown."""
+    if not term:
+        return 0
+    if "1 Year" in term:
+        return HOURS_PER_YEAR
+    if "3 Year" in term:
+        return 3 * HOURS_PER_YEAR
+    return 0
+
+
+def _encode(values: Iterable[Any]) -> tuple[Any, list[str]]:
+    """Dictionary-encode strings into integer codes and the list of distinct values."""
+    lookup: dict[str, int] = {}
+    codes = [lookup.setdefault(value, len(lookup)) if value else MISSING for value in values]
+    return _int_column(codes), list(lookup)
+
+
+def _int_column(values: list[int]) -> Any:
+    return np.asarray(values, dtype=np.int64) if np is not None else values
+
+
+def _float_column(values: list[float]) -> Any:
+    return np.asarray(values, dtype=np.float64) if np is not None else values
+
+
+def _mentions(item: dict[str, Any], word: str) -> bool:
+    """Whether the SKU or meter name of an item contains a word such as "Spot"."""
+    return word in (item.get("skuName") or "") or word in (item.get("meterName") or "")
+
+
+def is_interruptible(item: dict[str, Any]) -> bool:
+    """Whether an item is a Spot or Low Priority meter."""
+    return _mentions(item, "Spot") or _mentions(item, "Low Priority")
+
+
+class RISaving(NamedTuple):
+    """Savings of one Reserved Instance row against its On-Demand match."""
+
+    ri_row: int
+    od_row: int
+    ri_hourly: float
+    savings_percentage: float
+    break_even_months: float
+    annual_savings: float
+
+
+class PriceColumns:
+    """Column-oriented snapshot of Retail Prices items.
+
+    Columns are NumPy arrays when NumPy is installed and lists otherwise. The
+    source dicts stay in `items`, so kernels return row indexes and callers
+    only read the rows they keep.
+    """
+
+    def __init__(self, items: list[dict[str, Any]]) -> None:
+        """Build the snapshot.
+
+        Args:
+            items: Retail Prices API items
+        """
+        self.items = items
+        self.retail_price = _float_column([item.get("retailPrice") or 0.0 for item in items])
+        self.sku_codes, self.skus = _encode(item.get("skuName") for item in items)
+        self.term_codes, self.terms = _encode(item.get("reservationTerm") for item in items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def first_by_sku(self) -> dict[str, int]:
+        """Map each SKU name to its first row, in order of appearance."""
+        if np is not None:
+            codes, rows = np.unique(self.sku_codes, return_index=True)
+            return {self.skus[code]: row for code, row in zip(codes.tolist(), rows.tolist(), strict=True) if code >= 0}
+        first: dict[str, int] = {}
+        for row, code in enumerate(self.sku_codes):
+            if code != MISSING:
+                first.setdefault(self.skus[code], row)
+        return first
+
+
+class RegionMinimums:
+    """Running per-region minimum prices over a stream of result pages.
+
+    Only the cheapest regular and Spot / Low Priority item of each region is
+    kept; each page is folded in item by item and then discarded.
+    """
+
+    def __init__(self) -> None:
+        self.on_demand: dict[str, dict[str, Any]] = {}
+        self.spot: dict[str, dict[str, Any]] = {}
+        self.items_scanned = 0
+
+    def add(self, items: list[dict[str, Any]]) -> None:
+        """Fold one page of items into the running minimums.
+
+        Items without a region or with a zero price are ignored; ties keep the
+        earlier item.
+        """
+        self.items_scanned += len(items)
+        for item in items:
+            region = item.get("armRegionName")
+            price = item.get("retailPrice") or 0.0
+            if not region or price <= 0:
+                continue
+            minimums = self.spot if is_interruptible(item) else self.on_demand
+            best = minimums.get(region)
+            if best is None or price < (best.get("retailPrice") or 0.0):
+                minimums[region] = item
+
+
+def ri_savings(ri: PriceColumns, od: PriceColumns, matches: list[int]) -> list[RISaving]:
+    """Compare Reserved Instance rows with their On-Demand matches.
+
+    RI prices are upfront prices for the whole term and are turned into an
+    hourly rate using the reservation term; rows with an unknown term are
+    treated as hourly already. RI rows without a matching, non-zero On-Demand
+    price are skipped.
+
+    Args:
+        ri: Reservation items
+        od: Consumption (On-Demand) items
+        matches: For each RI row, its On-Demand row or -1
+
+    Returns:
+        One RISaving per matched RI row, in RI row order
+    """
+    if np is not None:
+        od_rows = np.asarray(matches, dtype=np.int64)
+        rows = np.flatnonzero(od_rows >= 0)
+        od_rows = od_rows[rows]
+        od_price = od.retail_price[od_rows]
+        priced = od_price > 0
+        rows, od_rows, od_price = rows[priced], od_rows[priced], od_price[priced]
+
+        term_hours = np.asarray([reservation_term_hours(term) for term in ri.terms] + [0], dtype=np.float64)
+        hours = term_hours[ri.term_codes[rows]]
+        ri_price = ri.retail_price[rows]
+        ri_hourly = np.where(hours > 0, ri_price / np.where(hours > 0, hours, 1.0), ri_price)
+        savings = (od_price - ri_hourly) / od_price * 100
+        break_even = np.where(ri_price > 0, ri_price / (od_price * HOURS_PER_MONTH), 0.0)
+        annual = (od_price - ri_hourly) * HOURS_PER_YEAR
+        return [
+            RISaving(*values)
+            for values in zip(
+                rows.tolist(),
+                od_rows.tolist(),
+                ri_hourly.tolist(),
+                savings.tolist(),
+                break_even.tolist(),
+                annual.tolist(),
+                strict=True,
+            )
+        ]
+
+    results = []
+    for row, od_row in enumerate(matches):
+        if od_row < 0 or od.retail_price[od_row] <= 0:
+            continue
+        od_price = od.retail_price[od_row]
+        ri_price = ri.retail_price[row]
+        term_code = ri.term_codes[row]
+        hours = reservation_term_hours(ri.terms[term_code] if term_code != MISSING else None)
+        ri_hourly = ri_price / hours if hours > 0 else ri_price
+        results.append(
+            RISaving(
+                row,
+                od_row,
+                ri_hourly,
+                (od_price - ri_hourly) / od_price * 100,
+                ri_price / (od_price * HOURS_PER_MONTH) if ri_price > 0 else 0.0,
+                (od_price - ri_hourly) * HOURS_PER_YEAR,
+            )
+        )
+    return results
+
+
+def percent_below_max(prices: list[float]) -> list[float]:
+    """Percentage by which each price is below the highest one (0.0 when all are zero)."""
+    if not prices:
+        return []
+    if np is not None:
+        values = np.asarray(prices, dtype=np.float64)
+        highest = values.max()
+        if highest <= 0:
+            return [0.0] * len(prices)
+        return ((highest - values) / highest * 100).tolist()  # type: ignore[no-any-return]
+    highest = max(prices)
+    if highest <= 0:
+        return [0.0] * len(prices)
+    return [(highest - price) / highest * 100 for price in prices]
@@ -8,9 +8,85 @@ AZURE_PRICING_BASE_URL = "https://prices.azure.com/api/retail/prices"
 DEFAULT_API_VERSION = "2023-01-01-preview"
 MAX_RESULTS_PER_REQUEST = 1000
 
+# Upper bound on NextPageLink pages followed for one logical query
+MAX_PAGES_PER_QUERY = int(os.environ.get("AZURE_PRICING_MAX_PAGES", "50"))
+
+# Pages of prices azure_discover_skus reads before reporting its SKU list as truncated
+SKU_DISCOVERY_MAX_PAGES = int(os.environ.get("AZURE_PRICING_SKU_DISCOVERY_MAX_PAGES", "5"))
+
+# Pages of On-Demand prices azure_ri_pricing reads at most to compare reservations with
+RI_ON_DEMAND_MAX_PAGES = int(os.environ.get("AZURE_PRICING_RI_ON_DEMAND_MAX_PAGES", "10"))
+
+# Maximum concurrent upstream requests for sharded fetches and region comparisons
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("AZURE_PRICING_MAX_CONCURRENCY", "8"))
+
+# Upper bound on regions compared by one azure_price_compare call
+COMPARE_MAX_REGIONS = int(os.environ.get("AZURE_PRICING_COMPARE_MAX_REGIONS", "60"))
+
+# Response cache configuration (in-memory TTL + LRU)
+# Set AZURE_PRICING_CACHE_SIZE=0 to disable caching
+CACHE_MAX_ENTRIES = int(os.environ.get("AZURE_PRICING_CACHE_SIZE", "512"))
+# When set, bounds the cache by approximate response size in bytes instead of entry count
+CACHE_MAX_BYTES = int(os.environ.get("AZURE_PRICING_CACHE_MAX_BYTES", "0"))
+CACHE_TTL_SECONDS = float(os.environ.get("AZURE_PRICING_CACHE_TTL", "3600"))
+
+# Persistent disk cache (SQLite) - disabled unless a directory is configured
+# Can also be set with the --cache-dir command-line flag
+DISK_CACHE_DIR = os.environ.get("AZURE_PRICING_CACHE_DIR") or None
+DISK_CACHE_FILENAME = "azure-pricing-cache.sqlite3"
+DISK_CACHE_MAX_BYTES = int(os.environ.get("AZURE_PRICING_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DISK_CACHE_TTL_SECONDS = float(os.environ.get("AZURE_PRICING_DISK_CACHE_TTL", "86400"))
+DISK_CACHE_ACCESS_RESOLUTION_SECONDS = 60.0  # reads refresh an entry's LRU position at most this often
+
+# Offline price catalog (see `azure-pricing-mcp catalog sync`); queries are answered locally when set
+# Can also be enabled with the --catalog command-line flag
+DEFAULT_CATALOG_PATH = "~/.cache/azure-pricing-mcp/catalog.sqlite3"
+CATALOG_PATH = os.environ.get("AZURE_PRICING_CATALOG") or None
+
+# Index of service, family and product names used to resolve service hints locally; rebuilt after this many seconds
+SERVICE_INDEX_TTL_SECONDS = float(os.environ.get("AZURE_PRICING_SERVICE_INDEX_TTL", "86400"))
+
+# Circuit breaker: after this many consecutive upstream failures, stop calling the API
+# and answer from the last cached response until a background probe succeeds (0 disables)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("AZURE_PRICING_CIRCUIT_THRESHOLD", "5"))
+CIRCUIT_PROBE_INTERVAL_SECONDS = float(os.environ.get("AZURE_PRICING_CIRCUIT_PROBE_INTERVAL", "30"))
+# Last-good responses kept in memory for stale serving, independent of the cache TTL
+STALE_CACHE_MAX_ENTRIES = int(os.environ.get("AZURE_PRICING_STALE_CACHE_SIZE", "1024"))
+
+# Speculative prefetch of likely follow-up queries after azure_price_search (opt-in)
+PREFETCH_ENABLED = os.environ.get("AZURE_PRICING_PREFETCH", "false").lower() == "true"
+PREFETCH_MAX_CALLS = int(os.environ.get("AZURE_PRICING_PREFETCH_MAX_CALLS", "6"))  # upstream calls per search
+PREFETCH_TIMEOUT_SECONDS = 30.0
+
+# Micro-batching (opt-in): concurrent queries that differ in one condition, such as the region,
+# are held for this window and merged into one OR-filtered upstream query (0 disables)
+BATCH_WINDOW_SECONDS = float(os.environ.get("AZURE_PRICING_BATCH_WINDOW_MS", "0")) / 1000
+BATCH_MAX_QUERIES = int(os.environ.get("AZURE_PRICING_BATCH_MAX_QUERIES", "20"))  # distinct queries per batch
+BATCH_MAX_PAGES = 5  # pages followed for one merged query
+
 # Retry and rate limiting configuration
 MAX_RETRIES = 3
-RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds
+RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds, upper bound on the pause after a 429 without Retry-After
+
+# Adaptive (AIMD) token-bucket rate limiter shared by all requests of one client
+RATE_LIMIT_INITIAL_RATE = float(os.environ.get("AZURE_PRICING_RATE_LIMIT", "5"))  # requests/second
+RATE_LIMIT_MIN_RATE = 0.5  # requests/second
+RATE_LIMIT_MAX_RATE = float(os.environ.get("AZURE_PRICING_RATE_LIMIT_MAX", "20"))  # requests/second
+RATE_LIMIT_INCREASE_STEP = 0.1  # requests/second added per successful request
+RATE_LIMIT_DECREASE_FACTOR = 0.5  # rate multiplier applied on each 429
+RATE_LIMIT_BURST = 5  # tokens available for short bursts
+# State file shared by server processes on one host so they draw from one rate budget
+RATE_LIMIT_STATE_FILE = os.environ.get("AZURE_PRICING_RATE_LIMIT_FILE") or None
+
+# Timeouts and per-tool-call budgets
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("AZURE_PRICING_HTTP_TIMEOUT", "30"))  # per upstream request
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+TOOL_TIMEOUT_SECONDS = float(os.environ.get("AZURE_PRICING_TOOL_TIMEOUT", "60"))  # deadline for one tool call
+# Maximum upstream HTTP attempts for one tool call; 0 means unlimited
+TOOL_MAX_UPSTREAM_CALLS = int(os.environ.get("AZURE_PRICING_TOOL_MAX_CALLS", "100")) or None
+# Maximum sub-calls of one azure_batch call; they share its deadline and upstream call budget
+TOOL_BATCH_MAX_CALLS = int(os.environ.get("AZURE_PRICING_TOOL_BATCH_MAX_CALLS", "50"))
+
 DEFAULT_CUSTOMER_DISCOUNT = 10.0  # percent
 
 # SSL verification configuration
@@ -24,6 +100,8 @@ SSL_VERIFY = os.environ.get("AZURE_PRICING_SSL_VERIFY", "true").lower() != "fals
 RETIRED_SIZES_URL = "https://raw.githubusercontent.com/MicrosoftDocs/azure-compute-docs/main/articles/virtual-machines/sizes/retirement/retired-sizes-list.md"
 PREVIOUS_GEN_URL = "https://raw.githubusercontent.com/MicrosoftDocs/azure-compute-docs/main/articles/virtual-machines/sizes/previous-gen-sizes-list.md"
 RETIREMENT_CACHE_TTL = timedelta(hours=24)
+# Wait before retrying after a failed background refresh of the retirement data
+RETIREMENT_RETRY_INTERVAL = timedelta(minutes=15)
 
 # Common service name mappings for fuzzy search
 # Maps user-friendly terms to official Azure service names
@@ -122,8 +200,13 @@ AZURE_RESOURCE_GRAPH_API_VERSION = "2022-10-01"
 # Azure Compute API configuration
 AZURE_COMPUTE_API_VERSION = "2024-07-01"
 
+# Pooled session for Spot VM requests: maximum open connections, and seconds idle ones are kept alive
+SPOT_CONNECTION_LIMIT = int(os.environ.get("AZURE_PRICING_SPOT_CONNECTION_LIMIT", "10"))
+SPOT_KEEPALIVE_SECONDS = float(os.environ.get("AZURE_PRICING_SPOT_KEEPALIVE", "60"))
+
 # Spot data cache configuration
 SPOT_CACHE_TTL = timedelta(hours=1)
+SPOT_CACHE_MAX_ENTRIES = 4096  # per cache: (sku, location) eviction rates and (sku, location, os_type) histories
 
 # Azure authentication scopes
 AZURE_MANAGEMENT_SCOPE = "https://management.azure.com/.default"
@@ -0,0 +1,208 @@
+"""Persistent SQLite cache shared by Azure Pricing MCP Server processes.
+
+Every stdio server starts with empty in-memory caches. The disk cache keeps
+Retail Prices responses and parsed retirement data across restarts, so a cold
+start is bound by disk reads instead of network round trips.
+
+The database runs in WAL mode, which lets several server processes read and
+write the same file concurrently.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import (
+    DISK_CACHE_ACCESS_RESOLUTION_SECONDS,
+    DISK_CACHE_FILENAME,
+    DISK_CACHE_MAX_BYTES,
+    DISK_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class DiskCache:
+    """SQLite-backed key/value cache with TTLs and size-bounded LRU eviction.
+
+    Values must be JSON-serializable. Methods are synchronous and thread-safe;
+    call them through `asyncio.to_thread` from async code.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DISK_CACHE_MAX_BYTES,
+        default_ttl: float = DISK_CACHE_TTL_SECONDS,
+        access_resolution: float = DISK_CACHE_ACCESS_RESOLUTION_SECONDS,
+    ) -> None:
+        """Open (or create) the cache database.
+
+        Args:
+            path: Database file path; parent directories are created
+            max_bytes: Approximate upper bound on stored value bytes
+            default_ttl: Entry lifetime in seconds when `set` gets no TTL
+            access_resolution: Seconds a read waits before refreshing an entry's
+                access time again, so most reads do not write to the database
+        """
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._max_bytes = max_bytes
+        self._default_ttl = default_ttl
+        self._access_resolution = access_resolution
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Running total of stored value bytes, so writes only sum the table when eviction may be due
+        # or another connection has changed the database (seen through PRAGMA data_version)
+        self._data_version = self._read_data_version()
+        self._total = self._stored_size()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        """Return a fresh cached value, or None if missing or expired."""
+        entry = self.get_with_age(key)
+        return None if entry is None else entry[0]
+
+    def get_with_age(self, key: str) -> tuple[Any, float] | None:
+        """Return (value, age in seconds) for a fresh entry, or None if missing or expired."""
+        entry = self.get_entry(key)
+        if entry is None or entry[1] < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[2]
+
+    def get_entry(self, key: str) -> tuple[Any, float, float] | None:
+        """Return (value, seconds until expiry, age in seconds), including expired entries.
+
+        A negative time-to-live means the entry has expired but not yet been evicted.
+        The access time used for LRU eviction is only written when it is older
+        than the access resolution: a write takes the database write lock and
+        makes other processes re-read the stored size.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at, accessed_at FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[3] >= self._access_resolution:
+                self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        value, created_at, expires_at, _ = row
+        return json.loads(value), expires_at - now, now - created_at
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value, evicting least recently used entries if over budget."""
+        payload = json.dumps(value, separators=(",", ":"))
+        size = len(payload)
+        if size > self._max_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self._default_ttl)
+        with self._lock:
+            data_version = self._read_data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._total = self._stored_size()
+            self._total -= self._entry_size(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, size, now, expires_at, now),
+            )
+            self._total += size
+            if self._total > self._max_bytes:
+                self._evict(now)
+
+    def _read_data_version(self) -> int:
+        """Counter that changes whenever another connection commits to the database."""
+        return int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def _stored_size(self) -> int:
+        """Sum the stored value bytes (a full table scan)."""
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+
+    def _entry_size(self, key: str) -> int:
+        """Stored value bytes of one entry, or 0 if it does not exist."""
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then LRU entries, until under the size budget."""
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        total = self._total = self._stored_size()
+
+        # Evict down to 90% so a full cache does not evict on every write
+        target = int(self._max_bytes * 0.9)
+        if total <= target:
+            return
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._total = total
+        logger.debug(f"Evicted {len(doomed)} entries from disk cache")
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._total -= self._entry_size(key)
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._total = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self._max_bytes,
+        }
+
+    @classmethod
+    def in_directory(cls, cache_dir: str | Path) -> "DiskCache":
+        """Open the default cache database inside a directory."""
+        return cls(Path(cache_dir).expanduser() / DISK_CACHE_FILENAME)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,252 @@
+"""Parser for the subset of OData `$filter` syntax the services send to the Retail Prices API.
+
+Supported expressions:
+- `field eq 'value'` and the other comparison operators (`ne`, `gt`, `ge`, `lt`, `le`)
+  with string or numeric literals
+- `contains(field, 'value')`
+- `and` / `or` with parentheses
+
+Anything else raises FilterSyntaxError, so callers can fall back to the API.
+Parsed filters can be compiled to SQL (see catalog.py) or to Python predicates
+over price items with `compile_predicate`.
+"""
+
+import operator
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+COMPARISON_OPERATORS = ("eq", "ne", "gt", "ge", "lt", "le")
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<number>-?\d+(?:\.\d+)?)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<punct>[(),]))"
+)
+
+
+class FilterSyntaxError(ValueError):
+    """Raised for filter expressions outside the supported subset."""
+
+
+class FilterEvaluationError(ValueError):
+    """Raised when an item cannot be matched against a filter with certainty."""
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """`field op value`."""
+
+    field: str
+    op: str
+    value: str | float
+
+
+@dataclass(frozen=True)
+class Contains:
+    """`contains(field, 'value')`."""
+
+    field: str
+    value: str
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    """`and` / `or` over two or more operands."""
+
+    op: str
+    operands: tuple["FilterNode", ...]
+
+
+FilterNode = Comparison | Contains | BoolOp
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    """Split a filter expression into (kind, text) tokens."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if match is None or match.end() == position:
+            raise FilterSyntaxError(f"Unexpected input at {position}: {text[position : position + 20]!r}")
+        kind = match.lastgroup
+        assert kind is not None
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser: or-expressions of and-expressions of terms."""
+
+    def __init__(self, text: str) -> None:
+        self._tokens = _tokenize(text)
+        self._index = 0
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self._tokens[self._index] if self._index < len(self._tokens) else None
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise FilterSyntaxError("Unexpected end of filter")
+        self._index += 1
+        return token
+
+    def _expect(self, text: str) -> None:
+        kind, value = self._next()
+        if value != text:
+            raise FilterSyntaxError(f"Expected {text!r}, got {value!r}")
+
+    def _keyword(self, word: str) -> bool:
+        token = self._peek()
+        if token is not None and token[0] == "name" and token[1].lower() == word:
+            self._index += 1
+            return True
+        return False
+
+    def parse(self) -> FilterNode:
+        node = self._or()
+        token = self._peek()
+        if token is not None:
+            raise FilterSyntaxError(f"Unexpected token {token[1]!r}")
+        return node
+
+    def _or(self) -> FilterNode:
+        operands = [self._and()]
+        while self._keyword("or"):
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else BoolOp("or", tuple(operands))
+
+    def _and(self) -> FilterNode:
+        operands = [self._term()]
+        while self._keyword("and"):
+            operands.append(self._term())
+        return operands[0] if len(operands) == 1 else BoolOp("and", tuple(operands))
+
+    def _term(self) -> FilterNode:
+        kind, value = self._next()
+        if value == "(":
+            node = self._or()
+            self._expect(")")
+            return node
+        if kind != "name":
+            raise FilterSyntaxError(f"Expected a field name, got {value!r}")
+        if value == "contains":
+            self._expect("(")
+            field = self._field()
+            self._expect(",")
+            literal = self._literal()
+            self._expect(")")
+            if not isinstance(literal, str):
+                raise FilterSyntaxError("contains() needs a string literal")
+            return Contains(field, literal)
+
+        op_kind, op = self._next()
+        if op_kind != "name" or op not in COMPARISON_OPERATORS:
+            raise FilterSyntaxError(f"Unsupported operator {op!r}")
+        return Comparison(value, op, self._literal())
+
+    def _field(self) -> str:
+        kind, value = self._next()
+        if kind != "name":
+            raise FilterSyntaxError(f"Expected a field name, got {value!r}")
+        return value
+
+    def _literal(self) -> str | float:
+        kind, value = self._next()
+        if kind == "string":
+            return value[1:-1].replace("''", "'")
+        if kind == "number":
+            return float(value)
+        raise FilterSyntaxError(f"Expected a literal, got {value!r}")
+
+
+def parse_filter(text: str) -> FilterNode:
+    """Parse one OData filter expression.
+
+    Raises:
+        FilterSyntaxError: If the expression uses unsupported syntax
+    """
+    return _Parser(text).parse()
+
+
+def parse_conditions(filter_conditions: list[str]) -> FilterNode | None:
+    """Parse a list of conditions that the client joins with `and`; None if empty."""
+    nodes = [parse_filter(condition) for condition in filter_conditions]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else BoolOp("and", tuple(nodes))
+
+
+Predicate = Callable[[dict[str, Any]], bool]
+
+_PYTHON_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+}
+
+
+def _field_value(item: dict[str, Any], field: str, numeric: bool) -> Any:
+    """Read a field for comparison, refusing values whose type does not match the literal."""
+    value = item.get(field)
+    if numeric:
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            raise FilterEvaluationError(f"{field} is not numeric: {value!r}")
+    elif not isinstance(value, str):
+        raise FilterEvaluationError(f"{field} is not a string: {value!r}")
+    return value
+
+
+def compile_predicate(node: FilterNode | None, casefold: bool = False) -> Predicate:
+    """Compile a parsed filter into a function that tests one price item.
+
+    String comparisons are case-sensitive unless `casefold` is set. Items that
+    lack a field, or hold a value whose type differs from the literal, raise
+    FilterEvaluationError instead of guessing how the API would treat them.
+
+    Args:
+        node: Parsed filter; None matches every item
+        casefold: Compare strings case-insensitively
+
+    Returns:
+        Predicate returning True for items the filter selects
+    """
+    if node is None:
+        return lambda item: True
+
+    if isinstance(node, BoolOp):
+        operands = [compile_predicate(operand, casefold) for operand in node.operands]
+        if node.op == "and":
+            return lambda item: all(predicate(item) for predicate in operands)
+        return lambda item: any(predicate(item) for predicate in operands)
+
+    field = node.field
+    if isinstance(node, Contains):
+        needle = node.value.casefold() if casefold else node.value
+
+        def contains(item: dict[str, Any]) -> bool:
+            value = _field_value(item, field, numeric=False)
+            return needle in (value.casefold() if casefold else value)
+
+        return contains
+
+    compare = _PYTHON_OPERATORS[node.op]
+    literal = node.value
+    if isinstance(literal, str):
+        expected = literal.casefold() if casefold else literal
+
+        def compare_string(item: dict[str, Any]) -> bool:
+            value = _field_value(item, field, numeric=False)
+            return compare(value.casefold() if casefold else value, expected)
+
+        return compare_string
+
+    def compare_number(item: dict[str, Any]) -> bool:
+        return compare(_field_value(item, field, numeric=True), literal)
+
+    return compare_number
@@ -199,6 +199,17 @@ def format_price_compare_response(result: dict[str, Any]) -> str:
 
     response_text += json.dumps(result["comparisons"], indent=2)
 
+    if result.get("skipped_regions"):
+        response_text += f"\n\n⚠️ Region limit reached; not compared: {', '.join(result['skipped_regions'])}"
+
+    if "timing" in result:
+        timing = result["timing"]
+        response_text += (
+            f"\n\n⏱️ {timing['regions_queried']} regions looked up in {timing['wall_clock_seconds']:.2f}s "
+            f"({timing['sequential_seconds']:.2f}s if run one after another, "
+            f"up to {timing['max_concurrency']} at a time)"
+        )
+
     return response_text
 
 
@@ -218,6 +229,11 @@ Total regions found: {result['total_regions_found']}
 Showing top: {result['showing_top']}
 """
 
+    if "pages_scanned" in result:
+        response_text += f"Prices scanned: {result['items_scanned']} in {result['pages_scanned']} pages\n"
+        if not result.get("complete", True):
+            response_text += "⚠️ Not every result page was scanned; a cheaper region may be missing\n"
+
     if "discount_applied" in result:
         response_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
 
@@ -329,11 +345,74 @@ Original Pricing (before discount):
     return estimate_text
 
 
+def format_bom_estimate_response(result: dict[str, Any]) -> str:
+    """Format the bill-of-materials estimate response for display."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    currency = result["currency"]
+    totals = result["totals"]
+    response_lines = [f"### Bill of Materials Estimate ({currency})\n"]
+    if "discount_applied" in result:
+        response_lines.append(
+            f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
+        )
+
+    response_lines.append("| # | Line | SKU | Region | Qty | Usage/month | Unit Price | Monthly | Yearly |")
+    response_lines.append("|---|------|-----|--------|-----|-------------|------------|---------|--------|")
+    for line in result["lines"]:
+        name = line.get("label") or line.get("service_name") or ""
+        if "error" in line:
+            response_lines.append(
+                f"| {line['line']} | {name} | {line.get('sku_name')} | {line.get('region')} | "
+                f"{line['quantity']} | - | - | ⚠️ {line['error']} | - |"
+            )
+            continue
+        if "hours_per_month" in line:
+            usage = f"{line['hours_per_month']:g} h"
+        else:
+            usage = f"{line['units_per_month']:g} × {line['unit_of_measure']}"
+        response_lines.append(
+            f"| {line['line']} | {name} | {line['sku_name']} | {line['region']} | {line['quantity']} | {usage} | "
+            f"{line['unit_price']} | {line['monthly_cost']:,.2f} | {line['yearly_cost']:,.2f} |"
+        )
+
+    response_lines.append("")
+    response_lines.append(
+        f"**Total:** {totals['monthly_cost']:,.2f} {currency}/month, {totals['yearly_cost']:,.2f} {currency}/year "
+        f"({totals['priced_lines']} lines priced"
+        + (f", {totals['failed_lines']} failed)" if totals["failed_lines"] else ")")
+    )
+
+    if result["savings_plan_totals"]:
+        response_lines.append("\n**With Savings Plans** (lines without a plan stay On-Demand):")
+        for plan in result["savings_plan_totals"]:
+            response_lines.append(
+                f"- {plan['term']}: {plan['monthly_cost']:,.2f}/month, {plan['yearly_cost']:,.2f}/year "
+                f"(saves {plan['annual_savings']:,.2f}/year, {plan['savings_percent']}%)"
+            )
+
+    lookups = result["lookups"]
+    if lookups["deduplicated"]:
+        response_lines.append(
+            f"\n{lookups['distinct']} distinct price lookups ({lookups['deduplicated']} duplicate lines reused)"
+        )
+    return "\n".join(response_lines)
+
+
 def format_discover_skus_response(result: dict[str, Any]) -> str:
     """Format the discover SKUs response for display."""
     skus = result.get("skus", [])
     if skus:
-        return f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n" + json.dumps(skus, indent=2)
+        response_text = f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n" + json.dumps(
+            skus, indent=2
+        )
+        if result.get("truncated"):
+            response_text += (
+                f"\n\n⚠️ Stopped after {result['pages_scanned']} pages of prices; more SKUs may exist. "
+                "Filter by region or price type to narrow the search."
+            )
+        return response_text
     else:
         return "No SKUs found for the specified service."
 
@@ -443,6 +522,21 @@ def format_ri_pricing_response(result: dict[str, Any]) -> str:
             response_lines.append(f"  - Est. Annual Savings: ${comp['annual_savings']:,}")
             response_lines.append("")
 
+    unmatched = result.get("unmatched", [])
+    if unmatched:
+        response_lines.append(f"### Not Compared ({len(unmatched)} reservations)")
+        for row in unmatched[:10]:
+            response_lines.append(f"- {row['sku']} ({row['region']}, {row['product_name']}) - {row['reason']}")
+        if len(unmatched) > 10:
+            response_lines.append(f"... and {len(unmatched) - 10} more.")
+        response_lines.append("")
+    if result.get("on_demand_complete") is False:
+        response_lines.append(
+            f"⚠️ Only {result['on_demand_scanned']:,} On-Demand prices were scanned "
+            f"(at most {result['on_demand_max_pages']} pages); "
+            "some reservations may lack a comparison.\n"
+        )
+
     if result.get("ri_items"):
         response_lines.append(f"### Raw RI Pricing ({result['count']} items)")
         for item in result["ri_items"][:10]:
@@ -453,12 +547,30 @@ def format_ri_pricing_response(result: dict[str, Any]) -> str:
             )
         if len(result["ri_items"]) > 10:
             response_lines.append(f"... and {len(result['ri_items']) - 10} more.")
+        if result.get("has_more"):
+            response_lines.append("More reservation prices exist; raise `limit` or narrow the filters to see them.")
     else:
         response_lines.append("No Reserved Instance pricing found for the given criteria.")
 
     return "\n".join(response_lines)
 
 
+def format_batch_response(results: list[dict[str, Any]], distinct_calls: int) -> str:
+    """Format the azure_batch response: one section per sub-call, in request order."""
+    failed = sum(1 for result in results if "error" in result)
+    summary = f"Batch of {len(results)} calls ({distinct_calls} distinct)"
+    if failed:
+        summary += f", {failed} failed"
+    sections = [f"## {summary}"]
+    for number, result in enumerate(results, 1):
+        header = f"### [{number}] {result['tool']}"
+        if result.get("duplicate"):
+            header += " (same as an earlier call)"
+        body = f"Error: {result['error']}" if "error" in result else result["text"]
+        sections.append(f"{header}\n\n{body}")
+    return "\n\n---\n\n".join(sections)
+
+
 # =============================================================================
 # Spot VM Tool Formatters
 # =============================================================================
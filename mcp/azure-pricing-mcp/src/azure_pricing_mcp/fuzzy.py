@@ -0,0 +1,323 @@
+"""Local fuzzy lookup of SKU and service names for "did you mean" suggestions.
+
+`TrigramIndex` narrows candidates by shared character trigrams and ranks them
+by edit distance, so a lookup touches a few dozen strings instead of the whole
+dictionary. `SkuIndex` keeps one such index per service and currency, built
+from the offline catalog or from one cached broad search of the service.
+`ServiceIndex` resolves service hints against every known service, family and
+product name.
+"""
+
+import heapq
+import time
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Generic, NamedTuple, TypeVar
+
+from cachetools import TTLCache
+
+from .config import CACHE_TTL_SECONDS, SERVICE_INDEX_TTL_SECONDS
+
+T = TypeVar("T")
+
+# Candidates ranked by edit distance after trigram filtering
+MAX_CANDIDATES = 50
+# Matches further apart than this fraction of the longer string are not suggested
+MAX_RELATIVE_DISTANCE = 0.6
+SKU_INDEX_MAX_SERVICES = 64
+
+# Item fields whose values are indexed as SKU names
+SKU_NAME_FIELDS = ("skuName", "armSkuName", "productName")
+
+
+def normalize_term(text: str) -> str:
+    """Case-fold a name and treat underscores like spaces ("Standard_D2s_v3" -> "standard d2s v3")."""
+    return " ".join(text.casefold().replace("_", " ").split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of a normalized term, padded so short terms and word starts count."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class Match(NamedTuple):
+    """One fuzzy lookup result."""
+
+    term: str
+    value: Any
+    distance: int
+    # Whether the query contains the term or the term contains the query (ignoring spaces)
+    contained: bool
+
+
+class TrigramIndex(Generic[T]):
+    """Fuzzy string dictionary: trigram overlap picks candidates, edit distance ranks them."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, T] = {}
+        self._postings: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, term: str, value: T) -> None:
+        """Index a term; the first value added for a normalized term is kept."""
+        key = normalize_term(term)
+        if not key or key in self._values:
+            return
+        self._values[key] = value
+        for gram in trigrams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def search(self, query: str, limit: int = 5) -> list[Match]:
+        """Find the terms closest to a query.
+
+        Terms containing the query rank first, then terms contained in it,
+        then the rest; each group is ordered by edit distance ignoring spaces.
+        Terms too far from the query are left out.
+
+        Args:
+            query: Name to look up
+            limit: Maximum number of matches
+
+        Returns:
+            Matches, best first
+        """
+        key = normalize_term(query)
+        if not key:
+            return []
+        overlap: Counter[str] = Counter()
+        for gram in trigrams(key):
+            overlap.update(self._postings.get(gram, ()))
+        candidates = heapq.nlargest(MAX_CANDIDATES, overlap, key=lambda term: (overlap[term], -len(term)))
+
+        compact_key = key.replace(" ", "")
+        ranked = []
+        for term in candidates:
+            compact_term = term.replace(" ", "")
+            distance = edit_distance(key, term)
+            if compact_key in compact_term:
+                tier = 0
+            elif compact_term in compact_key:
+                tier = 1
+            elif distance <= MAX_RELATIVE_DISTANCE * max(len(key), len(term)):
+                tier = 2
+            else:
+                continue
+            # Spacing differences ("D2sv3" vs "D2s v3") break ties before raw distance
+            ranked.append((tier, edit_distance(compact_key, compact_term), distance, term))
+        ranked.sort()
+        return [Match(term, self._values[term], distance, tier < 2) for tier, _, distance, term in ranked[:limit]]
+
+
+class SkuIndex:
+    """SKU name dictionaries per (service, currency) for local suggestions.
+
+    Each dictionary maps skuName, armSkuName and productName values to a
+    representative price item. Dictionaries expire with the response cache
+    TTL so suggested prices stay current.
+    """
+
+    def __init__(self, max_services: int = SKU_INDEX_MAX_SERVICES, ttl: float = CACHE_TTL_SECONDS) -> None:
+        self._indexes: TTLCache[tuple[str, str], TrigramIndex[dict[str, Any]]] = TTLCache(maxsize=max_services, ttl=ttl)
+
+    @staticmethod
+    def _key(service_name: str, currency_code: str) -> tuple[str, str]:
+        return service_name.casefold(), currency_code
+
+    def has_service(self, service_name: str, currency_code: str = "USD") -> bool:
+        """Whether a dictionary has been built for a service."""
+        return self._key(service_name, currency_code) in self._indexes
+
+    def build(self, service_name: str, items: Iterable[dict[str, Any]], currency_code: str = "USD") -> int:
+        """Build (or replace) the dictionary of a service from its price items.
+
+        Returns:
+            Number of distinct names indexed
+        """
+        index: TrigramIndex[dict[str, Any]] = TrigramIndex()
+        for item in items:
+            for name_field in SKU_NAME_FIELDS:
+                value = item.get(name_field)
+                if value:
+                    index.add(value, item)
+        self._indexes[self._key(service_name, currency_code)] = index
+        return len(index)
+
+    def suggest(
+        self, service_name: str, sku_name: str, currency_code: str = "USD", limit: int = 5
+    ) -> list[dict[str, Any]]:
+        """Suggest price items whose SKU or product name is close to `sku_name`.
+
+        Returns:
+            Up to `limit` items with distinct skuName values, best match first
+        """
+        index = self._indexes.get(self._key(service_name, currency_code))
+        if index is None:
+            return []
+        suggestions: dict[str, dict[str, Any]] = {}
+        for match in index.search(sku_name, limit=limit * 4):
+            sku = match.value.get("skuName")
+            if sku and sku not in suggestions:
+                suggestions[sku] = match.value
+                if len(suggestions) >= limit:
+                    break
+        return list(suggestions.values())
+
+
+@dataclass
+class ServiceEntry:
+    """One service known to a ServiceIndex."""
+
+    service_name: str
+    service_family: str | None = None
+    products: set[str] = field(default_factory=set)
+    # A few items of distinct products, shown with suggestions
+    sample_items: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ServiceMatch(NamedTuple):
+    """A service suggested for a hint and why."""
+
+    entry: ServiceEntry
+    reason: str
+
+
+class ServiceIndex:
+    """Distinct serviceName, serviceFamily and productName values with fuzzy lookup.
+
+    A hint is matched three ways: names containing it (or contained in it),
+    names sharing one of its words, and names within a small edit distance.
+    The index is rebuilt from a full list of items (such as the offline
+    catalog's distinct products) once it is older than `ttl` seconds, and
+    grows with items seen in search results in between.
+    """
+
+    def __init__(self, ttl: float = SERVICE_INDEX_TTL_SECONDS, max_samples: int = 3) -> None:
+        self._ttl = ttl
+        self._max_samples = max_samples
+        self.built_at: float | None = None
+        self._entries: dict[str, ServiceEntry] = {}
+        self._names: TrigramIndex[str] = TrigramIndex()
+        self._tokens: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_stale(self) -> bool:
+        """Whether the index has never been built or has outlived its TTL."""
+        return self.built_at is None or time.monotonic() - self.built_at >= self._ttl
+
+    def rebuild(self, items: Iterable[dict[str, Any]] = (), aliases: Mapping[str, str] | None = None) -> None:
+        """Replace the index contents.
+
+        Args:
+            items: Price items whose service, family and product names are indexed
+            aliases: Extra names (such as "vm") mapped to official service names
+        """
+        self._entries = {}
+        self._names = TrigramIndex()
+        self._tokens = {}
+        for alias, service_name in (aliases or {}).items():
+            self._index_name(alias, self._entry(service_name))
+        self.add_items(items)
+        self.built_at = time.monotonic()
+
+    def add_items(self, items: Iterable[dict[str, Any]]) -> None:
+        """Index the names of price items and keep samples of new products."""
+        for item in items:
+            service_name = item.get("serviceName")
+            if not service_name:
+                continue
+            key = self._entry(service_name)
+            entry = self._entries[key]
+            family = item.get("serviceFamily")
+            if family and entry.service_family is None:
+                entry.service_family = family
+                self._index_name(family, key)
+            product = item.get("productName")
+            if product and product in entry.products:
+                continue
+            if product:
+                entry.products.add(product)
+                self._index_name(product, key)
+            if len(entry.sample_items) < self._max_samples:
+                entry.sample_items.append(item)
+
+    def get(self, service_name: str) -> ServiceEntry | None:
+        """Look up a service by its exact name (case-insensitive)."""
+        return self._entries.get(service_name.casefold())
+
+    def lookup(self, hint: str, service_family: str | None = None, limit: int = 5) -> list[ServiceMatch]:
+        """Find the services a hint most likely refers to.
+
+        Args:
+            hint: Service name as typed by the user; may be empty when only a family is given
+            service_family: Only suggest services of this family (services of unknown family are kept)
+            limit: Maximum number of services
+
+        Returns:
+            Matches, best first
+        """
+        ranked: dict[str, tuple[tuple[int, int], str]] = {}
+
+        def consider(key: str, rank: tuple[int, int], reason: str) -> None:
+            entry = self._entries[key]
+            if service_family and entry.service_family and entry.service_family.casefold() != service_family.casefold():
+                return
+            if key not in ranked or rank < ranked[key][0]:
+                ranked[key] = (rank, reason)
+
+        if normalize_term(hint):
+            for match in self._names.search(hint, limit=limit * 4):
+                if match.contained:
+                    consider(match.value, (0, match.distance), f"Partial match for '{hint}'")
+                else:
+                    consider(match.value, (2, match.distance), f"Similar to '{hint}'")
+            hits: Counter[str] = Counter()
+            for word in set(normalize_term(hint).split()):
+                hits.update(self._tokens.get(word, ()))
+            for key, count in hits.items():
+                consider(key, (1, -count), f"Shares a word with '{hint}'")
+        elif service_family:
+            for key in self._tokens_of(service_family):
+                consider(key, (0, 0), f"In service family '{service_family}'")
+
+        best = sorted(ranked.items(), key=lambda pair: (pair[1][0], self._entries[pair[0]].service_name))
+        return [ServiceMatch(self._entries[key], reason) for key, (_, reason) in best[:limit]]
+
+    def _tokens_of(self, name: str) -> set[str]:
+        """Services having every word of a name among their indexed words."""
+        words = normalize_term(name).split()
+        keys = set(self._tokens.get(words[0], ())) if words else set()
+        for word in words[1:]:
+            keys &= self._tokens.get(word, set())
+        return keys
+
+    def _entry(self, service_name: str) -> str:
+        """Key of a service's entry, creating the entry if needed."""
+        key = service_name.casefold()
+        if key not in self._entries:
+            self._entries[key] = ServiceEntry(service_name)
+            self._index_name(service_name, key)
+        return key
+
+    def _index_name(self, name: str, key: str) -> None:
+        self._names.add(name, key)
+        for word in normalize_term(name).split():
+            self._tokens.setdefault(word, set()).add(key)
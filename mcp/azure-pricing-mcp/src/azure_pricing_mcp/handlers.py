@@ -1,13 +1,18 @@
 """Tool handlers for Azure Pricing MCP Server."""
 
+import asyncio
+import copy
+import json
 import logging
 from typing import Any
 
 from mcp.types import TextContent
 
-from .config import DEFAULT_CUSTOMER_DISCOUNT
+from .config import DEFAULT_CUSTOMER_DISCOUNT, MAX_CONCURRENT_REQUESTS, TOOL_BATCH_MAX_CALLS
 from .formatters import (
     _get_discount_tip,
+    format_batch_response,
+    format_bom_estimate_response,
     format_cost_estimate_response,
     format_customer_discount_response,
     format_discover_skus_response,
@@ -24,6 +29,22 @@ from .services import PricingService, SKUService, SpotService
 
 logger = logging.getLogger(__name__)
 
+# Tools azure_batch can call, and their handler methods. simulate_eviction is left out
+# because it acts on a VM rather than reading prices.
+BATCHABLE_TOOLS = {
+    "azure_price_search": "handle_price_search",
+    "azure_price_compare": "handle_price_compare",
+    "azure_cost_estimate": "handle_cost_estimate",
+    "azure_bom_estimate": "handle_bom_estimate",
+    "azure_discover_skus": "handle_discover_skus",
+    "azure_sku_discovery": "handle_sku_discovery",
+    "azure_region_recommend": "handle_region_recommend",
+    "azure_ri_pricing": "handle_ri_pricing",
+    "get_customer_discount": "handle_customer_discount",
+    "spot_eviction_rates": "handle_spot_eviction_rates",
+    "spot_price_history": "handle_spot_price_history",
+}
+
 
 class ToolHandlers:
     """Handlers for MCP tool calls."""
@@ -32,8 +53,16 @@ class ToolHandlers:
         self,
         pricing_service: PricingService,
         sku_service: SKUService,
-        spot_service: SpotService | None = None,
+        spot_service: SpotService,
     ) -> None:
+        """Initialize the handlers.
+
+        Args:
+            pricing_service: Pricing service
+            sku_service: SKU discovery service
+            spot_service: Spot service whose pooled session the owner opens and closes
+                (`async with`, as AzurePricingServer does)
+        """
         self._pricing_service = pricing_service
         self._sku_service = sku_service
         self._spot_service = spot_service
@@ -98,6 +127,14 @@ class ToolHandlers:
         result = await self._pricing_service.search_prices(**arguments)
         self._attach_discount_metadata(result, discount_pct, discount_specified, used_default)
 
+        if result.get("items"):
+            self._pricing_service.prefetch_follow_ups(
+                service_name=arguments.get("service_name"),
+                sku_name=arguments.get("sku_name"),
+                region=arguments.get("region"),
+                currency_code=arguments.get("currency_code", "USD"),
+            )
+
         response_text = format_price_search_response(result)
 
         # Add discount tip if appropriate
@@ -137,6 +174,16 @@ class ToolHandlers:
         response_text = format_cost_estimate_response(result)
         return [TextContent(type="text", text=response_text)]
 
+    async def handle_bom_estimate(self, arguments: dict[str, Any]) -> list[TextContent]:
+        """Handle azure_bom_estimate tool calls."""
+        discount_pct, discount_specified, used_default = self._resolve_discount(arguments)
+
+        result = await self._pricing_service.estimate_bom(**arguments)
+        self._attach_discount_metadata(result, discount_pct, discount_specified, used_default)
+
+        response_text = format_bom_estimate_response(result)
+        return [TextContent(type="text", text=response_text)]
+
     async def handle_discover_skus(self, arguments: dict[str, Any]) -> list[TextContent]:
         """Handle azure_discover_skus tool calls."""
         result = await self._sku_service.discover_skus(**arguments)
@@ -161,16 +208,69 @@ class ToolHandlers:
         response_text = format_ri_pricing_response(result)
         return [TextContent(type="text", text=response_text)]
 
-    def _get_spot_service(self) -> SpotService:
-        """Get or create the SpotService (lazy initialization)."""
-        if self._spot_service is None:
-            self._spot_service = SpotService()
-        return self._spot_service
+    async def handle_batch(self, arguments: dict[str, Any]) -> list[TextContent]:
+        """Handle azure_batch tool calls.
+
+        Sub-calls run concurrently (at most MAX_CONCURRENT_REQUESTS at a time)
+        within this call's request budget. Identical sub-calls run once and
+        share their result; a failing sub-call only reports its own error.
+        """
+        calls = arguments.get("calls") or []
+        if len(calls) > TOOL_BATCH_MAX_CALLS:
+            return [
+                TextContent(
+                    type="text",
+                    text=f"Error: azure_batch accepts at most {TOOL_BATCH_MAX_CALLS} calls, got {len(calls)}",
+                )
+            ]
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        runs: dict[str, asyncio.Future[list[TextContent]]] = {}
+
+        async def run(name: str, call_arguments: dict[str, Any]) -> list[TextContent]:
+            async with semaphore:
+                # Handlers modify their arguments, and duplicates share them
+                result: list[TextContent] = await getattr(self, BATCHABLE_TOOLS[name])(copy.deepcopy(call_arguments))
+                return result
+
+        keys: list[str | None] = []
+        results: list[dict[str, Any]] = []
+        for call in calls:
+            name = call.get("tool") if isinstance(call, dict) else None
+            item: dict[str, Any] = {"tool": name}
+            results.append(item)
+            if name not in BATCHABLE_TOOLS:
+                item["error"] = f"Tool {name!r} cannot be used in a batch"
+                keys.append(None)
+                continue
+            call_arguments = call.get("arguments") or {}
+            if not isinstance(call_arguments, dict):
+                item["error"] = "arguments must be an object"
+                keys.append(None)
+                continue
+            key = json.dumps([name, call_arguments], sort_keys=True, default=str)
+            if key in runs:
+                item["duplicate"] = True
+            else:
+                runs[key] = asyncio.ensure_future(run(name, call_arguments))
+            keys.append(key)
+
+        outcomes = dict(zip(runs, await asyncio.gather(*runs.values(), return_exceptions=True), strict=True))
+        for item, run_key in zip(results, keys, strict=True):
+            if run_key is None:
+                continue
+            outcome = outcomes[run_key]
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Batched call to {item['tool']} failed: {outcome}")
+                item["error"] = str(outcome) or type(outcome).__name__
+            else:
+                item["text"] = "\n\n".join(content.text for content in outcome)
+
+        return [TextContent(type="text", text=format_batch_response(results, distinct_calls=len(runs)))]
 
     async def handle_spot_eviction_rates(self, arguments: dict[str, Any]) -> list[TextContent]:
         """Handle spot_eviction_rates tool calls."""
-        spot_service = self._get_spot_service()
-        result = await spot_service.get_eviction_rates(
+        result = await self._spot_service.get_eviction_rates(
             skus=arguments["skus"],
             locations=arguments["locations"],
         )
@@ -179,8 +279,7 @@ class ToolHandlers:
 
     async def handle_spot_price_history(self, arguments: dict[str, Any]) -> list[TextContent]:
         """Handle spot_price_history tool calls."""
-        spot_service = self._get_spot_service()
-        result = await spot_service.get_price_history(
+        result = await self._spot_service.get_price_history(
             sku=arguments["sku"],
             location=arguments["location"],
             os_type=arguments.get("os_type", "linux"),
@@ -190,8 +289,7 @@ class ToolHandlers:
 
     async def handle_simulate_eviction(self, arguments: dict[str, Any]) -> list[TextContent]:
         """Handle simulate_eviction tool calls."""
-        spot_service = self._get_spot_service()
-        result = await spot_service.simulate_eviction(
+        result = await self._spot_service.simulate_eviction(
             vm_resource_id=arguments["vm_resource_id"],
         )
         response_text = format_simulate_eviction_response(result)
@@ -219,6 +317,12 @@ def register_tool_handlers(server: Any, tool_handlers: ToolHandlers) -> None:
             elif name == "azure_cost_estimate":
                 return await tool_handlers.handle_cost_estimate(arguments)
 
+            elif name == "azure_bom_estimate":
+                return await tool_handlers.handle_bom_estimate(arguments)
+
+            elif name == "azure_batch":
+                return await tool_handlers.handle_batch(arguments)
+
             elif name == "azure_discover_skus":
                 return await tool_handlers.handle_discover_skus(arguments)
 
@@ -0,0 +1,237 @@
+"""Client-side rate limiting for Azure Pricing API requests."""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+from .config import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_INCREASE_STEP,
+    RATE_LIMIT_INITIAL_RATE,
+    RATE_LIMIT_MAX_RATE,
+    RATE_LIMIT_MIN_RATE,
+    RATE_LIMIT_RETRY_BASE_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class BucketState:
+    """Token-bucket state; times are in seconds on the owning clock."""
+
+    rate: float
+    tokens: float
+    last_refill: float
+    paused_until: float = 0.0
+
+
+class SharedRateLimitState:
+    """Token-bucket state shared by processes on one host through a locked file.
+
+    Several server processes behind one egress IP are throttled together, so
+    they coordinate through a small JSON state file guarded by an exclusive
+    `fcntl.flock`. A 429 seen by any process slows every process down.
+    Wall-clock time is used so timestamps are comparable across processes.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        if fcntl is None:
+            raise RuntimeError("Shared rate limiting requires fcntl (POSIX systems only)")
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+
+    def update(self, initial: BucketState, mutate: Callable[[BucketState, float], T]) -> T:
+        """Apply `mutate(state, now)` to the shared state under an exclusive lock.
+
+        Args:
+            initial: State to start from when the file is empty or unreadable
+            mutate: Function that modifies the state in place and returns a result
+
+        Returns:
+            The value returned by `mutate`
+        """
+        assert fcntl is not None
+        with open(self.path, "r+", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    state = BucketState(**json.loads(handle.read() or "{}"))
+                except (TypeError, ValueError):
+                    state = replace(initial)
+                result = mutate(state, time.time())
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(asdict(state)))
+                handle.flush()
+                return result
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class AdaptiveRateLimiter:
+    """Token-bucket rate limiter with AIMD (additive increase, multiplicative decrease).
+
+    Every request acquires a token first. The refill rate grows by a fixed step
+    on each success and is cut by a factor on each 429, so throughput settles
+    near the real upstream limit instead of alternating between flooding and
+    sleeping. A throttle also pauses the bucket, for `Retry-After` seconds when
+    the server sends one.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = RATE_LIMIT_INITIAL_RATE,
+        min_rate: float = RATE_LIMIT_MIN_RATE,
+        max_rate: float = RATE_LIMIT_MAX_RATE,
+        increase_step: float = RATE_LIMIT_INCREASE_STEP,
+        decrease_factor: float = RATE_LIMIT_DECREASE_FACTOR,
+        burst: float = RATE_LIMIT_BURST,
+        shared_state: SharedRateLimitState | None = None,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            shared_state: Optional cross-process state; when given, the bucket and
+                backoff are shared with every other process using the same file
+        """
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._increase_step = increase_step
+        self._decrease_factor = decrease_factor
+        self._burst = max(1.0, burst)
+        initial = min(max(initial_rate, min_rate), max_rate)
+        self._state = BucketState(rate=initial, tokens=self._burst, last_refill=time.monotonic())
+        self._shared_state = shared_state
+        self._lock = asyncio.Lock()
+        self.throttle_count = 0
+
+    @property
+    def rate(self) -> float:
+        """Current allowed request rate in requests per second.
+
+        With shared state this is the rate this process last saw in the state
+        file; reading it never touches the file.
+        """
+        return self._state.rate
+
+    def _update_shared(self, mutate: Callable[[BucketState, float], T]) -> T:
+        """Apply a state change to the cross-process state; blocking, so run it in a thread."""
+        assert self._shared_state is not None
+        initial = BucketState(rate=self._state.rate, tokens=self._burst, last_refill=time.time())
+
+        def apply(state: BucketState, now: float) -> T:
+            result = mutate(state, now)
+            self._state.rate = state.rate
+            return result
+
+        return self._shared_state.update(initial, apply)
+
+    async def _apply(self, mutate: Callable[[BucketState, float], T]) -> T:
+        """Apply a state change to the local state, or to the shared state off the event loop."""
+        if self._shared_state is not None:
+            return await asyncio.to_thread(self._update_shared, mutate)
+        return mutate(self._state, time.monotonic())
+
+    def _take(self, state: BucketState, now: float) -> float:
+        """Take a token if available; return how long to wait otherwise."""
+        if now < state.paused_until:
+            return state.paused_until - now
+        elapsed = now - state.last_refill
+        if elapsed > 0:
+            state.tokens = min(self._burst, state.tokens + elapsed * state.rate)
+            state.last_refill = now
+        if state.tokens >= 1:
+            state.tokens -= 1
+            return 0.0
+        return (1 - state.tokens) / state.rate
+
+    def _increase(self, state: BucketState, now: float) -> None:
+        """Additive increase."""
+        state.rate = min(self._max_rate, state.rate + self._increase_step)
+
+    def _decrease(self, state: BucketState, now: float, retry_after: float | None) -> tuple[float, float]:
+        """Multiplicative decrease plus a pause; returns the pause in seconds and the new rate."""
+        state.rate = max(self._min_rate, state.rate * self._decrease_factor)
+        pause = retry_after if retry_after is not None else min(RATE_LIMIT_RETRY_BASE_WAIT, 1 / state.rate)
+        state.paused_until = max(state.paused_until, now + pause)
+        state.tokens = 0.0
+        state.last_refill = max(now, state.paused_until)
+        return pause, state.rate
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                wait = await self._apply(self._take)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def on_success(self) -> None:
+        """Additively increase the rate after a successful request."""
+        await self._apply(self._increase)
+
+    async def on_throttle(self, retry_after: float | None = None) -> float:
+        """Multiplicatively decrease the rate and pause after a 429.
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if present
+
+        Returns:
+            The pause applied, in seconds
+        """
+        self.throttle_count += 1
+        pause, rate = await self._apply(lambda state, now: self._decrease(state, now, retry_after))
+        logger.warning(f"Rate limited (429). Slowing to {rate:.2f} req/s, pausing {pause:.1f}s")
+        return pause
+
+
+def create_rate_limiter(state_file: str | Path | None = None) -> AdaptiveRateLimiter:
+    """Create a rate limiter, shared across processes when a state file is given.
+
+    Falls back to a per-process limiter with a warning when the platform does
+    not support file locking.
+    """
+    if state_file is None:
+        return AdaptiveRateLimiter()
+    try:
+        shared_state = SharedRateLimitState(state_file)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Shared rate limiting disabled, using a per-process limiter: {e}")
+        return AdaptiveRateLimiter()
+    logger.info(f"Sharing rate limit budget through {shared_state.path}")
+    return AdaptiveRateLimiter(shared_state=shared_state)
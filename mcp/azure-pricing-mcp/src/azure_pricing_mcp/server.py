@@ -17,15 +17,32 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
+from .budget import BudgetExceededError, request_budget
+from .catalog import PriceCatalog, catalog_main
+from .circuit import CircuitOpenError
 from .client import AzurePricingClient
+from .config import (
+    CATALOG_PATH,
+    DEFAULT_CATALOG_PATH,
+    DISK_CACHE_DIR,
+    PREFETCH_ENABLED,
+    RATE_LIMIT_STATE_FILE,
+    TOOL_MAX_UPSTREAM_CALLS,
+    TOOL_TIMEOUT_SECONDS,
+)
+from .disk_cache import DiskCache
 from .handlers import ToolHandlers
-from .services import PricingService, RetirementService, SKUService
+from .ratelimit import create_rate_limiter
+from .services import PricingService, RetirementService, SKUService, SpeculativePrefetcher, SpotService
 from .tools import get_tool_definitions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Extra time allowed for formatting partial results after the budget deadline
+TOOL_DEADLINE_GRACE_SECONDS = 1.0
+
 
 class AzurePricingServer:
     """Azure Pricing MCP Server - coordinates all services.
@@ -38,25 +55,54 @@ class AzurePricingServer:
             result = await pricing_server.tool_handlers.handle_price_search(...)
     """
 
-    def __init__(self) -> None:
-        self._client = AzurePricingClient()
+    def __init__(
+        self, cache_dir: str | None = None, rate_limit_file: str | None = None, catalog_path: str | None = None
+    ) -> None:
+        """Initialize the server and its services.
+
+        Args:
+            cache_dir: Directory for the persistent SQLite cache. Defaults to
+                AZURE_PRICING_CACHE_DIR; the disk cache is disabled when neither is set.
+            rate_limit_file: State file shared with other server processes on this host
+                so they draw from one upstream rate budget. Defaults to
+                AZURE_PRICING_RATE_LIMIT_FILE; the limiter is per-process when neither is set.
+            catalog_path: Offline price catalog to answer queries from (see
+                `azure-pricing-mcp catalog sync`). Defaults to AZURE_PRICING_CATALOG.
+        """
+        cache_dir = cache_dir or DISK_CACHE_DIR
+        self._disk_cache = DiskCache.in_directory(cache_dir) if cache_dir else None
+        rate_limiter = create_rate_limiter(rate_limit_file or RATE_LIMIT_STATE_FILE)
+        catalog_path = catalog_path or CATALOG_PATH
+        catalog = PriceCatalog(catalog_path) if catalog_path else None
+        if catalog is not None and not catalog.stats()["currencies"]:
+            logger.warning(f"Price catalog {catalog.path} is empty; run 'azure-pricing-mcp catalog sync'")
+        self._client = AzurePricingClient(disk_cache=self._disk_cache, rate_limiter=rate_limiter, catalog=catalog)
         self._retirement_service = RetirementService(self._client)
-        self._pricing_service = PricingService(self._client, self._retirement_service)
+        prefetcher = None
+        if PREFETCH_ENABLED:
+            prefetcher = SpeculativePrefetcher(is_busy=lambda: self._client.inflight_requests > 0)
+        self._pricing_service = PricingService(self._client, self._retirement_service, prefetcher)
         self._sku_service = SKUService(self._pricing_service)
-        self._tool_handlers = ToolHandlers(self._pricing_service, self._sku_service)
+        self._spot_service = SpotService()
+        self._tool_handlers = ToolHandlers(self._pricing_service, self._sku_service, self._spot_service)
         self._session_active = False
 
     async def __aenter__(self) -> "AzurePricingServer":
-        """Async context manager entry - initializes the HTTP session."""
+        """Async context manager entry - initializes the HTTP sessions."""
         if not self._session_active:
             await self._client.__aenter__()
+            await self._spot_service.__aenter__()
             self._session_active = True
+            await self._retirement_service.start()
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        """Async context manager exit - closes the HTTP session."""
+        """Async context manager exit - closes the HTTP sessions."""
         if self._session_active:
+            await self._cancel_background_work()
+            await self._spot_service.__aexit__(exc_type, exc_val, exc_tb)
             await self._client.__aexit__(exc_type, exc_val, exc_tb)
+            await self._close_disk_cache()
             self._session_active = False
 
     async def initialize(self) -> None:
@@ -67,7 +113,9 @@ class AzurePricingServer:
         """
         if not self._session_active:
             await self._client.__aenter__()
+            await self._spot_service.__aenter__()
             self._session_active = True
+            await self._retirement_service.start()
 
     async def shutdown(self) -> None:
         """Shutdown the server's HTTP session.
@@ -75,9 +123,23 @@ class AzurePricingServer:
         Call this method to close the session when not using context manager.
         """
         if self._session_active:
+            await self._cancel_background_work()
+            await self._spot_service.__aexit__(None, None, None)
             await self._client.__aexit__(None, None, None)
+            await self._close_disk_cache()
             self._session_active = False
 
+    async def _cancel_background_work(self) -> None:
+        """Cancel background tasks that would use the HTTP session."""
+        await self._retirement_service.aclose()
+        if self._pricing_service.prefetcher is not None:
+            await self._pricing_service.prefetcher.aclose()
+
+    async def _close_disk_cache(self) -> None:
+        """Close the disk cache database once nothing can write to it any more."""
+        if self._disk_cache is not None:
+            await asyncio.to_thread(self._disk_cache.close)
+
     @property
     def is_active(self) -> bool:
         """Check if the HTTP session is active."""
@@ -102,48 +164,103 @@ def _register_tool_handlers(server: Server, pricing_server: AzurePricingServer)
         if not pricing_server.is_active:
             return [TextContent(type="text", text="Error: Server session not initialized")]
 
-        handlers = pricing_server.tool_handlers
-
-        if name == "azure_price_search":
-            return await handlers.handle_price_search(arguments)
-        elif name == "azure_price_compare":
-            return await handlers.handle_price_compare(arguments)
-        elif name == "azure_cost_estimate":
-            return await handlers.handle_cost_estimate(arguments)
-        elif name == "azure_discover_skus":
-            return await handlers.handle_discover_skus(arguments)
-        elif name == "azure_sku_discovery":
-            return await handlers.handle_sku_discovery(arguments)
-        elif name == "azure_region_recommend":
-            return await handlers.handle_region_recommend(arguments)
-        elif name == "azure_ri_pricing":
-            return await handlers.handle_ri_pricing(arguments)
-        elif name == "get_customer_discount":
-            return await handlers.handle_customer_discount(arguments)
-        elif name == "spot_eviction_rates":
-            return await handlers.handle_spot_eviction_rates(arguments)
-        elif name == "spot_price_history":
-            return await handlers.handle_spot_price_history(arguments)
-        elif name == "simulate_eviction":
-            return await handlers.handle_simulate_eviction(arguments)
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+        return await _call_with_budget(pricing_server.tool_handlers, name, arguments)
 
 
-@overload
-def create_server(return_pricing_server: Literal[True] = ...) -> tuple[Server, AzurePricingServer]: ...
+async def _call_with_budget(handlers: ToolHandlers, name: str, arguments: dict[str, Any]) -> Any:
+    """Run one tool call under a deadline and upstream call budget.
+
+    Services stop early when the budget runs out and return partial results,
+    which get a truncation note appended; results built from stale cached data
+    get a staleness note. The call is abandoned shortly after the deadline if it
+    is still running.
+    """
+    with request_budget(TOOL_TIMEOUT_SECONDS, TOOL_MAX_UPSTREAM_CALLS) as budget:
+        try:
+            result = await asyncio.wait_for(
+                _dispatch_tool(handlers, name, arguments), budget.remaining + TOOL_DEADLINE_GRACE_SECONDS
+            )
+        except BudgetExceededError as e:
+            logger.warning(f"Tool {name} exceeded its request budget: {e}")
+            return [TextContent(type="text", text=f"Error: {name} stopped before returning any results: {e}.")]
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {name} did not finish within {budget.timeout:g}s")
+            return [TextContent(type="text", text=f"Error: {name} did not finish within {budget.timeout:g}s.")]
+        except CircuitOpenError as e:
+            return [TextContent(type="text", text=f"Error: {e} and no cached data is available for this query.")]
+
+        if isinstance(result, list):
+            if budget.stale_age is not None:
+                result.append(TextContent(type="text", text=f"⚠️ {budget.stale_note()}"))
+            if budget.truncated:
+                result.append(TextContent(type="text", text=f"⚠️ {budget.note()}"))
+        return result
+
+
+async def _dispatch_tool(handlers: ToolHandlers, name: str, arguments: dict[str, Any]) -> Any:
+    """Route a tool call to its handler."""
+    if name == "azure_price_search":
+        return await handlers.handle_price_search(arguments)
+    elif name == "azure_price_compare":
+        return await handlers.handle_price_compare(arguments)
+    elif name == "azure_cost_estimate":
+        return await handlers.handle_cost_estimate(arguments)
+    elif name == "azure_bom_estimate":
+        return await handlers.handle_bom_estimate(arguments)
+    elif name == "azure_batch":
+        return await handlers.handle_batch(arguments)
+    elif name == "azure_discover_skus":
+        return await handlers.handle_discover_skus(arguments)
+    elif name == "azure_sku_discovery":
+        return await handlers.handle_sku_discovery(arguments)
+    elif name == "azure_region_recommend":
+        return await handlers.handle_region_recommend(arguments)
+    elif name == "azure_ri_pricing":
+        return await handlers.handle_ri_pricing(arguments)
+    elif name == "get_customer_discount":
+        return await handlers.handle_customer_discount(arguments)
+    elif name == "spot_eviction_rates":
+        return await handlers.handle_spot_eviction_rates(arguments)
+    elif name == "spot_price_history":
+        return await handlers.handle_spot_price_history(arguments)
+    elif name == "simulate_eviction":
+        return await handlers.handle_simulate_eviction(arguments)
+    else:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
 
 @overload
-def create_server(return_pricing_server: Literal[False]) -> Server: ...
+def create_server(
+    return_pricing_server: Literal[True] = ...,
+    cache_dir: str | None = ...,
+    rate_limit_file: str | None = ...,
+    catalog_path: str | None = ...,
+) -> tuple[Server, AzurePricingServer]: ...
 
 
-def create_server(return_pricing_server: bool = True) -> Server | tuple[Server, AzurePricingServer]:
+@overload
+def create_server(
+    return_pricing_server: Literal[False],
+    cache_dir: str | None = ...,
+    rate_limit_file: str | None = ...,
+    catalog_path: str | None = ...,
+) -> Server: ...
+
+
+def create_server(
+    return_pricing_server: bool = True,
+    cache_dir: str | None = None,
+    rate_limit_file: str | None = None,
+    catalog_path: str | None = None,
+) -> Server | tuple[Server, AzurePricingServer]:
     """Create and configure the MCP server instance.
 
     Args:
         return_pricing_server: If True (default), returns tuple (Server, AzurePricingServer).
                               If False, returns only the Server (for simpler usage).
+        cache_dir: Optional directory for the persistent SQLite price cache.
+        rate_limit_file: Optional state file for a rate budget shared across processes.
+        catalog_path: Optional offline price catalog to answer queries from.
 
     Returns:
         Server or tuple[Server, AzurePricingServer] depending on return_pricing_server flag.
@@ -159,7 +276,7 @@ def create_server(return_pricing_server: bool = True) -> Server | tuple[Server,
         for the previous behavior of returning only the Server.
     """
     server = Server("azure-pricing")
-    pricing_server = AzurePricingServer()
+    pricing_server = AzurePricingServer(cache_dir=cache_dir, rate_limit_file=rate_limit_file, catalog_path=catalog_path)
 
     @server.list_tools()
     async def handle_list_tools() -> list[Tool]:
@@ -181,8 +298,15 @@ async def main() -> None:
     - Initializing the pricing server session (kept alive for all tool calls)
     - Running the appropriate transport (stdio or HTTP)
     - Properly shutting down resources on exit
+
+    `azure-pricing-mcp catalog ...` manages the offline price catalog instead.
     """
     import argparse
+    import sys
+
+    if sys.argv[1:2] == ["catalog"]:
+        await catalog_main(sys.argv[2:])
+        return
 
     parser = argparse.ArgumentParser(description="Azure Pricing MCP Server")
     parser.add_argument(
@@ -203,9 +327,34 @@ async def main() -> None:
         help="Port for HTTP server (default: 8080)",
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for a persistent SQLite price cache shared across restarts (default: AZURE_PRICING_CACHE_DIR)",
+    )
+
+    parser.add_argument(
+        "--rate-limit-file",
+        default=None,
+        help="State file that lets server processes on one host share a rate budget "
+        "(default: AZURE_PRICING_RATE_LIMIT_FILE)",
+    )
+
+    parser.add_argument(
+        "--catalog",
+        nargs="?",
+        const=DEFAULT_CATALOG_PATH,
+        default=None,
+        metavar="PATH",
+        help="Answer queries from an offline price catalog built with 'catalog sync' "
+        f"(default path: {DEFAULT_CATALOG_PATH}; env: AZURE_PRICING_CATALOG)",
+    )
+
     args, _ = parser.parse_known_args()
 
-    server, pricing_server = create_server()
+    server, pricing_server = create_server(
+        cache_dir=args.cache_dir, rate_limit_file=args.rate_limit_file, catalog_path=args.catalog
+    )
 
     # Initialize the pricing server session ONCE and keep it alive
     # This avoids creating a new HTTP session for every tool call
@@ -1,8 +1,9 @@
 """Services package for Azure Pricing MCP Server."""
 
+from .prefetch import SpeculativePrefetcher
 from .pricing import PricingService
 from .retirement import RetirementService
 from .sku import SKUService
 from .spot import SpotService
 
-__all__ = ["PricingService", "RetirementService", "SKUService", "SpotService"]
+__all__ = ["PricingService", "RetirementService", "SKUService", "SpeculativePrefetcher", "SpotService"]
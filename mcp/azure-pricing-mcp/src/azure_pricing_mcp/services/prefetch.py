@@ -0,0 +1,82 @@
+"""Speculative prefetching of likely follow-up queries."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..budget import BudgetExceededError, request_budget
+from ..config import PREFETCH_MAX_CALLS, PREFETCH_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Poll interval while waiting for foreground requests to finish
+_IDLE_POLL_SECONDS = 0.05
+
+PrefetchQuery = Callable[[], Awaitable[Any]]
+
+
+class SpeculativePrefetcher:
+    """Warm the response cache with queries an agent is likely to make next.
+
+    Queries run in the background, one at a time, under their own request
+    budget so they never use a tool call's budget. Before each query the
+    prefetcher waits until no foreground request is in flight, so speculative
+    work only uses idle capacity. Results are not returned; the point is that
+    the next tool call finds them in the response cache.
+    """
+
+    def __init__(
+        self,
+        is_busy: Callable[[], bool] | None = None,
+        max_calls: int = PREFETCH_MAX_CALLS,
+        timeout: float = PREFETCH_TIMEOUT_SECONDS,
+    ) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            is_busy: Returns True while foreground requests are in flight
+            max_calls: Upstream calls allowed for one batch of prefetches
+            timeout: Seconds allowed for one batch of prefetches
+        """
+        self._is_busy = is_busy or (lambda: False)
+        self._max_calls = max_calls
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(1)
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.completed = 0
+        self.failed = 0
+
+    def schedule(self, queries: list[PrefetchQuery]) -> asyncio.Task[None] | None:
+        """Run a batch of prefetch queries in the background."""
+        if not queries or self._max_calls <= 0:
+            return None
+        task = asyncio.ensure_future(self._run(queries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, queries: list[PrefetchQuery]) -> None:
+        """Run queries sequentially within the prefetch budget."""
+        async with self._semaphore:
+            # A fresh budget replaces the scheduling tool call's budget in this task's context
+            with request_budget(self._timeout, self._max_calls) as budget:
+                for query in queries:
+                    while self._is_busy() and budget.remaining > 0:
+                        await asyncio.sleep(_IDLE_POLL_SECONDS)
+                    try:
+                        await query()
+                        self.completed += 1
+                    except BudgetExceededError:
+                        logger.debug("Prefetch budget exhausted")
+                        return
+                    except Exception as e:
+                        self.failed += 1
+                        logger.debug(f"Prefetch failed: {e}")
+
+    async def aclose(self) -> None:
+        """Cancel pending prefetches."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
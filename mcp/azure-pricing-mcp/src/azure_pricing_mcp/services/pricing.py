@@ -1,14 +1,37 @@
 """Pricing service for Azure Pricing MCP Server."""
 
+import asyncio
 import logging
+import math
+import time
 from typing import Any
 
+from ..budget import BudgetExceededError
 from ..client import AzurePricingClient
-from ..config import DEFAULT_CUSTOMER_DISCOUNT
+from ..columnar import PriceColumns, RegionMinimums, is_interruptible, percent_below_max, ri_savings
+from ..config import (
+    COMPARE_MAX_REGIONS,
+    DEFAULT_CUSTOMER_DISCOUNT,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_PAGES_PER_QUERY,
+    RI_ON_DEMAND_MAX_PAGES,
+)
+from ..fuzzy import SkuIndex
+from .prefetch import PrefetchQuery, SpeculativePrefetcher
 from .retirement import RetirementService
 
 logger = logging.getLogger(__name__)
 
+# Search sizes used by the follow-up tools; shared with the prefetcher so warmed
+# cache entries have exactly the keys those tools will look up
+COST_ESTIMATE_SEARCH_LIMIT = 5
+HOURS_PER_MONTH = 730
+# Upper bound on lines of one bill-of-materials estimate
+BOM_MAX_LINES = 200
+RI_PRICING_DEFAULT_LIMIT = 50
+# Items of a broad service search used to build its SKU index when no catalog is configured
+SKU_INDEX_SEARCH_LIMIT = 1000
+
 # SKU tier keywords that appear in productName but not skuName
 # Maps user-friendly terms to Azure API productName patterns
 TIER_KEYWORDS = {
@@ -71,12 +94,94 @@ def is_tier_keyword(sku_name: str) -> str | None:
     return TIER_KEYWORDS.get(lower)
 
 
+def build_search_filters(
+    service_name: str | None = None,
+    service_family: str | None = None,
+    region: str | None = None,
+    sku_name: str | None = None,
+    price_type: str | None = None,
+) -> list[str]:
+    """Build the OData filter conditions used by search_prices.
+
+    SKU name handling:
+    - If sku_name is a tier keyword (Basic, Standard, Premium, etc.),
+      search BOTH productName AND skuName since Azure API is inconsistent:
+      - SQL Database: skuName='B', productName='SQL Database Single Basic'
+      - Service Bus: skuName='Basic', productName='Service Bus'
+    - Otherwise, search skuName as usual.
+    """
+    filter_conditions = []
+
+    if service_name:
+        filter_conditions.append(f"serviceName eq '{service_name}'")
+    if service_family:
+        filter_conditions.append(f"serviceFamily eq '{service_family}'")
+    if region:
+        filter_conditions.append(f"armRegionName eq '{region}'")
+
+    # Check if sku_name is a tier keyword that should search both productName and skuName
+    tier_keyword = is_tier_keyword(sku_name) if sku_name else None
+    if tier_keyword:
+        # Search both productName and skuName for tier keywords using OR
+        # This handles both patterns:
+        # - "contains(productName, 'Basic')" for SQL Database Single Basic
+        # - "contains(skuName, 'Basic')" for Service Bus Basic
+        filter_conditions.append(f"(contains(productName, '{tier_keyword}') or contains(skuName, '{tier_keyword}'))")
+    elif sku_name:
+        # Search skuName for specific SKU names (e.g., "D2s_v3")
+        filter_conditions.append(f"contains(skuName, '{sku_name}')")
+
+    if price_type:
+        filter_conditions.append(f"priceType eq '{price_type}'")
+
+    return filter_conditions
+
+
+def build_ri_filters(
+    price_type: str,
+    service_name: str | None = None,
+    region: str | None = None,
+    sku_name: str | None = None,
+) -> list[str]:
+    """Build the OData filter conditions used by get_ri_pricing for one price type."""
+    filter_conditions = [f"priceType eq '{price_type}'"]
+    if service_name:
+        filter_conditions.append(f"serviceName eq '{service_name}'")
+    if region:
+        filter_conditions.append(f"armRegionName eq '{region}'")
+    if sku_name:
+        filter_conditions.append(f"contains(skuName, '{sku_name}')")
+    return filter_conditions
+
+
+def ri_join_key(item: dict[str, Any]) -> tuple[str | None, str | None, str | None]:
+    """Key joining a Reserved Instance meter with its On-Demand meter.
+
+    One armSkuName appears in several products (Linux and Windows VM series,
+    for example), so the product is part of the key along with the region.
+    """
+    return item.get("armSkuName"), item.get("armRegionName"), item.get("productName")
+
+
 class PricingService:
     """Service for Azure pricing operations."""
 
-    def __init__(self, client: AzurePricingClient, retirement_service: RetirementService) -> None:
+    def __init__(
+        self,
+        client: AzurePricingClient,
+        retirement_service: RetirementService,
+        prefetcher: SpeculativePrefetcher | None = None,
+        sku_index: SkuIndex | None = None,
+    ) -> None:
         self._client = client
         self._retirement_service = retirement_service
+        self._prefetcher = prefetcher
+        self._sku_index = sku_index if sku_index is not None else SkuIndex()
+
+    @property
+    def prefetcher(self) -> SpeculativePrefetcher | None:
+        """Get the speculative prefetcher, if enabled."""
+        return self._prefetcher
 
     async def search_prices(
         self,
@@ -92,54 +197,22 @@ class PricingService:
     ) -> dict[str, Any]:
         """Search Azure retail prices with various filters.
 
-        SKU name handling:
-        - If sku_name is a tier keyword (Basic, Standard, Premium, etc.),
-          search BOTH productName AND skuName since Azure API is inconsistent:
-          - SQL Database: skuName='B', productName='SQL Database Single Basic'
-          - Service Bus: skuName='Basic', productName='Service Bus'
-        - Otherwise, search skuName as usual.
+        See `build_search_filters` for how SKU names and tier keywords are matched.
         """
-        filter_conditions = []
-
-        if service_name:
-            filter_conditions.append(f"serviceName eq '{service_name}'")
-        if service_family:
-            filter_conditions.append(f"serviceFamily eq '{service_family}'")
-        if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
-
-        # Check if sku_name is a tier keyword that should search both productName and skuName
-        tier_keyword = is_tier_keyword(sku_name) if sku_name else None
-        if tier_keyword:
-            # Search both productName and skuName for tier keywords using OR
-            # This handles both patterns:
-            # - "contains(productName, 'Basic')" for SQL Database Single Basic
-            # - "contains(skuName, 'Basic')" for Service Bus Basic
-            filter_conditions.append(
-                f"(contains(productName, '{tier_keyword}') or contains(skuName, '{tier_keyword}'))"
-            )
-        elif sku_name:
-            # Search skuName for specific SKU names (e.g., "D2s_v3")
-            filter_conditions.append(f"contains(skuName, '{sku_name}')")
-
-        if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
-
-        data = await self._client.fetch_prices(
-            filter_conditions=filter_conditions,
-            currency_code=currency_code,
-            limit=limit,
-        )
-
-        items = data.get("Items", [])
+        filter_conditions = build_search_filters(service_name, service_family, region, sku_name, price_type)
+        items, more_pages, truncated = await self._collect_pages(filter_conditions, currency_code, limit)
 
+        has_more = truncated or more_pages or len(items) > limit
         if len(items) > limit:
             items = items[:limit]
 
         # SKU validation and clarification
         validation_info: dict[str, Any] = {}
         if validate_sku and sku_name and not items:
-            validation_info = await self._validate_and_suggest_skus(service_name, sku_name, currency_code)
+            try:
+                validation_info = await self._validate_and_suggest_skus(service_name, sku_name, currency_code)
+            except BudgetExceededError:
+                logger.info("Skipped SKU suggestions: request budget exhausted")
         elif validate_sku and sku_name and isinstance(items, list) and len(items) > 10:
             validation_info["clarification"] = {
                 "message": f"Found {len(items)} SKUs matching '{sku_name}'. Consider being more specific.",
@@ -158,7 +231,7 @@ class PricingService:
         result: dict[str, Any] = {
             "items": items,
             "count": len(items) if isinstance(items, list) else 0,
-            "has_more": bool(data.get("NextPageLink")),
+            "has_more": has_more,
             "currency": currency_code,
             "filters_applied": filter_conditions,
         }
@@ -174,62 +247,130 @@ class PricingService:
 
         return result
 
+    def prefetch_follow_ups(
+        self,
+        service_name: str | None,
+        sku_name: str | None,
+        region: str | None = None,
+        currency_code: str = "USD",
+    ) -> None:
+        """Warm the cache for the calls agents usually make after a price search.
+
+        After searching a SKU, agents typically ask for a cost estimate and RI
+        pricing in the same region and for a region recommendation. The queries
+        those tools will issue are built with the same filter builders and limits
+        and fetched in the background. Does nothing unless prefetch is enabled.
+        """
+        if self._prefetcher is None or not service_name or not sku_name:
+            return
+
+        def search(filters: list[str], limit: int) -> PrefetchQuery:
+            return lambda: self._collect_pages(filters, currency_code, limit)
+
+        queries: list[PrefetchQuery] = []
+        if region:
+            # azure_cost_estimate and azure_ri_pricing (with its On-Demand comparison)
+            queries.append(
+                search(build_search_filters(service_name, region=region, sku_name=sku_name), COST_ESTIMATE_SEARCH_LIMIT)
+            )
+            queries.append(
+                search(build_ri_filters("Reservation", service_name, region, sku_name), RI_PRICING_DEFAULT_LIMIT)
+            )
+            od_filters = build_ri_filters("Consumption", service_name, region, sku_name)
+            queries.append(lambda: self._collect_on_demand(od_filters, currency_code))
+
+        # azure_region_recommend scans the normalized SKU spellings in order; warm the first
+        search_terms, _ = normalize_sku_name(sku_name)
+        if search_terms:
+            region_filters = build_search_filters(service_name, sku_name=search_terms[0])
+            queries.append(lambda: self._scan_region_minimums(region_filters, currency_code))
+
+        self._prefetcher.schedule(queries)
+
+    async def _collect_pages(
+        self, filter_conditions: list[str], currency_code: str, limit: int
+    ) -> tuple[list[dict[str, Any]], bool, bool]:
+        """Collect items across pages until `limit` is reached.
+
+        Returns:
+            Tuple of (items, whether more results exist upstream, whether the request
+            budget cut the search short)
+        """
+        items: list[dict[str, Any]] = []
+        more_pages = False
+        try:
+            async for page in self._client.iter_price_pages(
+                filter_conditions=filter_conditions,
+                currency_code=currency_code,
+                limit=limit,
+                max_pages=MAX_PAGES_PER_QUERY,
+            ):
+                items.extend(page.get("Items", []))
+                # Offline catalog pages flag a cut-off by `limit` with HasMore
+                more_pages = bool(page.get("NextPageLink")) or bool(page.get("HasMore"))
+        except BudgetExceededError:
+            if not items:
+                raise
+            # Keep the pages already fetched; the caller reports the truncation
+            logger.info(f"Search stopped after {len(items)} items: request budget exhausted")
+            return items, more_pages, True
+        return items, more_pages, False
+
     async def _validate_and_suggest_skus(
         self, service_name: str | None, sku_name: str, currency_code: str = "USD"
     ) -> dict[str, Any]:
-        """Validate SKU name and suggest alternatives if not found."""
-        suggestions = []
+        """Validate SKU name and suggest alternatives if not found.
 
+        Suggestions come from the service's local SKU index, ranked by edit
+        distance; only building the index may need an upstream request.
+        """
+        suggestions = []
         if service_name:
-            broad_search = await self.search_prices(
-                service_name=service_name,
-                currency_code=currency_code,
-                limit=100,
-                validate_sku=False,
-            )
-
-            sku_lower = sku_name.lower()
-            items = broad_search.get("items", [])
-            if items:
-                for item in items:
-                    item_sku = item.get("skuName")
-                    if not item_sku:
-                        continue
-                    item_sku_lower = item_sku.lower()
-                    if (
-                        sku_lower in item_sku_lower
-                        or item_sku_lower in sku_lower
-                        or any(word in item_sku_lower for word in sku_lower.split() if word)
-                    ):
-                        suggestions.append(
-                            {
-                                "sku_name": item_sku,
-                                "product_name": item.get("productName", "Unknown"),
-                                "price": item.get("retailPrice", 0),
-                                "unit": item.get("unitOfMeasure", "Unknown"),
-                                "region": item.get("armRegionName", "Unknown"),
-                            }
-                        )
-
-        seen_skus: set[str] = set()
-        unique_suggestions = []
-        for suggestion in suggestions:
-            sku = suggestion["sku_name"]
-            if sku not in seen_skus:
-                seen_skus.add(sku)
-                unique_suggestions.append(suggestion)
-                if len(unique_suggestions) >= 5:
-                    break
+            index = await self._ensure_sku_index(service_name, currency_code)
+            for item in index.suggest(service_name, sku_name, currency_code):
+                suggestions.append(
+                    {
+                        "sku_name": item.get("skuName"),
+                        "product_name": item.get("productName", "Unknown"),
+                        "price": item.get("retailPrice", 0),
+                        "unit": item.get("unitOfMeasure", "Unknown"),
+                        "region": item.get("armRegionName", "Unknown"),
+                    }
+                )
 
         return {
             "sku_validation": {
                 "original_sku": sku_name,
                 "found": False,
                 "message": f"SKU '{sku_name}' not found" + (f" in service '{service_name}'" if service_name else ""),
-                "suggestions": unique_suggestions,
+                "suggestions": suggestions,
             }
         }
 
+    async def _ensure_sku_index(self, service_name: str, currency_code: str) -> SkuIndex:
+        """Get a SKU index covering a service, building it unless a current one exists.
+
+        The offline catalog provides every distinct SKU of the service; without
+        it one broad search (usually a single cached page) is indexed instead.
+        A search cut short by the request budget is indexed for this lookup
+        only, so the next miss builds a complete index.
+        """
+        if self._sku_index.has_service(service_name, currency_code):
+            return self._sku_index
+        catalog = self._client.catalog
+        items = None
+        if catalog is not None:
+            items = await asyncio.to_thread(catalog.distinct_skus, service_name, currency_code)
+        truncated = False
+        if items is None:
+            items, _, truncated = await self._collect_pages(
+                build_search_filters(service_name), currency_code, SKU_INDEX_SEARCH_LIMIT
+            )
+        index = SkuIndex(max_services=1) if truncated else self._sku_index
+        names = index.build(service_name, items, currency_code)
+        logger.debug(f"Indexed {names} SKU names for {service_name} ({currency_code})")
+        return index
+
     def _apply_discount_to_items(self, items: list[dict], discount_percentage: float) -> list[dict]:
         """Apply discount percentage to pricing items."""
         if not items:
@@ -269,35 +410,69 @@ class PricingService:
         regions: list[str] | None = None,
         currency_code: str = "USD",
         discount_percentage: float | None = None,
+        max_regions: int | None = None,
     ) -> dict[str, Any]:
-        """Compare prices across different regions or SKUs."""
+        """Compare prices across different regions or SKUs.
+
+        Regions are looked up concurrently (at most MAX_CONCURRENT_REQUESTS at a
+        time); a failed lookup only drops its own region. At most `max_regions`
+        regions are compared.
+        """
         comparisons = []
+        timing: dict[str, Any] | None = None
+        skipped_regions: list[str] = []
 
         if regions and isinstance(regions, list):
-            for region in regions:
-                try:
-                    result = await self.search_prices(
-                        service_name=service_name,
-                        sku_name=sku_name,
-                        region=region,
-                        currency_code=currency_code,
-                        limit=10,
-                    )
-
-                    if result["items"]:
-                        item = result["items"][0]
-                        comparisons.append(
-                            {
-                                "region": region,
-                                "sku_name": item.get("skuName"),
-                                "retail_price": item.get("retailPrice"),
-                                "unit_of_measure": item.get("unitOfMeasure"),
-                                "product_name": item.get("productName"),
-                                "meter_name": item.get("meterName"),
-                            }
+            region_limit = max_regions or COMPARE_MAX_REGIONS
+            unique_regions = list(dict.fromkeys(regions))
+            skipped_regions = unique_regions[region_limit:]
+            unique_regions = unique_regions[:region_limit]
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            lookup_seconds: list[float] = []
+
+            async def compare_region(region: str) -> dict[str, Any] | None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        result = await self.search_prices(
+                            service_name=service_name,
+                            sku_name=sku_name,
+                            region=region,
+                            currency_code=currency_code,
+                            limit=10,
                         )
-                except Exception as e:
-                    logger.warning(f"Failed to get prices for region {region}: {e}")
+                    except BudgetExceededError:
+                        logger.info(f"Skipped region {region}: request budget exhausted")
+                        return None
+                    except Exception as e:
+                        logger.warning(f"Failed to get prices for region {region}: {e}")
+                        return None
+                    finally:
+                        lookup_seconds.append(time.perf_counter() - started)
+
+                if not result["items"]:
+                    return None
+                item = result["items"][0]
+                return {
+                    "region": region,
+                    "sku_name": item.get("skuName"),
+                    "retail_price": item.get("retailPrice"),
+                    "unit_of_measure": item.get("unitOfMeasure"),
+                    "product_name": item.get("productName"),
+                    "meter_name": item.get("meterName"),
+                }
+
+            started = time.perf_counter()
+            region_results = await asyncio.gather(*(compare_region(region) for region in unique_regions))
+            wall_clock = time.perf_counter() - started
+            comparisons = [comparison for comparison in region_results if comparison is not None]
+            timing = {
+                "regions_queried": len(unique_regions),
+                "max_concurrency": MAX_CONCURRENT_REQUESTS,
+                "wall_clock_seconds": round(wall_clock, 3),
+                "sequential_seconds": round(sum(lookup_seconds), 3),
+                "time_saved_seconds": round(max(0.0, sum(lookup_seconds) - wall_clock), 3),
+            }
         else:
             result = await self.search_prices(
                 service_name=service_name,
@@ -305,12 +480,11 @@ class PricingService:
                 limit=20,
             )
 
-            sku_prices: dict[str, dict[str, Any]] = {}
             items = result.get("items", [])
-            for item in items:
-                sku = item.get("skuName")
-                if sku and sku not in sku_prices:
-                    sku_prices[sku] = {
+            for sku, row in PriceColumns(items).first_by_sku().items():
+                item = items[row]
+                comparisons.append(
+                    {
                         "sku_name": sku,
                         "retail_price": item.get("retailPrice"),
                         "unit_of_measure": item.get("unitOfMeasure"),
@@ -318,8 +492,7 @@ class PricingService:
                         "region": item.get("armRegionName"),
                         "meter_name": item.get("meterName"),
                     }
-
-            comparisons = list(sku_prices.values())
+                )
 
         if discount_percentage is not None and discount_percentage > 0:
             for comparison in comparisons:
@@ -338,6 +511,11 @@ class PricingService:
             "comparison_type": "regions" if regions else "skus",
         }
 
+        if timing is not None:
+            result_data["timing"] = timing
+        if skipped_regions:
+            result_data["skipped_regions"] = skipped_regions
+
         if discount_percentage is not None and discount_percentage > 0:
             result_data["discount_applied"] = {
                 "percentage": discount_percentage,
@@ -354,23 +532,24 @@ class PricingService:
         currency_code: str = "USD",
         discount_percentage: float | None = None,
     ) -> dict[str, Any]:
-        """Recommend the cheapest Azure regions for a given service and SKU."""
-        search_terms, display_sku = normalize_sku_name(sku_name)
+        """Recommend the cheapest Azure regions for a given service and SKU.
 
-        discovery_result: dict[str, Any] = {"items": []}
+        Every result page for the SKU is scanned (up to MAX_PAGES_PER_QUERY),
+        keeping only the running cheapest On-Demand and Spot price per region.
+        `complete` in the result tells whether the scan saw every page.
+        """
+        search_terms, display_sku = normalize_sku_name(sku_name)
 
+        minimums = RegionMinimums()
+        pages_scanned = 0
+        complete = False
         for search_term in search_terms:
-            discovery_result = await self.search_prices(
-                service_name=service_name,
-                sku_name=search_term,
-                currency_code=currency_code,
-                limit=500,
-                validate_sku=False,
-            )
-            if discovery_result.get("items"):
+            filter_conditions = build_search_filters(service_name, sku_name=search_term)
+            minimums, pages_scanned, complete = await self._scan_region_minimums(filter_conditions, currency_code)
+            if minimums.items_scanned:
                 break
 
-        if not discovery_result["items"]:
+        if not minimums.items_scanned:
             return {
                 "error": f"No pricing found for {display_sku} in service {service_name}",
                 "service_name": service_name,
@@ -381,42 +560,21 @@ class PricingService:
             }
 
         region_data: dict[str, dict[str, Any]] = {}
-        spot_data: dict[str, dict[str, Any]] = {}
-
-        for item in discovery_result["items"]:
-            region = item.get("armRegionName")
-            price = item.get("retailPrice", 0)
-            location = item.get("location", region)
-            sku_name_item = item.get("skuName", "")
-            meter_name = item.get("meterName", "")
-
-            is_spot = "Spot" in sku_name_item or "Spot" in meter_name
-            is_low_priority = "Low Priority" in sku_name_item or "Low Priority" in meter_name
-
-            if region and price and price > 0:
-                item_data = {
-                    "region": region,
-                    "location": location,
-                    "retail_price": price,
-                    "sku_name": item.get("skuName"),
-                    "product_name": item.get("productName"),
-                    "unit_of_measure": item.get("unitOfMeasure"),
-                    "meter_name": item.get("meterName"),
-                }
-
-                if is_spot or is_low_priority:
-                    pricing_type = "Spot" if is_spot else "Low Priority"
-                    if region not in spot_data or price < spot_data[region]["retail_price"]:
-                        spot_data[region] = {**item_data, "pricing_type": pricing_type}
-                else:
-                    if region not in region_data or price < region_data[region]["retail_price"]:
-                        region_data[region] = {**item_data, "pricing_type": "On-Demand"}
-
-        for region, on_demand in region_data.items():
-            if region in spot_data:
-                spot = spot_data[region]
-                on_demand["spot_price"] = spot["retail_price"]
-                on_demand["spot_sku_name"] = spot["sku_name"]
+        for region, item in minimums.on_demand.items():
+            region_data[region] = {
+                "region": region,
+                "location": item.get("location", region),
+                "retail_price": item.get("retailPrice"),
+                "sku_name": item.get("skuName"),
+                "product_name": item.get("productName"),
+                "unit_of_measure": item.get("unitOfMeasure"),
+                "meter_name": item.get("meterName"),
+                "pricing_type": "On-Demand",
+            }
+            if region in minimums.spot:
+                spot = minimums.spot[region]
+                region_data[region]["spot_price"] = spot.get("retailPrice")
+                region_data[region]["spot_sku_name"] = spot.get("skuName")
 
         if not region_data:
             return {
@@ -438,16 +596,9 @@ class PricingService:
 
         recommendations.sort(key=lambda x: x.get("retail_price", float("inf")))
 
-        if recommendations:
-            max_price = max(r.get("retail_price", 0) for r in recommendations)
-
-            for rec in recommendations:
-                price = rec.get("retail_price", 0)
-                if max_price > 0:
-                    savings_vs_max = ((max_price - price) / max_price) * 100
-                    rec["savings_vs_most_expensive"] = round(savings_vs_max, 2)
-                else:
-                    rec["savings_vs_most_expensive"] = 0.0
+        savings = percent_below_max([rec["retail_price"] for rec in recommendations])
+        for rec, savings_vs_max in zip(recommendations, savings, strict=True):
+            rec["savings_vs_most_expensive"] = round(savings_vs_max, 2)
 
         top_recommendations = recommendations[:top_n]
 
@@ -459,6 +610,9 @@ class PricingService:
             "total_regions_found": len(recommendations),
             "showing_top": min(top_n, len(recommendations)),
             "recommendations": top_recommendations,
+            "complete": complete,
+            "pages_scanned": pages_scanned,
+            "items_scanned": minimums.items_scanned,
         }
 
         if recommendations:
@@ -480,6 +634,34 @@ class PricingService:
 
         return result
 
+    async def _scan_region_minimums(
+        self, filter_conditions: list[str], currency_code: str
+    ) -> tuple[RegionMinimums, int, bool]:
+        """Scan every page of a query, keeping only the cheapest item per region.
+
+        Returns:
+            Tuple of (per-region minimums, pages scanned, whether every page was
+            scanned before the page cap or the request budget stopped the scan)
+        """
+        minimums = RegionMinimums()
+        pages = 0
+        complete = False
+        try:
+            async for page in self._client.iter_price_pages(
+                filter_conditions=filter_conditions,
+                currency_code=currency_code,
+                max_pages=MAX_PAGES_PER_QUERY,
+            ):
+                minimums.add(page.get("Items", []))
+                pages += 1
+                complete = not page.get("NextPageLink") and not page.get("HasMore")
+        except BudgetExceededError:
+            if not pages:
+                raise
+            logger.info(f"Region scan stopped after {pages} pages: request budget exhausted")
+            complete = False
+        return minimums, pages, complete
+
     async def estimate_costs(
         self,
         service_name: str,
@@ -495,7 +677,7 @@ class PricingService:
             sku_name=sku_name,
             region=region,
             currency_code=currency_code,
-            limit=5,
+            limit=COST_ESTIMATE_SEARCH_LIMIT,
         )
 
         if not result["items"]:
@@ -583,6 +765,156 @@ class PricingService:
 
         return estimate_result
 
+    async def estimate_bom(
+        self,
+        lines: list[dict[str, Any]],
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+    ) -> dict[str, Any]:
+        """Estimate the monthly and yearly cost of a bill of materials.
+
+        Each line names a service, SKU and region plus a `quantity` (default 1)
+        and either `hours_per_month` (default 730, for hourly meters) or
+        `units_per_month` (for other meters, default 1). Identical
+        (service, SKU, region) lookups are made once and resolved concurrently
+        with the same query as `estimate_costs`; a failed lookup only fails its
+        own lines.
+        """
+        if len(lines) > BOM_MAX_LINES:
+            return {"error": f"A bill of materials may have at most {BOM_MAX_LINES} lines, got {len(lines)}"}
+
+        def lookup_key(line: dict[str, Any]) -> tuple[str, str, str] | None:
+            service_name, sku_name, region = (
+                str(line.get(name) or "").strip() for name in ("service_name", "sku_name", "region")
+            )
+            return (service_name, sku_name, region) if service_name and sku_name and region else None
+
+        def usage_number(line: dict[str, Any], name: str, default: float) -> float:
+            value = line.get(name, default)
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}") from None
+            if not math.isfinite(number) or number < 0:
+                raise ValueError(f"{name} must be a non-negative number, got {value!r}")
+            return number
+
+        keys = [lookup_key(line) for line in lines]
+        distinct = list(dict.fromkeys(key for key in keys if key is not None))
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def resolve(key: tuple[str, str, str]) -> dict[str, Any] | str:
+            service_name, sku_name, region = key
+            async with semaphore:
+                try:
+                    result = await self.search_prices(
+                        service_name=service_name,
+                        sku_name=sku_name,
+                        region=region,
+                        currency_code=currency_code,
+                        limit=COST_ESTIMATE_SEARCH_LIMIT,
+                        validate_sku=False,
+                    )
+                except BudgetExceededError:
+                    return "Skipped: request budget exhausted"
+                except Exception as e:
+                    logger.warning(f"Failed to price {sku_name} in {region}: {e}")
+                    return f"Lookup failed: {e}"
+            if not result["items"]:
+                return f"No pricing found for {sku_name} in {region}"
+            item: dict[str, Any] = result["items"][0]
+            return item
+
+        resolved = dict(zip(distinct, await asyncio.gather(*(resolve(key) for key in distinct)), strict=True))
+
+        discount_factor = 1 - discount_percentage / 100 if discount_percentage else 1.0
+        # Monthly On-Demand cost and savings plan costs (by term) of each priced line
+        priced: list[tuple[float, dict[str, float]]] = []
+        line_results = []
+        for number, (line, key) in enumerate(zip(lines, keys, strict=True), 1):
+            line_result: dict[str, Any] = {
+                "line": number,
+                "label": line.get("label"),
+                "service_name": line.get("service_name"),
+                "sku_name": line.get("sku_name"),
+                "region": line.get("region"),
+                "quantity": line.get("quantity", 1),
+            }
+            line_results.append(line_result)
+            found = resolved.get(key) if key is not None else "service_name, sku_name and region are required"
+            if not isinstance(found, dict):
+                line_result["error"] = found
+                continue
+
+            unit = found.get("unitOfMeasure") or ""
+            usage_field = "units_per_month"
+            if line.get("units_per_month") is None and "hour" in unit.lower():
+                usage_field = "hours_per_month"
+            try:
+                quantity = usage_number(line, "quantity", 1)
+                usage = usage_number(line, usage_field, HOURS_PER_MONTH if usage_field == "hours_per_month" else 1)
+            except ValueError as e:
+                line_result["error"] = str(e)
+                continue
+            line_result[usage_field] = usage
+            unit_price = (found.get("retailPrice") or 0.0) * discount_factor
+            monthly_cost = unit_price * usage * quantity
+            plans = {
+                plan["term"]: (plan.get("retailPrice") or 0.0) * discount_factor * usage * quantity
+                for plan in found.get("savingsPlan", [])
+                if plan.get("term")
+            }
+            priced.append((monthly_cost, plans))
+            line_result.update(
+                {
+                    "sku_name": found.get("skuName"),
+                    "product_name": found.get("productName"),
+                    "unit_of_measure": unit,
+                    "unit_price": round(unit_price, 6),
+                    "monthly_cost": round(monthly_cost, 2),
+                    "yearly_cost": round(monthly_cost * 12, 2),
+                    "savings_plans": {term: round(cost, 2) for term, cost in plans.items()},
+                }
+            )
+
+        monthly_total = sum(monthly_cost for monthly_cost, _ in priced)
+        terms = sorted({term for _, plans in priced for term in plans})
+        savings_plan_totals = []
+        for term in terms:
+            # Lines the plan does not cover stay at their On-Demand cost
+            cost = sum(plans.get(term, monthly_cost) for monthly_cost, plans in priced)
+            savings_plan_totals.append(
+                {
+                    "term": term,
+                    "monthly_cost": round(cost, 2),
+                    "yearly_cost": round(cost * 12, 2),
+                    "annual_savings": round((monthly_total - cost) * 12, 2),
+                    "savings_percent": round((monthly_total - cost) / monthly_total * 100, 2) if monthly_total else 0.0,
+                }
+            )
+        failed = len(line_results) - len(priced)
+        result: dict[str, Any] = {
+            "currency": currency_code,
+            "lines": line_results,
+            "totals": {
+                "monthly_cost": round(monthly_total, 2),
+                "yearly_cost": round(monthly_total * 12, 2),
+                "priced_lines": len(line_results) - failed,
+                "failed_lines": failed,
+            },
+            "savings_plan_totals": savings_plan_totals,
+            "lookups": {
+                "distinct": len(distinct),
+                "deduplicated": sum(key is not None for key in keys) - len(distinct),
+            },
+        }
+        if discount_percentage:
+            result["discount_applied"] = {
+                "percentage": discount_percentage,
+                "note": "All prices shown are after discount",
+            }
+        return result
+
     async def get_ri_pricing(
         self,
         service_name: str | None = None,
@@ -591,104 +923,153 @@ class PricingService:
         reservation_term: str | None = None,
         currency_code: str = "USD",
         compare_on_demand: bool = True,
-        limit: int = 50,
+        limit: int = RI_PRICING_DEFAULT_LIMIT,
     ) -> dict[str, Any]:
-        """Get Reserved Instance pricing and optionally compare with On-Demand."""
-        ri_filter = ["priceType eq 'Reservation'"]
-        if service_name:
-            ri_filter.append(f"serviceName eq '{service_name}'")
-        if region:
-            ri_filter.append(f"armRegionName eq '{region}'")
-        if sku_name:
-            ri_filter.append(f"contains(skuName, '{sku_name}')")
-
-        ri_data = await self._client.fetch_prices(
-            filter_conditions=ri_filter,
-            currency_code=currency_code,
-            limit=limit,
-        )
-        ri_items = ri_data.get("Items", [])
-
+        """Get Reserved Instance pricing and optionally compare with On-Demand.
+
+        Reservation prices (up to `limit`, across pages) and the matching
+        On-Demand meters are fetched concurrently, then joined with
+        `ri_join_key`. The On-Demand scan stops once every reservation has a
+        priced meter, or after RI_ON_DEMAND_MAX_PAGES pages. Reservations
+        without a usable On-Demand price are listed under `unmatched` instead
+        of being dropped silently.
+        """
+        ri_filter = build_ri_filters("Reservation", service_name, region, sku_name)
+
+        od_task: asyncio.Future[tuple[dict[tuple[Any, ...], dict[str, Any]], int, bool]] | None = None
+        # Join keys of the reservations, known once the reservation query is done
+        wanted: asyncio.Future[set[tuple[Any, ...]]] = asyncio.get_running_loop().create_future()
+        if compare_on_demand:
+            od_filter = build_ri_filters("Consumption", service_name, region, sku_name)
+            od_task = asyncio.ensure_future(self._collect_on_demand(od_filter, currency_code, wanted))
+        try:
+            ri_items, more_pages, truncated = await self._collect_pages(ri_filter, currency_code, limit)
+        except BaseException:
+            if od_task is not None:
+                od_task.cancel()
+                await asyncio.gather(od_task, return_exceptions=True)
+            raise
+
+        has_more = truncated or more_pages or len(ri_items) > limit
+        ri_items = ri_items[:limit]
         if reservation_term:
             ri_items = [item for item in ri_items if item.get("reservationTerm") == reservation_term]
+        wanted.set_result({ri_join_key(item) for item in ri_items})
 
         result: dict[str, Any] = {
             "ri_items": ri_items,
             "currency": currency_code,
             "count": len(ri_items),
+            "has_more": has_more,
         }
 
-        if compare_on_demand and ri_items:
-            od_filter = ["priceType eq 'Consumption'"]
-            if service_name:
-                od_filter.append(f"serviceName eq '{service_name}'")
-            if region:
-                od_filter.append(f"armRegionName eq '{region}'")
-            if sku_name:
-                od_filter.append(f"contains(skuName, '{sku_name}')")
-
-            od_data = await self._client.fetch_prices(
-                filter_conditions=od_filter,
-                currency_code=currency_code,
-                limit=limit * 2,
-            )
-            od_items = od_data.get("Items", [])
-
-            comparison = self._calculate_ri_savings(ri_items, od_items)
-            result["comparison"] = comparison
+        if od_task is not None and not ri_items:
+            od_task.cancel()
+            await asyncio.gather(od_task, return_exceptions=True)
+        elif od_task is not None:
+            try:
+                od_by_key, od_scanned, od_complete = await od_task
+            except BudgetExceededError:
+                # Return the RI prices without the On-Demand comparison
+                logger.info("Skipped On-Demand comparison: request budget exhausted")
+            else:
+                comparison, unmatched = self._calculate_ri_savings(ri_items, od_by_key)
+                result["comparison"] = comparison
+                result["unmatched"] = unmatched
+                result["on_demand_scanned"] = od_scanned
+                result["on_demand_complete"] = od_complete
+                result["on_demand_max_pages"] = RI_ON_DEMAND_MAX_PAGES
 
         return result
 
-    def _calculate_ri_savings(self, ri_items: list[dict], od_items: list[dict]) -> list[dict]:
-        """Calculate savings and break-even for RI vs On-Demand."""
-        comparison_results = []
+    async def _collect_on_demand(
+        self,
+        filter_conditions: list[str],
+        currency_code: str,
+        wanted: asyncio.Future[set[tuple[Any, ...]]] | None = None,
+    ) -> tuple[dict[tuple[Any, ...], dict[str, Any]], int, bool]:
+        """Index the On-Demand meters matching the filters by `ri_join_key`.
+
+        Spot and Low Priority meters are skipped; per key the first meter with
+        a non-zero price is kept. Pages are read until every key in `wanted`
+        (once it is set) has a priced meter, up to RI_ON_DEMAND_MAX_PAGES.
+
+        Returns:
+            Tuple of (join key -> item, items scanned, whether every page was read
+            or every wanted key found)
+        """
+        by_key: dict[tuple[Any, ...], dict[str, Any]] = {}
+        scanned = 0
+        complete = True
+        try:
+            async for page in self._client.iter_price_pages(
+                filter_conditions=filter_conditions,
+                currency_code=currency_code,
+                max_pages=RI_ON_DEMAND_MAX_PAGES,
+            ):
+                for item in page.get("Items", []):
+                    scanned += 1
+                    if is_interruptible(item):
+                        continue
+                    key = ri_join_key(item)
+                    if key not in by_key or not by_key[key].get("retailPrice"):
+                        by_key[key] = item
+                complete = not page.get("NextPageLink") and not page.get("HasMore")
+                if not complete and wanted is not None and wanted.done():
+                    if all(by_key.get(key, {}).get("retailPrice") for key in wanted.result()):
+                        complete = True
+                        break
+        except BudgetExceededError:
+            if not scanned:
+                raise
+            logger.info(f"On-Demand scan stopped after {scanned} items: request budget exhausted")
+            complete = False
+        return by_key, scanned, complete
+
+    def _calculate_ri_savings(
+        self, ri_items: list[dict], od_by_key: dict[tuple[Any, ...], dict[str, Any]]
+    ) -> tuple[list[dict], list[dict]]:
+        """Calculate savings and break-even for RI vs On-Demand.
+
+        Returns:
+            Tuple of (comparison rows, reservations without a usable On-Demand price)
+        """
+        od_items = list(od_by_key.values())
+        od_rows = {key: row for row, key in enumerate(od_by_key)}
+        matches = [od_rows.get(ri_join_key(item), -1) for item in ri_items]
 
-        od_map = {}
-        for item in od_items:
-            key = (item.get("skuName"), item.get("armRegionName"))
-            od_map[key] = item
-
-        for ri in ri_items:
-            key = (ri.get("skuName"), ri.get("armRegionName"))
-            od = od_map.get(key)
-
-            if od:
-                ri_price = ri.get("retailPrice", 0)
-                od_price = od.get("retailPrice", 0)
-                term = ri.get("reservationTerm", "")
-
-                if od_price > 0:
-                    hours_in_term = 8760 if "1 Year" in term else (26280 if "3 Year" in term else 0)
-
-                    if hours_in_term > 0 and ri_price > od_price:
-                        ri_hourly = ri_price / hours_in_term
-                        total_ri_cost = ri_price
-                    else:
-                        ri_hourly = ri_price / hours_in_term if hours_in_term > 0 else ri_price
-                        total_ri_cost = ri_price
-
-                    savings_percent = ((od_price - ri_hourly) / od_price) * 100
-
-                    break_even_months = 0.0
-                    if total_ri_cost > 0:
-                        monthly_od_cost = od_price * 730
-                        if monthly_od_cost > 0:
-                            break_even_months = total_ri_cost / monthly_od_cost
-
-                    comparison_results.append(
-                        {
-                            "sku": ri.get("skuName"),
-                            "region": ri.get("armRegionName"),
-                            "term": term,
-                            "ri_hourly": round(ri_hourly, 5),
-                            "od_hourly": od_price,
-                            "savings_percentage": round(savings_percent, 2),
-                            "break_even_months": round(break_even_months, 1) if break_even_months else None,
-                            "annual_savings": round((od_price - ri_hourly) * 8760, 2),
-                        }
-                    )
+        comparison_results = []
+        savings = ri_savings(PriceColumns(ri_items), PriceColumns(od_items), matches)
+        for saving in savings:
+            ri = ri_items[saving.ri_row]
+            od_price = od_items[saving.od_row].get("retailPrice")
+            comparison_results.append(
+                {
+                    "sku": ri.get("skuName"),
+                    "region": ri.get("armRegionName"),
+                    "term": ri.get("reservationTerm", ""),
+                    "ri_hourly": round(saving.ri_hourly, 5),
+                    "od_hourly": od_price,
+                    "savings_percentage": round(saving.savings_percentage, 2),
+                    "break_even_months": (round(saving.break_even_months, 1) if saving.break_even_months else None),
+                    "annual_savings": round(saving.annual_savings, 2),
+                }
+            )
 
-        return comparison_results
+        compared = {saving.ri_row for saving in savings}
+        unmatched = [
+            {
+                "sku": item.get("skuName"),
+                "arm_sku_name": item.get("armSkuName"),
+                "region": item.get("armRegionName"),
+                "product_name": item.get("productName"),
+                "term": item.get("reservationTerm", ""),
+                "reason": "On-Demand price is zero" if matches[row] >= 0 else "No On-Demand meter found",
+            }
+            for row, item in enumerate(ri_items)
+            if row not in compared
+        ]
+        return comparison_results, unmatched
 
     async def get_customer_discount(self, customer_id: str | None = None) -> dict[str, Any]:
         """Get customer discount information."""
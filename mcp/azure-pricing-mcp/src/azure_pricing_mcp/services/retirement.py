@@ -3,20 +3,36 @@
 import asyncio
 import logging
 import re
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
+from ..budget import request_budget
 from ..client import AzurePricingClient
 from ..config import (
     PREVIOUS_GEN_URL,
     RETIRED_SIZES_URL,
     RETIREMENT_CACHE_TTL,
+    RETIREMENT_RETRY_INTERVAL,
     VM_SERIES_REPLACEMENTS,
 )
 from ..models import RetirementStatus, VMSeriesRetirementInfo
 
 logger = logging.getLogger(__name__)
 
+# Distinct SKU names whose series key is memoized; a VM search sees a few hundred at most
+SERIES_CACHE_SIZE = 4096
+
+# Disk cache key of the parsed retirement files; kept well past RETIREMENT_CACHE_TTL as last good data
+PERSISTED_SOURCES_KEY = "retirement:sources"
+PERSISTED_SOURCES_TTL_SECONDS = 30 * 86400
+
+_SKU_PREFIXES = ("Standard_", "Basic_", "standard_", "basic_")
+_SKU_SERIES_PATTERN = re.compile(r"^([A-Za-z]+)\d*([a-z]*)\s*v?(\d+)?", re.IGNORECASE)
+_VERSIONED_SERIES_PATTERN = re.compile(r"^([A-Za-z]+)(v\d+)?$", re.IGNORECASE)
+
 # Fallback retirement data when GitHub fetch fails
 # Based on Microsoft docs as of January 2026
 FALLBACK_RETIREMENT_DATA: dict[str, VMSeriesRetirementInfo] = {
@@ -148,79 +164,260 @@ FALLBACK_RETIREMENT_DATA: dict[str, VMSeriesRetirementInfo] = {
 }
 
 
+@lru_cache(maxsize=SERIES_CACHE_SIZE)
+def series_from_sku(sku_name: str) -> str | None:
+    """Extract the VM series identifier from a SKU name, e.g. "Standard_D2s_v3" -> "Dsv3".
+
+    Results are memoized, so repeated SKU names across a result set cost one
+    dictionary lookup.
+    """
+    if not sku_name:
+        return None
+
+    normalized = sku_name.strip()
+    for prefix in _SKU_PREFIXES:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix) :]
+            break
+
+    normalized = normalized.replace("_", " ")
+
+    match = _SKU_SERIES_PATTERN.match(normalized)
+
+    if match:
+        prefix = match.group(1)
+        suffix = match.group(2) or ""
+        version = match.group(3)
+
+        series_key = f"{prefix}{suffix}"
+        if version:
+            series_key += f"v{version}"
+
+        return series_key
+
+    return None
+
+
+class RetirementTable:
+    """Retirement data compiled for lookups by series key.
+
+    Built once per refresh. Series keys match exactly, or case-insensitively
+    when they carry a version suffix ("DSv2" finds "Dsv2"); the first key in
+    data order wins when several fold to the same name.
+    """
+
+    def __init__(self, data: dict[str, VMSeriesRetirementInfo]) -> None:
+        self.data = data
+        self._casefolded: dict[str, VMSeriesRetirementInfo] = {}
+        for key, info in data.items():
+            self._casefolded.setdefault(key.casefold(), info)
+
+    def match(self, series_key: str) -> VMSeriesRetirementInfo | None:
+        """Return the retirement info of a series, or None if it is not listed."""
+        info = self.data.get(series_key)
+        if info is not None:
+            return info
+
+        match = _VERSIONED_SERIES_PATTERN.match(series_key)
+        if match and match.group(2):
+            return self._casefolded.get(series_key.casefold())
+        return None
+
+
+@dataclass
+class _Source:
+    """Parsed series of one retirement markdown file and the ETag it was served with."""
+
+    etag: str | None
+    series: dict[str, VMSeriesRetirementInfo]
+
+
+def _info_to_dict(info: VMSeriesRetirementInfo) -> dict[str, Any]:
+    """Serialize retirement info for the disk cache."""
+    data = asdict(info)
+    data["status"] = info.status.value
+    return data
+
+
+def _info_from_dict(data: dict[str, Any]) -> VMSeriesRetirementInfo:
+    """Restore retirement info from the disk cache."""
+    return VMSeriesRetirementInfo(**{**data, "status": RetirementStatus(data["status"])})
+
+
 class RetirementService:
-    """Service for managing VM retirement status information."""
+    """Service for managing VM retirement status information.
+
+    Retirement data comes from two markdown files in the Azure compute docs
+    repository. Once the data is older than RETIREMENT_CACHE_TTL, a background
+    task revalidates both files with ETag conditional requests; lookups never
+    wait for it and use the last good data (or FALLBACK_RETIREMENT_DATA)
+    meanwhile. With a disk cache, the parsed files survive restarts.
+    """
 
     def __init__(self, client: AzurePricingClient) -> None:
         self._client = client
-        self._cache: dict[str, VMSeriesRetirementInfo] | None = None
+        self._sources: dict[str, _Source] = {}
+        self._table = RetirementTable(FALLBACK_RETIREMENT_DATA.copy())
+        # When the sources were last validated upstream, and when a refresh was last attempted
         self._cache_time: datetime | None = None
+        self._last_attempt: datetime | None = None
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[bool] | None = None
+
+    async def start(self) -> None:
+        """Load persisted retirement data and refresh it in the background if stale."""
+        await self._load_persisted()
+        self._schedule_refresh()
+
+    async def aclose(self) -> None:
+        """Cancel a running background refresh."""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
     async def get_retirement_data(self) -> dict[str, VMSeriesRetirementInfo]:
-        """Get retirement data, using cache if valid or fetching fresh data."""
-        now = datetime.now()
-
-        # Check if cache is valid
-        if self._cache is not None and self._cache_time is not None and (now - self._cache_time) < RETIREMENT_CACHE_TTL:
-            return self._cache
-
-        # Fetch fresh data
-        self._cache = await self._fetch_retirement_data()
-        self._cache_time = now
-        return self._cache
+        """Get the last good retirement data without waiting for a refresh."""
+        table = await self.get_retirement_table()
+        return table.data
+
+    async def get_retirement_table(self) -> RetirementTable:
+        """Get the compiled retirement table without waiting for a refresh.
+
+        Stale data is returned as is and starts a background refresh.
+        """
+        await self._load_persisted()
+        self._schedule_refresh()
+        return self._table
+
+    def _refresh_due(self, now: datetime) -> bool:
+        """Whether the data is stale and no failed refresh was attempted too recently."""
+        if self._cache_time is not None and now - self._cache_time < RETIREMENT_CACHE_TTL:
+            return False
+        return self._last_attempt is None or now - self._last_attempt >= RETIREMENT_RETRY_INTERVAL
+
+    def _schedule_refresh(self) -> None:
+        """Start a background refresh if one is due and none is running."""
+        if not self._client.session or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        if self._refresh_due(datetime.now()):
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> bool:
+        """Revalidate both retirement files and recompile the table if either changed.
+
+        Unchanged files cost a 304 response. A file that fails to download or
+        parse keeps its last good data.
+
+        Returns:
+            True if both files were validated
+        """
+        self._last_attempt = datetime.now()
+        parsers = {RETIRED_SIZES_URL: self._parse_retired_sizes_md, PREVIOUS_GEN_URL: self._parse_previous_gen_md}
+
+        # A fresh budget replaces the budget of the tool call that scheduled this refresh
+        with request_budget(max_upstream_calls=len(parsers)):
+            results = await asyncio.gather(
+                *(self._fetch_source(url, parse) for url, parse in parsers.items()), return_exceptions=True
+            )
 
-    async def _fetch_retirement_data(self) -> dict[str, VMSeriesRetirementInfo]:
-        """Fetch VM retirement status data from Microsoft docs on GitHub."""
-        if not self._client.session:
-            logger.warning("HTTP session not initialized, using fallback retirement data")
-            return FALLBACK_RETIREMENT_DATA.copy()
+        changed = False
+        validated = True
+        for url, result in zip(parsers, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to refresh retirement data from {url}: {result}")
+                validated = False
+            elif result is not None:
+                self._sources[url] = result
+                changed = True
+
+        if changed:
+            self._compile()
+        if validated:
+            self._cache_time = self._last_attempt
+        if changed or validated:
+            await self._persist()
+        return validated
+
+    async def _fetch_source(
+        self, url: str, parse: Callable[[str], dict[str, VMSeriesRetirementInfo]]
+    ) -> _Source | None:
+        """Fetch and parse one markdown file, or return None when it has not changed."""
+        previous = self._sources.get(url)
+        response = await self._client.fetch_text_conditional(url, etag=previous.etag if previous else None)
+        if response.not_modified:
+            return None
+        series = parse(response.text or "")
+        if not series:
+            raise ValueError("no VM series found in the markdown")
+        return _Source(etag=response.etag, series=series)
 
+    def _compile(self) -> None:
+        """Merge the parsed files into a new table; retired sizes take precedence over previous-gen."""
         retirement_data: dict[str, VMSeriesRetirementInfo] = {}
 
+        retired = self._sources.get(RETIRED_SIZES_URL)
+        if retired is not None:
+            retirement_data.update(retired.series)
+
+        previous_gen = self._sources.get(PREVIOUS_GEN_URL)
+        if previous_gen is not None:
+            for key, value in previous_gen.series.items():
+                retirement_data.setdefault(key, value)
+
+        if retirement_data:
+            logger.info(f"Loaded retirement data for {len(retirement_data)} VM series")
+            self._table = RetirementTable(retirement_data)
+
+    async def _load_persisted(self) -> None:
+        """Load the parsed files saved by an earlier refresh, once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            disk_cache = self._client.disk_cache
+            if disk_cache is None:
+                return
+            try:
+                entry = await asyncio.to_thread(disk_cache.get_entry, PERSISTED_SOURCES_KEY)
+                if entry is None:
+                    return
+                stored = entry[0]
+                self._sources = {
+                    url: _Source(
+                        etag=source["etag"],
+                        series={key: _info_from_dict(info) for key, info in source["series"].items()},
+                    )
+                    for url, source in stored["sources"].items()
+                    if url in (RETIRED_SIZES_URL, PREVIOUS_GEN_URL)
+                }
+                refreshed_at = stored.get("refreshed_at")
+                self._cache_time = datetime.fromtimestamp(refreshed_at) if refreshed_at else None
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable persisted retirement data: {e}")
+                self._sources = {}
+                return
+            self._compile()
+
+    async def _persist(self) -> None:
+        """Save the parsed files and their ETags to the disk cache, if configured."""
+        disk_cache = self._client.disk_cache
+        if disk_cache is None:
+            return
+        stored = {
+            "refreshed_at": self._cache_time.timestamp() if self._cache_time else None,
+            "sources": {
+                url: {"etag": source.etag, "series": {key: _info_to_dict(info) for key, info in source.series.items()}}
+                for url, source in self._sources.items()
+            },
+        }
         try:
-            # Fetch both markdown files in parallel
-            results = await asyncio.gather(
-                self._client.fetch_text(RETIRED_SIZES_URL),
-                self._client.fetch_text(PREVIOUS_GEN_URL),
-                return_exceptions=True,
-            )
-            retired_result, previous_gen_result = results
-
-            # Handle exceptions from gather
-            retired_md: str = ""
-            previous_gen_md: str = ""
-
-            if isinstance(retired_result, Exception):
-                logger.warning(f"Failed to fetch retired sizes: {retired_result}")
-            elif isinstance(retired_result, str):
-                retired_md = retired_result
-
-            if isinstance(previous_gen_result, Exception):
-                logger.warning(f"Failed to fetch previous-gen sizes: {previous_gen_result}")
-            elif isinstance(previous_gen_result, str):
-                previous_gen_md = previous_gen_result
-
-            # Parse retired sizes markdown (takes precedence)
-            if retired_md:
-                retirement_data.update(self._parse_retired_sizes_md(retired_md))
-
-            # Parse previous-gen sizes markdown (only add if not already in retirement_data)
-            if previous_gen_md:
-                previous_gen_data = self._parse_previous_gen_md(previous_gen_md)
-                for key, value in previous_gen_data.items():
-                    if key not in retirement_data:
-                        retirement_data[key] = value
-
-            if retirement_data:
-                logger.info(f"Fetched retirement data for {len(retirement_data)} VM series")
-                return retirement_data
-            else:
-                logger.warning("No retirement data parsed, using fallback")
-                return FALLBACK_RETIREMENT_DATA.copy()
-
+            await asyncio.to_thread(disk_cache.set, PERSISTED_SOURCES_KEY, stored, PERSISTED_SOURCES_TTL_SECONDS)
         except Exception as e:
-            logger.warning(f"Failed to fetch retirement data: {e}, using fallback")
-            return FALLBACK_RETIREMENT_DATA.copy()
+            logger.warning(f"Failed to persist retirement data: {e}")
 
     def _parse_retired_sizes_md(self, md_content: str) -> dict[str, VMSeriesRetirementInfo]:
         """Parse the retired-sizes-list.md markdown content."""
@@ -354,38 +551,14 @@ class RetirementService:
 
     def get_series_from_sku(self, sku_name: str) -> str | None:
         """Extract the VM series identifier from a SKU name."""
-        if not sku_name:
-            return None
-
-        normalized = sku_name.strip()
-        for prefix in ["Standard_", "Basic_", "standard_", "basic_"]:
-            if normalized.startswith(prefix):
-                normalized = normalized[len(prefix) :]
-                break
-
-        normalized = normalized.replace("_", " ")
-
-        match = re.match(r"^([A-Za-z]+)\d*([a-z]*)\s*v?(\d+)?", normalized, re.IGNORECASE)
-
-        if match:
-            prefix = match.group(1)
-            suffix = match.group(2) or ""
-            version = match.group(3)
-
-            series_key = f"{prefix}{suffix}"
-            if version:
-                series_key += f"v{version}"
-
-            return series_key
-
-        return None
+        return series_from_sku(sku_name)
 
     async def check_skus_retirement_status(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Check retirement status for SKUs in the results."""
         if not items:
             return []
 
-        retirement_data = await self.get_retirement_data()
+        table = await self.get_retirement_table()
 
         seen_series: set[str] = set()
         warnings: list[dict[str, Any]] = []
@@ -395,13 +568,13 @@ class RetirementService:
             if not sku_name:
                 continue
 
-            series_key = self.get_series_from_sku(sku_name)
+            series_key = series_from_sku(sku_name)
             if not series_key or series_key in seen_series:
                 continue
 
             seen_series.add(series_key)
 
-            retirement_info = self._match_series_to_retirement(series_key, retirement_data)
+            retirement_info = table.match(series_key)
 
             if retirement_info and retirement_info.status != RetirementStatus.CURRENT:
                 warning: dict[str, Any] = {
@@ -419,25 +592,3 @@ class RetirementService:
                 warnings.append(warning)
 
         return warnings
-
-    def _match_series_to_retirement(
-        self, series_key: str, retirement_data: dict[str, VMSeriesRetirementInfo]
-    ) -> VMSeriesRetirementInfo | None:
-        """Match a series key to retirement data with smart matching."""
-        if series_key in retirement_data:
-            return retirement_data[series_key]
-
-        match = re.match(r"^([A-Za-z]+)(v\d+)?$", series_key, re.IGNORECASE)
-        if not match:
-            return None
-
-        version = match.group(2)
-
-        if version:
-            if series_key.lower() in [k.lower() for k in retirement_data]:
-                for k, v in retirement_data.items():
-                    if k.lower() == series_key.lower():
-                        return v
-            return None
-
-        return None
@@ -1,19 +1,28 @@
 """SKU discovery service for Azure Pricing MCP Server."""
 
+import asyncio
 import logging
 from typing import Any
 
-from ..config import SERVICE_NAME_MAPPINGS
+from ..budget import BudgetExceededError
+from ..config import SERVICE_INDEX_TTL_SECONDS, SERVICE_NAME_MAPPINGS, SKU_DISCOVERY_MAX_PAGES
+from ..fuzzy import ServiceIndex, ServiceMatch
 from .pricing import PricingService
 
 logger = logging.getLogger(__name__)
 
+# Items of the single unfiltered page used to seed the service index when no catalog is configured
+SERVICE_INDEX_SEARCH_LIMIT = 1000
+
 
 class SKUService:
     """Service for SKU discovery and matching operations."""
 
-    def __init__(self, pricing_service: PricingService) -> None:
+    def __init__(self, pricing_service: PricingService, service_index_ttl: float = SERVICE_INDEX_TTL_SECONDS) -> None:
         self._pricing_service = pricing_service
+        self._service_index_ttl = service_index_ttl
+        # Service name indexes per currency (their sample items carry prices)
+        self._service_indexes: dict[str, ServiceIndex] = {}
 
     async def discover_skus(
         self,
@@ -31,37 +40,31 @@ class SKUService:
         if price_type:
             filter_conditions.append(f"priceType eq '{price_type}'")
 
-        data = await self._pricing_service._client.fetch_prices(
-            filter_conditions=filter_conditions,
-            currency_code="USD",
-            limit=limit,
-        )
-
+        # Stream pages until enough distinct SKUs are found; `limit` caps SKUs, not meters
         skus: dict[str, dict[str, Any]] = {}
-        items = data.get("Items", [])
-
-        for item in items:
-            sku_name = item.get("skuName")
-            arm_sku_name = item.get("armSkuName")
-            product_name = item.get("productName")
-            item_region = item.get("armRegionName")
-            price = item.get("retailPrice", 0)
-            unit = item.get("unitOfMeasure")
-            meter_name = item.get("meterName")
-
-            if sku_name and sku_name not in skus:
-                skus[sku_name] = {
-                    "sku_name": sku_name,
-                    "arm_sku_name": arm_sku_name,
-                    "product_name": product_name,
-                    "sample_price": price,
-                    "unit_of_measure": unit,
-                    "meter_name": meter_name,
-                    "sample_region": item_region,
-                    "available_regions": [item_region] if item_region else [],
-                }
-            elif sku_name and item_region and item_region not in skus[sku_name]["available_regions"]:
-                skus[sku_name]["available_regions"].append(item_region)
+        pages = 0
+        truncated = False
+        try:
+            async for page in self._pricing_service._client.iter_price_pages(
+                filter_conditions=filter_conditions,
+                currency_code="USD",
+                max_pages=SKU_DISCOVERY_MAX_PAGES,
+            ):
+                pages += 1
+                known = len(skus)
+                if self._add_discovered_skus(skus, page.get("Items", []), limit):
+                    # A SKU beyond `limit` was left out
+                    truncated = True
+                    break
+                # Later pages mostly repeat known SKUs in other regions, so a page without new ones ends the scan
+                if page.get("NextPageLink") and (len(skus) == known or pages >= SKU_DISCOVERY_MAX_PAGES):
+                    truncated = True
+                    break
+        except BudgetExceededError:
+            if not skus:
+                raise
+            truncated = True
+            logger.info(f"SKU discovery stopped after {len(skus)} SKUs: request budget exhausted")
 
         sku_list = list(skus.values())
         sku_list.sort(key=lambda x: x["sku_name"])
@@ -72,8 +75,40 @@ class SKUService:
             "total_skus": len(sku_list),
             "price_type": price_type,
             "region_filter": region,
+            "pages_scanned": pages,
+            "truncated": truncated,
         }
 
+    @staticmethod
+    def _add_discovered_skus(skus: dict[str, dict[str, Any]], items: list[dict[str, Any]], limit: int) -> bool:
+        """Merge one page of items into the discovered SKUs.
+
+        Returns:
+            True once an item of a new SKU is seen after `limit` SKUs were found
+        """
+        for item in items:
+            sku_name = item.get("skuName")
+            if not sku_name:
+                continue
+            item_region = item.get("armRegionName")
+            if sku_name in skus:
+                if item_region and item_region not in skus[sku_name]["available_regions"]:
+                    skus[sku_name]["available_regions"].append(item_region)
+                continue
+            if len(skus) >= limit:
+                return True
+            skus[sku_name] = {
+                "sku_name": sku_name,
+                "arm_sku_name": item.get("armSkuName"),
+                "product_name": item.get("productName"),
+                "sample_price": item.get("retailPrice", 0),
+                "unit_of_measure": item.get("unitOfMeasure"),
+                "meter_name": item.get("meterName"),
+                "sample_region": item_region,
+                "available_regions": [item_region] if item_region else [],
+            }
+        return False
+
     async def search_with_fuzzy_matching(
         self,
         service_name: str | None = None,
@@ -97,6 +132,8 @@ class SKUService:
         )
 
         if exact_result["items"]:
+            if currency_code in self._service_indexes:
+                self._service_indexes[currency_code].add_items(exact_result["items"])
             return exact_result
 
         if suggest_alternatives and (service_name or service_family):
@@ -109,6 +146,56 @@ class SKUService:
 
         return exact_result
 
+    async def _service_index(self, currency_code: str, seed: bool = True) -> tuple[ServiceIndex, bool]:
+        """Get the service name index for a currency, rebuilding it once it is stale.
+
+        With an offline catalog the index holds every service, family and
+        product name it contains. Without one it holds the official names in
+        SERVICE_NAME_MAPPINGS plus the services on one page of a broad search
+        (usually cached), and learns from search results. A search cut
+        short by the request budget is indexed for this lookup only, so the
+        next lookup seeds the index again.
+
+        Args:
+            currency_code: Currency of the indexed items
+            seed: Whether a stale index may be seeded with an upstream search
+                when there is no catalog; if not, the stale index is used as is
+
+        Returns:
+            Tuple of (index, whether an upstream search seeded it)
+        """
+        index = self._service_indexes.get(currency_code)
+        if index is None:
+            index = self._service_indexes[currency_code] = ServiceIndex(ttl=self._service_index_ttl)
+        if not index.is_stale():
+            return index, False
+
+        catalog = self._pricing_service._client.catalog
+        items = None
+        if catalog is not None:
+            items = await asyncio.to_thread(catalog.distinct_services, currency_code)
+        seeded = truncated = False
+        if items is None:
+            if not seed:
+                if index.built_at is not None:
+                    return index, False
+                # Never seeded: the aliases alone, for this lookup only
+                items, truncated = [], True
+            else:
+                seeded = True
+                try:
+                    page = await self._pricing_service._client.fetch_prices(
+                        currency_code=currency_code, limit=SERVICE_INDEX_SEARCH_LIMIT
+                    )
+                    items = page.get("Items", [])
+                except BudgetExceededError:
+                    items, truncated = [], True
+        if truncated:
+            index = ServiceIndex(ttl=self._service_index_ttl)
+        index.rebuild(items, aliases=SERVICE_NAME_MAPPINGS)
+        logger.debug(f"Indexed {len(index)} services for {currency_code}")
+        return index, seeded
+
     async def _find_similar_services(
         self,
         service_name: str | None = None,
@@ -116,82 +203,59 @@ class SKUService:
         currency_code: str = "USD",
         limit: int = 50,
     ) -> dict[str, Any]:
-        """Find services with similar names or suggest alternatives."""
-        suggestions = []
+        """Find services with similar names or suggest alternatives.
+
+        Candidates come from the local service index. At most one upstream
+        search is made: the prices of an exact SERVICE_NAME_MAPPINGS hit, or
+        else the broad search seeding a stale index when there is no catalog,
+        or else sample items for suggested services the index has no items for.
+        Suggestions from a freshly seeded index keep the samples of that search.
+        """
         search_term = service_name.lower() if service_name else ""
+        matches: list[ServiceMatch] = []
+        absent: set[str] = set()
+        searched = False
 
-        # Try exact mapping first
         if search_term in SERVICE_NAME_MAPPINGS:
             correct_name = SERVICE_NAME_MAPPINGS[search_term]
-            result = await self._pricing_service.search_prices(
-                service_name=correct_name,
-                currency_code=currency_code,
-                limit=limit,
-            )
-
-            if result["items"]:
-                result["suggestion_used"] = correct_name
-                result["original_search"] = service_name
-                result["match_type"] = "exact_mapping"
-                return result
-
-        # Try partial matching
-        partial_matches = []
-        for user_term, azure_service in SERVICE_NAME_MAPPINGS.items():
-            if search_term in user_term or user_term in search_term:
-                partial_matches.append(azure_service)
-
-        for azure_service in list(set(partial_matches)):
-            result = await self._pricing_service.search_prices(
-                service_name=azure_service,
-                currency_code=currency_code,
-                limit=5,
-            )
-
-            if result["items"]:
-                suggestions.append(
-                    {
-                        "service_name": azure_service,
-                        "match_reason": f"Partial match for '{service_name}'",
-                        "sample_items": result["items"][:3],
-                    }
-                )
-
-        # Broad search if no matches
-        if not suggestions:
-            broad_result = await self._pricing_service.search_prices(
-                service_family=service_family,
-                currency_code=currency_code,
-                limit=100,
-            )
-
-            matching_services: set[str] = set()
-            for item in broad_result.get("items", []):
-                service = item.get("serviceName", "")
-                product = item.get("productName", "")
-
-                if (
-                    search_term in service.lower()
-                    or search_term in product.lower()
-                    or any(word in service.lower() for word in search_term.split())
-                ):
-                    matching_services.add(service)
-
-            for service in list(matching_services)[:5]:
-                service_result = await self._pricing_service.search_prices(
-                    service_name=service,
+            searched = True
+            try:
+                result = await self._pricing_service.search_prices(
+                    service_name=correct_name,
                     currency_code=currency_code,
-                    limit=3,
+                    limit=limit,
                 )
-
-                if service_result["items"]:
-                    suggestions.append(
-                        {
-                            "service_name": service,
-                            "match_reason": f"Contains '{search_term}'",
-                            "sample_items": service_result["items"][:2],
-                        }
-                    )
+            except BudgetExceededError:
+                logger.info(f"Stopped looking up '{correct_name}': request budget exhausted")
+            else:
+                if result["items"]:
+                    if currency_code in self._service_indexes:
+                        self._service_indexes[currency_code].add_items(result["items"])
+                    result["suggestion_used"] = correct_name
+                    result["original_search"] = service_name
+                    result["match_type"] = "exact_mapping"
+                    return result
+                if not result["has_more"]:
+                    absent.add(correct_name)
+
+        try:
+            index, seeded = await self._service_index(currency_code, seed=not searched)
+            matches = index.lookup(search_term, service_family=service_family, limit=5)
+            unsampled = [match.entry.service_name for match in matches if not match.entry.sample_items]
+            if unsampled and not (searched or seeded):
+                absent = await self._sample_services(index, unsampled, currency_code)
+        except BudgetExceededError:
+            logger.info(f"Stopped looking for services similar to '{search_term}': request budget exhausted")
+
+        suggestions = [
+            {
+                "service_name": match.entry.service_name,
+                "match_reason": match.reason,
+                "sample_items": match.entry.sample_items[:3],
+            }
+            for match in matches
+            if match.entry.service_name not in absent
+        ]
 
         return {
             "items": [],
@@ -203,6 +267,23 @@ class SKUService:
             "match_type": "suggestions_only",
         }
 
+    async def _sample_services(self, index: ServiceIndex, service_names: list[str], currency_code: str) -> set[str]:
+        """Fetch sample items for several services with one OR-filtered request.
+
+        Returns:
+            Names of services the (complete) response shows to have no prices
+        """
+        conditions = [f"serviceName eq '{name}'" for name in service_names]
+        page = await self._pricing_service._client.fetch_prices(
+            filter_conditions=["(" + " or ".join(conditions) + ")" if len(conditions) > 1 else conditions[0]],
+            currency_code=currency_code,
+        )
+        items = page.get("Items", [])
+        index.add_items(items)
+        if page.get("NextPageLink") or page.get("HasMore"):
+            return set()
+        return {name for name in service_names if not (entry := index.get(name)) or not entry.sample_items}
+
     async def discover_service_skus(
         self,
         service_hint: str,
@@ -6,20 +6,34 @@ This service provides access to Azure Spot VM data through:
 
 All methods require Azure authentication. If not authenticated, they return
 a friendly error message with instructions for how to authenticate.
+
+Requests share one pooled HTTP session, opened and closed with the service
+(`async with SpotService()`, or by AzurePricingServer), so repeated queries
+reuse warm connections to management.azure.com.
 """
 
+import asyncio
 import json
 import logging
-from datetime import datetime
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import aiohttp
+from cachetools import TTLCache
 
 from ..auth import AzureCredentialManager, get_credential_manager
 from ..config import (
     AZURE_COMPUTE_API_VERSION,
     AZURE_RESOURCE_GRAPH_API_VERSION,
     AZURE_RESOURCE_GRAPH_URL,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    SPOT_CACHE_MAX_ENTRIES,
+    SPOT_CACHE_TTL,
+    SPOT_CONNECTION_LIMIT,
+    SPOT_KEEPALIVE_SECONDS,
+    SSL_VERIFY,
 )
 
 logger = logging.getLogger(__name__)
@@ -36,13 +50,52 @@ class SpotService:
 
         Args:
             credential_manager: Optional credential manager. If not provided,
-                              uses the singleton instance.
+                              uses the singleton instance, created on first use.
         """
-        self._credential_manager = credential_manager or get_credential_manager()
-        self._eviction_cache: dict[str, Any] | None = None
-        self._eviction_cache_time: datetime | None = None
-        self._price_cache: dict[str, Any] | None = None
-        self._price_cache_time: datetime | None = None
+        self.session: aiohttp.ClientSession | None = None
+        self._credentials = credential_manager
+        # Eviction rate rows per (sku, location), empty when Resource Graph has none for the pair
+        self._eviction_cache: TTLCache[tuple[str, str], list[dict[str, Any]]] = TTLCache(
+            maxsize=SPOT_CACHE_MAX_ENTRIES, ttl=SPOT_CACHE_TTL.total_seconds()
+        )
+        # Price history results per (sku, location, os_type)
+        self._price_cache: TTLCache[tuple[str, str, str], dict[str, Any]] = TTLCache(
+            maxsize=SPOT_CACHE_MAX_ENTRIES, ttl=SPOT_CACHE_TTL.total_seconds()
+        )
+
+    @property
+    def credential_manager(self) -> AzureCredentialManager:
+        """Get the credential manager, creating the singleton on first use."""
+        if self._credentials is None:
+            self._credentials = get_credential_manager()
+        return self._credentials
+
+    async def __aenter__(self) -> "SpotService":
+        """Open the pooled HTTP session shared by Spot requests."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=SPOT_CONNECTION_LIMIT,
+                keepalive_timeout=SPOT_KEEPALIVE_SECONDS,
+                ssl=SSL_VERIFY,
+            )
+            timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS, sock_connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Close the pooled HTTP session."""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the pooled session, or a one-off session when the service was not opened."""
+        if self.session is not None and not self.session.closed:
+            yield self.session
+            return
+        async with aiohttp.ClientSession() as session:
+            yield session
 
     def _check_authentication(self) -> dict[str, Any] | None:
         """Check if user is authenticated.
@@ -51,20 +104,20 @@ class SpotService:
             None if authenticated, error dict if not.
         """
         # Check for initialization errors first
-        init_error = self._credential_manager.get_initialization_error()
+        init_error = self.credential_manager.get_initialization_error()
         if init_error:
             return {
                 "error": "authentication_required",
                 "message": init_error,
-                "help": self._credential_manager.get_authentication_help_message(),
+                "help": self.credential_manager.get_authentication_help_message(),
             }
 
         # Check if we can get a token
-        if not self._credential_manager.is_authenticated():
+        if not self.credential_manager.is_authenticated():
             return {
                 "error": "authentication_required",
                 "message": "Azure authentication required for Spot VM tools.",
-                "help": self._credential_manager.get_authentication_help_message(),
+                "help": self.credential_manager.get_authentication_help_message(),
             }
 
         return None
@@ -81,12 +134,12 @@ class SpotService:
         Returns:
             Query results or error dict.
         """
-        token = self._credential_manager.get_token()
+        token = self.credential_manager.get_token()
         if not token:
             return {
                 "error": "token_acquisition_failed",
                 "message": "Failed to acquire Azure access token.",
-                "help": self._credential_manager.get_authentication_help_message(),
+                "help": self.credential_manager.get_authentication_help_message(),
             }
 
         url = f"{AZURE_RESOURCE_GRAPH_URL}?api-version={AZURE_RESOURCE_GRAPH_API_VERSION}"
@@ -99,7 +152,7 @@ class SpotService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._session() as session:
                 async with session.post(url, headers=headers, json=body) as response:
                     if response.status == 200:
                         result: dict[str, Any] = await response.json()
@@ -108,13 +161,13 @@ class SpotService:
                         return {
                             "error": "unauthorized",
                             "message": "Azure credentials are invalid or expired.",
-                            "help": self._credential_manager.get_authentication_help_message(),
+                            "help": self.credential_manager.get_authentication_help_message(),
                         }
                     elif response.status == 403:
                         return {
                             "error": "forbidden",
                             "message": "Insufficient permissions for Resource Graph query.",
-                            "help": self._credential_manager.get_required_permissions_message(),
+                            "help": self.credential_manager.get_required_permissions_message(),
                         }
                     else:
                         error_text = await response.text()
@@ -123,7 +176,7 @@ class SpotService:
                             "message": f"Resource Graph API error: {response.status}",
                             "details": error_text,
                         }
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return {
                 "error": "network_error",
                 "message": f"Failed to connect to Azure Resource Graph: {e}",
@@ -136,6 +189,9 @@ class SpotService:
     ) -> dict[str, Any]:
         """Get Spot VM eviction rates for specified SKUs and locations.
 
+        Rates are cached per (SKU, location) for SPOT_CACHE_TTL, and only the
+        pairs missing from the cache are queried.
+
         Args:
             skus: List of VM SKU names (e.g., ["Standard_D2s_v4", "Standard_D4s_v4"]).
             locations: List of Azure regions (e.g., ["eastus", "westus2"]).
@@ -148,11 +204,68 @@ class SpotService:
         if auth_error:
             return auth_error
 
-        # Build the query
+        # Take cached (sku, location) pairs now and group the missing ones by their set of SKUs
+        sku_keys = list(dict.fromkeys(sku.lower() for sku in skus))
+        location_keys = list(dict.fromkeys(location.lower() for location in locations))
+        found: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        groups: dict[tuple[str, ...], list[str]] = {}
+        for location in location_keys:
+            missing = []
+            for sku in sku_keys:
+                cached = self._eviction_cache.get((sku, location))
+                if cached is None:
+                    missing.append(sku)
+                else:
+                    found[(sku, location)] = cached
+            if missing:
+                groups.setdefault(tuple(missing), []).append(location)
+
+        # One query per group covers exactly its missing pairs
+        results = await asyncio.gather(
+            *(
+                self._execute_resource_graph_query(self._eviction_rates_query(list(group_skus), group_locations))
+                for group_skus, group_locations in groups.items()
+            )
+        )
+        for result in results:
+            if "error" in result:
+                return result
+
+        cached_pairs = len(found)
+        for (group_skus, group_locations), result in zip(groups.items(), results, strict=True):
+            rows: dict[tuple[str, str], list[dict[str, Any]]] = {
+                (sku, location): [] for sku in group_skus for location in group_locations
+            }
+            for row in result.get("data", []):
+                pair = (str(row.get("skuName", "")).lower(), str(row.get("location", "")).lower())
+                if pair in rows:
+                    rows[pair].append(row)
+            for pair, pair_rows in rows.items():
+                self._eviction_cache[pair] = pair_rows
+            found.update(rows)
+
+        data = sorted(
+            (row for pair_rows in found.values() for row in pair_rows),
+            key=lambda row: (row.get("location", ""), row.get("skuName", "")),
+        )
+
+        # Format the response
+        return {
+            "eviction_rates": data,
+            "count": len(data),
+            "skus_queried": skus,
+            "locations_queried": locations,
+            "cached_pairs": cached_pairs,
+            "note": "Eviction rates are categorized as: 0-5%, 5-10%, 10-15%, 15-20%, 20%+",
+        }
+
+    @staticmethod
+    def _eviction_rates_query(skus: list[str], locations: list[str]) -> str:
+        """Build the Resource Graph query for the eviction rates of every SKU in every location."""
         sku_filter = ", ".join(f"'{sku.lower()}'" for sku in skus)
         location_filter = ", ".join(f"'{loc.lower()}'" for loc in locations)
 
-        query = f"""
+        return f"""
 SpotResources
 | where type =~ 'microsoft.compute/skuspotevictionrate/location'
 | where tolower(sku.name) in~ ({sku_filter})
@@ -164,21 +277,6 @@ SpotResources
 | order by location asc, skuName asc
 """
 
-        result = await self._execute_resource_graph_query(query)
-
-        if "error" in result:
-            return result
-
-        # Format the response
-        data = result.get("data", [])
-        return {
-            "eviction_rates": data,
-            "count": len(data),
-            "skus_queried": skus,
-            "locations_queried": locations,
-            "note": "Eviction rates are categorized as: 0-5%, 5-10%, 10-15%, 15-20%, 20%+",
-        }
-
     async def get_price_history(
         self,
         sku: str,
@@ -187,6 +285,8 @@ SpotResources
     ) -> dict[str, Any]:
         """Get Spot VM price history for a specific SKU and location.
 
+        Results are cached per (SKU, location, OS type) for SPOT_CACHE_TTL.
+
         Args:
             sku: VM SKU name (e.g., "Standard_D2s_v4").
             location: Azure region (e.g., "eastus").
@@ -200,6 +300,11 @@ SpotResources
         if auth_error:
             return auth_error
 
+        cache_key = (sku.lower(), location.lower(), os_type.lower())
+        cached = self._price_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         query = f"""
 SpotResources
 | where type =~ 'microsoft.compute/skuspotpricehistory/ostype/location'
@@ -222,26 +327,28 @@ SpotResources
         # Format the response
         data = result.get("data", [])
         if not data:
-            return {
+            history: dict[str, Any] = {
                 "price_history": [],
                 "sku": sku,
                 "location": location,
                 "os_type": os_type,
                 "message": f"No price history found for {sku} in {location} ({os_type})",
             }
+        else:
+            record = data[0]
+            spot_prices = record.get("spotPrices", [])
+            history = {
+                "sku": record.get("skuName", sku),
+                "location": record.get("location", location),
+                "os_type": record.get("osType", os_type),
+                "price_history": spot_prices,
+                "latest_price_usd": spot_prices[0].get("priceUSD") if spot_prices else None,
+                "history_points": len(spot_prices),
+                "note": "Price history covers up to 90 days of Spot pricing data",
+            }
 
-        record = data[0]
-        spot_prices = record.get("spotPrices", [])
-
-        return {
-            "sku": record.get("skuName", sku),
-            "location": record.get("location", location),
-            "os_type": record.get("osType", os_type),
-            "price_history": spot_prices,
-            "latest_price_usd": spot_prices[0].get("priceUSD") if spot_prices else None,
-            "history_points": len(spot_prices),
-            "note": "Price history covers up to 90 days of Spot pricing data",
-        }
+        self._price_cache[cache_key] = history
+        return dict(history)
 
     async def simulate_eviction(
         self,
@@ -265,12 +372,12 @@ SpotResources
         if auth_error:
             return auth_error
 
-        token = self._credential_manager.get_token()
+        token = self.credential_manager.get_token()
         if not token:
             return {
                 "error": "token_acquisition_failed",
                 "message": "Failed to acquire Azure access token.",
-                "help": self._credential_manager.get_authentication_help_message(),
+                "help": self.credential_manager.get_authentication_help_message(),
             }
 
         # Parse the resource ID to extract components
@@ -295,7 +402,7 @@ SpotResources
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._session() as session:
                 async with session.post(url, headers=headers) as response:
                     if response.status == 204:
                         return {
@@ -308,13 +415,13 @@ SpotResources
                         return {
                             "error": "unauthorized",
                             "message": "Azure credentials are invalid or expired.",
-                            "help": self._credential_manager.get_authentication_help_message(),
+                            "help": self.credential_manager.get_authentication_help_message(),
                         }
                     elif response.status == 403:
                         return {
                             "error": "forbidden",
                             "message": "Insufficient permissions to simulate eviction.",
-                            "help": self._credential_manager.get_required_permissions_message("simulate_eviction"),
+                            "help": self.credential_manager.get_required_permissions_message("simulate_eviction"),
                         }
                     elif response.status == 404:
                         return {
@@ -334,7 +441,7 @@ SpotResources
                             "message": f"Compute API error: {response.status}",
                             "details": error_message,
                         }
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return {
                 "error": "network_error",
                 "message": f"Failed to connect to Azure Compute API: {e}",
@@ -78,6 +78,10 @@ def get_tool_definitions() -> list[Tool]:
                         "items": {"type": "string"},
                         "description": "List of regions to compare (if not provided, compares SKUs)",
                     },
+                    "max_regions": {
+                        "type": "integer",
+                        "description": "Maximum number of regions to compare; extra regions are skipped and listed (default: 60)",
+                    },
                     "currency_code": {
                         "type": "string",
                         "description": "Currency code (default: USD)",
@@ -137,6 +141,70 @@ def get_tool_definitions() -> list[Tool]:
                 "required": ["service_name", "sku_name", "region"],
             },
         ),
+        Tool(
+            name="azure_bom_estimate",
+            description="Estimate monthly and yearly costs of a whole bill of materials (many SKUs) in one call",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "lines": {
+                        "type": "array",
+                        "description": "Bill of materials lines; identical service/SKU/region lookups are made once",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "service_name": {
+                                    "type": "string",
+                                    "description": "Azure service name",
+                                },
+                                "sku_name": {
+                                    "type": "string",
+                                    "description": "SKU name",
+                                },
+                                "region": {
+                                    "type": "string",
+                                    "description": "Azure region",
+                                },
+                                "quantity": {
+                                    "type": "number",
+                                    "description": "Number of instances (default: 1)",
+                                    "default": 1,
+                                },
+                                "hours_per_month": {
+                                    "type": "number",
+                                    "description": "Hours of usage per month for hourly meters (default: 730)",
+                                    "default": 730,
+                                },
+                                "units_per_month": {
+                                    "type": "number",
+                                    "description": "Billed units per month per instance for non-hourly meters, e.g. GB (default: 1)",
+                                },
+                                "label": {
+                                    "type": "string",
+                                    "description": "Optional name of the line, e.g. the resource it prices",
+                                },
+                            },
+                            "required": ["service_name", "sku_name", "region"],
+                        },
+                    },
+                    "currency_code": {
+                        "type": "string",
+                        "description": "Currency code (default: USD)",
+                        "default": "USD",
+                    },
+                    "discount_percentage": {
+                        "type": "number",
+                        "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount). If not specified and show_with_discount is false, no discount is applied. If show_with_discount is true, defaults to 10%.",
+                    },
+                    "show_with_discount": {
+                        "type": "boolean",
+                        "description": "Set to true to apply a discount; uses default 10% unless discount_percentage is explicitly specified.",
+                        "default": False,
+                    },
+                },
+                "required": ["lines"],
+            },
+        ),
         Tool(
             name="azure_discover_skus",
             description="Discover available SKUs for a specific Azure service",
@@ -285,6 +353,47 @@ def get_tool_definitions() -> list[Tool]:
                 },
             },
         ),
+        Tool(
+            name="azure_batch",
+            description="Run many independent pricing tool calls in one request. Calls run concurrently, identical calls run once, and results come back in order with per-call errors. All calls share one deadline and upstream request budget.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "calls": {
+                        "type": "array",
+                        "description": "Tool calls to run (at most 50)",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "tool": {
+                                    "type": "string",
+                                    "description": "Tool name",
+                                    "enum": [
+                                        "azure_price_search",
+                                        "azure_price_compare",
+                                        "azure_cost_estimate",
+                                        "azure_bom_estimate",
+                                        "azure_discover_skus",
+                                        "azure_sku_discovery",
+                                        "azure_region_recommend",
+                                        "azure_ri_pricing",
+                                        "get_customer_discount",
+                                        "spot_eviction_rates",
+                                        "spot_price_history",
+                                    ],
+                                },
+                                "arguments": {
+                                    "type": "object",
+                                    "description": "Arguments of the tool, as for a direct call",
+                                },
+                            },
+                            "required": ["tool"],
+                        },
+                    },
+                },
+                "required": ["calls"],
+            },
+        ),
         # Spot VM Tools (require Azure authentication)
         Tool(
             name="spot_eviction_rates",
@@ -0,0 +1,225 @@
+"""Unit tests for micro-batching of concurrent queries."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from azure_pricing_mcp.batching import split_batch_condition
+from azure_pricing_mcp.budget import BudgetExceededError, RequestBudget, current_budget, request_budget
+from azure_pricing_mcp.cache import PriceCache
+from azure_pricing_mcp.circuit import CircuitBreaker
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.disk_cache import DiskCache
+
+
+def _item(region: str, sku: str = "D2 v3") -> dict[str, Any]:
+    """Build a fake Retail Prices API item."""
+    return {"serviceName": "Virtual Machines", "armRegionName": region, "skuName": sku, "retailPrice": 1.0}
+
+
+def _client() -> AzurePricingClient:
+    """Client with a 10 ms batching window and no response cache."""
+    return AzurePricingClient(cache=PriceCache(max_entries=0), batch_window=0.01)
+
+
+def _region_query(region: str) -> list[str]:
+    return ["serviceName eq 'Virtual Machines'", f"armRegionName eq '{region}'", "contains(skuName, 'D2')"]
+
+
+class TestSplitBatchCondition:
+    """Tests for choosing the condition a batch varies."""
+
+    def test_prefers_region(self):
+        """Region conditions are preferred over SKU and service conditions."""
+        condition, shared = split_batch_condition(sorted(_region_query("eastus")))
+
+        assert condition == "armRegionName eq 'eastus'"
+        assert shared == ["contains(skuName, 'D2')", "serviceName eq 'Virtual Machines'"]
+
+    def test_unbatchable(self):
+        """Queries without a simple condition on a batchable field are not batched."""
+        assert split_batch_condition(["retailPrice gt 0"]) is None
+        assert split_batch_condition([]) is None
+
+
+class TestQueryBatcher:
+    """Tests for merging concurrent queries in the client."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_region_queries_share_one_request(self):
+        """Queries differing only in region become one OR-filtered request routed back per caller."""
+        client = _client()
+        response = {
+            "BillingCurrency": "USD",
+            "Items": [_item("eastus"), _item("westus"), _item("eastus", "D2s v3"), _item("northeurope")],
+            "NextPageLink": None,
+        }
+
+        with patch.object(client, "make_request", AsyncMock(return_value=response)) as mock_request:
+            east, west, north = await asyncio.gather(
+                client.fetch_prices(_region_query("eastus"), limit=10),
+                client.fetch_prices(_region_query("westus"), limit=10),
+                client.fetch_prices(_region_query("northeurope"), limit=1),
+            )
+
+        mock_request.assert_called_once()
+        merged_filter = mock_request.call_args.kwargs["params"]["$filter"]
+        assert (
+            "(armRegionName eq 'eastus' or armRegionName eq 'northeurope' or armRegionName eq 'westus')"
+            in merged_filter
+        )
+        assert "$top" not in mock_request.call_args.kwargs["params"]
+        assert [item["skuName"] for item in east["Items"]] == ["D2 v3", "D2s v3"]
+        assert [item["armRegionName"] for item in west["Items"]] == ["westus"]
+        assert north["Count"] == 1 and north["HasMore"] is False
+        assert east["BillingCurrency"] == "USD"
+        assert client.batcher is not None and client.batcher.batched_queries == 3
+
+    @pytest.mark.asyncio
+    async def test_single_query_is_sent_unchanged(self):
+        """A query alone in its window is fetched as usual."""
+        client = _client()
+
+        with patch.object(client, "make_request", AsyncMock(return_value={"Items": []})) as mock_request:
+            await client.fetch_prices(_region_query("eastus"), limit=10)
+
+        assert "armRegionName eq 'eastus' and" in mock_request.call_args.kwargs["params"]["$filter"]
+        assert mock_request.call_args.kwargs["params"]["$top"] == "10"
+
+    @pytest.mark.asyncio
+    async def test_truncated_merge_falls_back_for_unsatisfied_callers(self):
+        """When the merged result stops at the page cap, callers short of their limit fetch separately."""
+        client = _client()
+        assert client.batcher is not None
+        client.batcher._max_pages = 1
+        responses = [
+            {"Items": [_item("eastus"), _item("eastus")], "NextPageLink": "https://prices.azure.com/next"},
+            {"Items": [_item("westus")], "NextPageLink": None},
+        ]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=responses)) as mock_request:
+            east, west = await asyncio.gather(
+                client.fetch_prices(_region_query("eastus"), limit=2),
+                client.fetch_prices(_region_query("westus"), limit=2),
+            )
+
+        assert mock_request.call_count == 2
+        assert east["Count"] == 2 and east["HasMore"] is True
+        assert west["Items"] == [_item("westus")]
+        assert client.batcher.fallbacks == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_merge_falls_back(self):
+        """If the merged request fails, every caller fetches its own query."""
+        client = _client()
+        responses = [RuntimeError("boom"), {"Items": [_item("eastus")]}, {"Items": [_item("westus")]}]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=responses)) as mock_request:
+            results = await asyncio.gather(
+                client.fetch_prices(_region_query("eastus"), limit=5),
+                client.fetch_prices(_region_query("westus"), limit=5),
+            )
+
+        assert mock_request.call_count == 3
+        assert sorted(result["Items"][0]["armRegionName"] for result in results) == ["eastus", "westus"]
+
+    @pytest.mark.asyncio
+    async def test_merged_fetch_has_its_own_budget(self):
+        """The merged request runs under a fresh budget; each caller is charged one call."""
+        client = _client()
+        fetch_budgets = []
+
+        async def make_request(**kwargs: Any) -> dict[str, Any]:
+            fetch_budgets.append(current_budget())
+            return {"Items": [_item("eastus"), _item("westus")]}
+
+        async def caller(region: str) -> RequestBudget:
+            with request_budget(timeout=5, max_upstream_calls=3) as budget:
+                await client.fetch_prices(_region_query(region), limit=5)
+            return budget
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=make_request)):
+            budgets = await asyncio.gather(caller("eastus"), caller("westus"))
+
+        assert len(fetch_budgets) == 1
+        assert fetch_budgets[0] is not None and fetch_budgets[0] not in budgets
+        assert [budget.upstream_calls for budget in budgets] == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_fallback_is_charged_once(self):
+        """A caller that fetches its query itself pays one call, not one for the batch as well."""
+        client = _client()
+        responses = [
+            RuntimeError("boom"),
+            {"Items": [_item("eastus")]},
+            {"Items": [_item("westus")]},
+            {"Items": [_item("northeurope")]},
+        ]
+
+        async def caller(region: str) -> RequestBudget:
+            with request_budget(timeout=5, max_upstream_calls=1) as budget:
+                await client.fetch_prices(_region_query(region), limit=5)
+            return budget
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=responses)):
+            budgets = await asyncio.gather(caller("eastus"), caller("westus"))
+            alone = await caller("northeurope")
+
+        assert [budget.upstream_calls for budget in [*budgets, alone]] == [1, 1, 1]
+        assert not any(budget.truncated for budget in [*budgets, alone])
+
+    @pytest.mark.asyncio
+    async def test_batched_results_are_served_stale_once_the_circuit_opens(self, tmp_path):
+        """Batched results are kept as last good responses and on disk, like separately fetched ones."""
+        disk_cache = DiskCache(tmp_path / "cache.sqlite3")
+        client = AzurePricingClient(
+            cache=PriceCache(max_entries=0),
+            batch_window=0.01,
+            circuit_breaker=CircuitBreaker(failure_threshold=1),
+            disk_cache=disk_cache,
+        )
+        client.session = MagicMock()
+        server_error = aiohttp.ClientResponseError(MagicMock(), (), status=503, message="Service Unavailable")
+        responses = [{"Items": [_item("eastus"), _item("westus")], "NextPageLink": None}, server_error]
+
+        with patch.object(client, "_request_with_retries", AsyncMock(side_effect=responses)) as mock_request:
+            await asyncio.gather(
+                client.fetch_prices(_region_query("eastus"), limit=5),
+                client.fetch_prices(_region_query("westus"), limit=5),
+            )
+            # The merged response and each caller's share
+            assert disk_cache.stats()["entries"] == 3
+            disk_cache.clear()
+            stale = await client.fetch_prices(_region_query("eastus"), limit=5)
+
+        assert mock_request.call_count == 2
+        assert client.circuit_breaker.is_open
+        assert stale["Stale"] is True
+        assert stale["Items"] == [_item("eastus")]
+        await client.circuit_breaker.aclose()
+        disk_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_callers_stop_waiting_at_their_deadline(self):
+        """A caller whose deadline passes while the merged request runs gets BudgetExceededError."""
+        client = _client()
+        assert client.batcher is not None
+
+        async def slow_request(**kwargs: Any) -> dict[str, Any]:
+            await asyncio.sleep(5)
+            return {"Items": []}
+
+        async def caller(region: str) -> None:
+            with request_budget(timeout=0.1):
+                await client.fetch_prices(_region_query(region), limit=5)
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=slow_request)):
+            results = await asyncio.wait_for(
+                asyncio.gather(caller("eastus"), caller("westus"), return_exceptions=True), timeout=1
+            )
+            await client.batcher.aclose()
+
+        assert all(isinstance(result, BudgetExceededError) for result in results)
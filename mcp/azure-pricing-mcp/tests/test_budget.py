@@ -0,0 +1,194 @@
+"""Unit tests for per-tool-call deadlines and upstream call budgets."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp.types import TextContent
+
+from azure_pricing_mcp.budget import BudgetExceededError, RequestBudget, current_budget, request_budget
+from azure_pricing_mcp.cache import PriceCache
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.server import _call_with_budget
+from azure_pricing_mcp.services import PricingService, RetirementService, SKUService
+
+
+def _page(skus: list[str], next_link: str | None = None) -> dict[str, Any]:
+    """Build a fake Retail Prices API page."""
+    return {
+        "Items": [{"skuName": sku, "armRegionName": "eastus", "retailPrice": 1.0} for sku in skus],
+        "NextPageLink": next_link,
+        "Count": len(skus),
+    }
+
+
+def _client_with_response(payload: dict[str, Any]) -> AzurePricingClient:
+    """Client whose session returns `payload` for every request."""
+    client = AzurePricingClient()
+    client.session = MagicMock()
+    response = MagicMock(status=200, headers={})
+    response.json = AsyncMock(return_value=payload)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    client.session.get.return_value = context
+    return client
+
+
+class TestRequestBudget:
+    """Tests for the budget object and its context variable."""
+
+    def test_charge_stops_at_call_limit(self):
+        """The call after the limit raises and records why."""
+        budget = RequestBudget(timeout=60, max_upstream_calls=2)
+        budget.charge()
+        budget.charge()
+
+        with pytest.raises(BudgetExceededError):
+            budget.charge()
+        assert budget.truncated
+        assert "2 upstream calls" in budget.note()
+
+    def test_expired_deadline(self):
+        """A passed deadline fails the check."""
+        budget = RequestBudget(timeout=0, max_upstream_calls=None)
+
+        with pytest.raises(BudgetExceededError, match="deadline"):
+            budget.check()
+
+    def test_context_scoping(self):
+        """The budget is only visible inside its block."""
+        with request_budget(5, 1) as budget:
+            assert current_budget() is budget
+        assert current_budget() is None
+
+
+class TestClientBudget:
+    """Tests for budget enforcement in the HTTP client."""
+
+    @pytest.mark.asyncio
+    async def test_make_request_charges_budget_and_caps_timeout(self):
+        """Each upstream attempt is charged and its timeout fits the deadline."""
+        client = _client_with_response(_page(["A"]))
+
+        with request_budget(timeout=2, max_upstream_calls=1) as budget:
+            await client.make_request()
+            with pytest.raises(BudgetExceededError):
+                await client.make_request()
+
+        assert budget.upstream_calls == 1
+        assert client.session.get.call_args.kwargs["timeout"].total <= 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_does_not_pass_deadline(self):
+        """A long rate-limiter pause ends at the deadline instead of blocking."""
+        client = _client_with_response(_page(["A"]))
+        await client.rate_limiter.on_throttle(3600)
+
+        with request_budget(timeout=0.05, max_upstream_calls=None):
+            with pytest.raises(BudgetExceededError, match="rate limited"):
+                await asyncio.wait_for(client.make_request(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_are_free(self):
+        """Responses served from cache do not use the budget."""
+        client = _client_with_response(_page(["A"]))
+
+        with request_budget(timeout=5, max_upstream_calls=1) as budget:
+            await client.fetch_prices(["serviceName eq 'Storage'"])
+            await client.fetch_prices(["serviceName eq 'Storage'"])
+
+        assert budget.upstream_calls == 1
+        assert not budget.truncated
+
+
+class TestPartialResults:
+    """Tests for services returning partial results when the budget runs out."""
+
+    @pytest.mark.asyncio
+    async def test_search_prices_keeps_fetched_pages(self):
+        """Pages fetched before the budget ran out are returned."""
+        client = AzurePricingClient()
+        service = PricingService(client, RetirementService(client))
+        pages = [_page(["A", "B"], "https://next/1"), _page(["C"])]
+
+        async def request(url=None, params=None):
+            current_budget().charge()
+            return pages.pop(0)
+
+        with patch.object(client, "make_request", side_effect=request):
+            with request_budget(timeout=5, max_upstream_calls=1) as budget:
+                result = await service.search_prices(service_name="Storage", limit=10)
+
+        assert [item["skuName"] for item in result["items"]] == ["A", "B"]
+        assert result["has_more"] is True
+        assert budget.truncated
+
+    @pytest.mark.asyncio
+    async def test_find_similar_services_stops_early(self):
+        """Fuzzy service suggestions fall back to the local index once the budget is spent."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=0))
+        pricing_service = PricingService(client, RetirementService(client))
+        sku_service = SKUService(pricing_service)
+
+        async def request(url=None, params=None):
+            current_budget().charge()
+            return _page([])
+
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            with request_budget(timeout=5, max_upstream_calls=0) as budget:
+                result = await sku_service._find_similar_services(service_name="sql db")
+
+        assert result["match_type"] == "suggestions_only"
+        assert result["suggestions"][0]["service_name"] == "Azure SQL Database"
+        # The alias lookup stops at the budget, and a stale index is not seeded after it
+        assert mock_request.call_count == 0
+        assert budget.upstream_calls == 0
+        assert not sku_service._service_indexes["USD"].built_at
+
+
+class TestToolCallBudget:
+    """Tests for the per-tool-call wrapper in the server."""
+
+    @pytest.mark.asyncio
+    async def test_truncated_results_get_a_note(self):
+        """A handler that hit the budget returns its output plus a truncation note."""
+        handlers = MagicMock()
+
+        async def handle(arguments):
+            current_budget().exceed("limit of 1 upstream calls reached")
+            return [TextContent(type="text", text="partial")]
+
+        handlers.handle_price_search = handle
+        result = await _call_with_budget(handlers, "azure_price_search", {})
+
+        assert result[0].text == "partial"
+        assert "truncated due to budget" in result[1].text
+
+    @pytest.mark.asyncio
+    async def test_budget_error_becomes_error_text(self):
+        """A tool that could not fetch anything reports the budget error."""
+        handlers = MagicMock()
+        handlers.handle_price_search = AsyncMock(side_effect=BudgetExceededError("deadline of 1s reached"))
+
+        result = await _call_with_budget(handlers, "azure_price_search", {})
+
+        assert result[0].text.startswith("Error: azure_price_search stopped")
+
+    @pytest.mark.asyncio
+    async def test_hung_tool_is_abandoned_after_deadline(self):
+        """A handler that ignores the budget is cancelled shortly after the deadline."""
+        handlers = MagicMock()
+
+        async def hang(arguments):
+            await asyncio.sleep(3600)
+
+        handlers.handle_price_search = hang
+        with (
+            patch("azure_pricing_mcp.server.TOOL_TIMEOUT_SECONDS", 0.05),
+            patch("azure_pricing_mcp.server.TOOL_DEADLINE_GRACE_SECONDS", 0.05),
+        ):
+            result = await _call_with_budget(handlers, "azure_price_search", {})
+
+        assert "did not finish" in result[0].text
@@ -0,0 +1,295 @@
+"""Unit tests for the response caches."""
+
+import sqlite3
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp.cache import PriceCache, normalize_filter_conditions
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.disk_cache import DiskCache
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+class TestNormalizeFilterConditions:
+    """Tests for filter normalization."""
+
+    def test_order_and_whitespace_do_not_matter(self):
+        """Equivalent condition lists normalize to the same list."""
+        a = normalize_filter_conditions(["serviceName eq 'Storage'", "armRegionName  eq 'eastus'"])
+        b = normalize_filter_conditions(["armRegionName eq 'eastus'", " serviceName eq 'Storage' "])
+        assert a == b
+
+    def test_duplicates_and_empty_conditions_dropped(self):
+        """Duplicates and blank conditions are removed."""
+        assert normalize_filter_conditions(["a eq 'x'", "a eq 'x'", " "]) == ["a eq 'x'"]
+        assert normalize_filter_conditions(None) == []
+
+
+class TestPriceCache:
+    """Tests for the in-memory TTL + LRU cache."""
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        cache = PriceCache(max_entries=4, ttl=60)
+        key = PriceCache.make_key("https://prices", {"currencyCode": "USD"})
+
+        assert cache.get(key) is None
+        cache.set(key, {"Items": []})
+        assert cache.get(key) == {"Items": []}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        """Entries are dropped once the TTL elapses."""
+        cache = PriceCache(max_entries=4, ttl=0.01)
+        key = PriceCache.make_key("https://prices")
+        cache.set(key, {"Items": []})
+        time.sleep(0.02)
+        assert cache.get(key) is None
+
+    def test_lru_eviction_by_entry_count(self):
+        """The least recently used entry is evicted when full."""
+        cache = PriceCache(max_entries=2, ttl=60)
+        keys = [PriceCache.make_key(f"https://prices/{i}") for i in range(3)]
+        cache.set(keys[0], {"i": 0})
+        cache.set(keys[1], {"i": 1})
+        cache.get(keys[0])
+        cache.set(keys[2], {"i": 2})
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == {"i": 0}
+
+    def test_byte_bound_skips_oversized_responses(self):
+        """With a byte budget, responses larger than the budget are not stored."""
+        cache = PriceCache(ttl=60, max_bytes=64)
+        key = PriceCache.make_key("https://prices")
+        cache.set(key, {"Items": ["x" * 100]})
+        assert cache.get(key) is None
+        assert cache.stats()["size_unit"] == "bytes"
+
+    def test_disabled_cache(self):
+        """A zero-sized cache never stores anything."""
+        cache = PriceCache(max_entries=0, max_bytes=0)
+        key = PriceCache.make_key("https://prices")
+        cache.set(key, {"Items": []})
+        assert cache.get(key) is None
+        assert cache.enabled is False
+
+
+class TestClientCaching:
+    """Tests for caching in front of fetch_prices."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_query_served_from_cache(self):
+        """An equivalent repeat query does not hit the network."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=8, ttl=60))
+        response = {"Items": [{"skuName": "A"}], "NextPageLink": None}
+
+        with patch.object(client, "make_request", AsyncMock(return_value=response)) as mock_request:
+            first = await client.fetch_prices(["serviceName eq 'Storage'", "armRegionName eq 'eastus'"])
+            second = await client.fetch_prices(["armRegionName eq 'eastus'", "serviceName eq 'Storage'"])
+
+        assert first == second == response
+        assert mock_request.call_count == 1
+        assert client.cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_currency_and_top_are_part_of_key(self):
+        """Different currency or $top values are distinct cache entries."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=8, ttl=60))
+        # A full $top page may have more matches, so the larger query cannot be derived from it
+        full_page = {"Items": [{"skuName": str(i)} for i in range(5)]}
+
+        with patch.object(client, "make_request", AsyncMock(return_value=full_page)) as mock_request:
+            await client.fetch_prices(["serviceName eq 'Storage'"], currency_code="USD", limit=5)
+            await client.fetch_prices(["serviceName eq 'Storage'"], currency_code="EUR", limit=5)
+            await client.fetch_prices(["serviceName eq 'Storage'"], currency_code="USD", limit=10)
+
+        assert mock_request.call_count == 3
+
+
+class TestSemanticCache:
+    """Tests for answering narrower queries from complete cached results."""
+
+    @staticmethod
+    def _items() -> list[dict]:
+        return [
+            {"serviceName": "Storage", "armRegionName": region, "skuName": sku, "retailPrice": 1.0}
+            for region in ("eastus", "westus")
+            for sku in ("LRS", "GRS")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_narrower_query_filters_complete_result(self):
+        """A region query after a complete service-wide query is answered locally."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=8, ttl=60))
+        response = {"BillingCurrency": "USD", "Items": self._items(), "NextPageLink": None}
+
+        with patch.object(client, "make_request", AsyncMock(return_value=response)) as mock_request:
+            await client.fetch_prices(["serviceName eq 'Storage'"], limit=500)
+            narrow = await client.fetch_prices(
+                ["serviceName eq 'Storage'", "armRegionName eq 'westus'", "contains(skuName, 'GRS')"], limit=5
+            )
+            limited = await client.fetch_prices(["serviceName eq 'Storage'", "armRegionName eq 'eastus'"], limit=1)
+
+        assert mock_request.call_count == 1
+        assert narrow["Items"] == [
+            {"serviceName": "Storage", "armRegionName": "westus", "skuName": "GRS", "retailPrice": 1.0}
+        ]
+        assert narrow["BillingCurrency"] == "USD"
+        assert narrow["HasMore"] is False
+        assert limited["Count"] == 1 and limited["HasMore"] is True
+        assert client.cache.stats()["derived_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_incomplete_result_is_not_used(self):
+        """Results that filled $top or have a next page cannot answer other queries."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=8, ttl=60))
+        responses = [
+            {"Items": self._items(), "NextPageLink": None},
+            {"Items": self._items(), "NextPageLink": "https://prices.azure.com/next"},
+            {"Items": [], "NextPageLink": None},
+            {"Items": [], "NextPageLink": None},
+        ]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=responses)) as mock_request:
+            await client.fetch_prices(["serviceName eq 'Storage'"], limit=4)
+            await client.fetch_prices(["serviceName eq 'Storage'", "armRegionName eq 'eastus'"], limit=10)
+            await client.fetch_prices(["serviceName eq 'Storage'"], currency_code="EUR")
+            await client.fetch_prices(["serviceName eq 'Storage'", "armRegionName eq 'westus'"], limit=10)
+
+        assert mock_request.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_case_dependent_match_goes_upstream(self):
+        """If a match would depend on letter case, the API decides."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=8, ttl=60))
+        response = {"Items": self._items(), "NextPageLink": None}
+
+        with patch.object(client, "make_request", AsyncMock(return_value=response)) as mock_request:
+            await client.fetch_prices(["serviceName eq 'Storage'"])
+            await client.fetch_prices(["serviceName eq 'Storage'", "armRegionName eq 'EastUS'"])
+
+        assert mock_request.call_count == 2
+
+
+class TestDiskCache:
+    """Tests for the persistent SQLite cache."""
+
+    def test_values_survive_reopen(self, tmp_path):
+        """Entries written by one instance are visible to a new one."""
+        path = tmp_path / "cache.sqlite3"
+        DiskCache(path).set("prices:a", {"Items": [1, 2]})
+
+        reopened = DiskCache(path)
+        assert reopened.get("prices:a") == {"Items": [1, 2]}
+        assert reopened.stats()["entries"] == 1
+
+    def test_wal_mode_enabled(self, tmp_path):
+        """The database uses WAL so several processes can share it."""
+        cache = DiskCache(tmp_path / "cache.sqlite3")
+        mode = cache._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+
+    def test_expired_entries_are_misses_but_still_readable(self):
+        """Expired entries miss on get() but remain available via get_entry()."""
+        cache = DiskCache(":memory:")
+        cache.set("k", "value", ttl=-1)
+        assert cache.get("k") is None
+        value, ttl, _ = cache.get_entry("k")
+        assert value == "value"
+        assert ttl < 0
+
+    def test_size_bounded_lru_eviction(self):
+        """The least recently used entries are evicted once over the byte budget."""
+        cache = DiskCache(":memory:", max_bytes=100, access_resolution=0)
+        cache.set("a", "x" * 40)
+        cache.set("b", "x" * 40)
+        cache.get("a")
+        cache.set("c", "x" * 40)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_writes_under_budget_do_not_sum_sizes(self):
+        """A running size total spares writes the full-table SUM until eviction may be due."""
+        cache = DiskCache(":memory:", max_bytes=1000)
+        statements: list[str] = []
+        cache._conn.set_trace_callback(statements.append)
+
+        cache.set("a", "x" * 40)
+        cache.set("a", "x" * 60)
+        cache.set("b", "x" * 40)
+        cache.delete("b")
+
+        assert not [statement for statement in statements if "SUM(size)" in statement]
+        assert cache._total == cache.stats()["size_bytes"] == 62
+
+    def test_running_total_resyncs_with_other_writers(self, tmp_path):
+        """Eviction re-reads the stored size, which other processes sharing the file also change."""
+        path = tmp_path / "cache.sqlite3"
+        first = DiskCache(path, max_bytes=100, access_resolution=0)
+        second = DiskCache(path, max_bytes=100)
+        first.set("a", "x" * 40)
+        second.set("b", "x" * 40)
+        first.get("a")
+
+        first.set("c", "x" * 40)
+
+        assert first.get("b") is None
+        assert first.get("a") is not None and first.get("c") is not None
+        assert first._total == first.stats()["size_bytes"]
+
+    def test_reads_refresh_access_time_at_most_once_per_resolution(self, tmp_path):
+        """Repeated reads do not write, so other processes keep their running size total."""
+        path = tmp_path / "cache.sqlite3"
+        cache = DiskCache(path, access_resolution=60)
+        other = DiskCache(path)
+        cache.set("a", "value")
+        data_version = other._read_data_version()
+        statements: list[str] = []
+        cache._conn.set_trace_callback(statements.append)
+
+        for _ in range(3):
+            assert cache.get("a") == "value"
+
+        assert not [statement for statement in statements if statement.startswith("UPDATE")]
+        assert other._read_data_version() == data_version
+
+        cache._conn.execute("UPDATE entries SET accessed_at = accessed_at - 61")
+        cache.get("a")
+        assert len([statement for statement in statements if statement.startswith("UPDATE")]) == 2
+
+    @pytest.mark.asyncio
+    async def test_server_shutdown_closes_disk_cache(self, tmp_path):
+        """The server closes the cache database when its session ends."""
+        async with AzurePricingServer(cache_dir=str(tmp_path)) as server:
+            disk_cache = server._disk_cache
+            assert disk_cache is not None
+            disk_cache.set("a", "value")
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            disk_cache.get("a")
+
+    @pytest.mark.asyncio
+    async def test_client_reads_through_disk_cache(self, tmp_path):
+        """A fresh client (new process) answers a repeated query from disk."""
+        path = tmp_path / "cache.sqlite3"
+        response = {"Items": [{"skuName": "A"}], "NextPageLink": None}
+
+        first = AzurePricingClient(disk_cache=DiskCache(path))
+        with patch.object(first, "make_request", AsyncMock(return_value=response)):
+            await first.fetch_prices(["serviceName eq 'Storage'"])
+
+        second = AzurePricingClient(disk_cache=DiskCache(path))
+        with patch.object(second, "make_request", AsyncMock()) as mock_request:
+            result = await second.fetch_prices(["serviceName eq 'Storage'"])
+
+        assert result == response
+        mock_request.assert_not_called()
@@ -0,0 +1,206 @@
+"""Unit tests for the offline price catalog."""
+
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog, sync_catalog
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.services import PricingService, RetirementService
+
+
+def _item(sku: str, region: str = "eastus", price_type: str = "Consumption", **extra: Any) -> dict[str, Any]:
+    """Build a fake Retail Prices API item."""
+    item = {
+        "serviceName": "Virtual Machines",
+        "armRegionName": region,
+        "skuName": sku,
+        "armSkuName": f"Standard_{sku.replace(' ', '_')}",
+        "productName": "Virtual Machines Dv3 Series",
+        "priceType": price_type,
+        "retailPrice": 0.1,
+    }
+    item.update(extra)
+    return item
+
+
+@pytest.fixture
+def catalog(tmp_path) -> PriceCatalog:
+    """Catalog with a small USD snapshot."""
+    catalog = PriceCatalog(tmp_path / "catalog.sqlite3")
+    catalog.replace_currency(
+        "USD",
+        [
+            [_item("D2s v3"), _item("D2s v3", region="westus"), _item("D4s v3")],
+            [_item("D2s v3", price_type="Reservation", reservationTerm="1 Year"), _item("Basic", productName="Basic")],
+        ],
+    )
+    yield catalog
+    catalog.close()
+
+
+class TestPriceCatalog:
+    """Tests for local queries."""
+
+    def test_query_with_indexed_and_json_fields(self, catalog):
+        """Indexed columns and other item fields can both be filtered on."""
+        page = catalog.query(["serviceName eq 'Virtual Machines'", "contains(skuName, 'D2s')"], "USD")
+        assert [item["armRegionName"] for item in page["Items"]] == ["eastus", "westus", "eastus"]
+
+        page = catalog.query(["reservationTerm eq '1 Year'"], "USD")
+        assert page["Count"] == 1
+        assert page["Items"][0]["priceType"] == "Reservation"
+
+    def test_tier_keyword_filter(self, catalog):
+        """The or-filter for tier keywords matches productName or skuName."""
+        page = catalog.query(["(contains(productName, 'Basic') or contains(skuName, 'Basic'))"], "USD")
+        assert [item["skuName"] for item in page["Items"]] == ["Basic"]
+
+    def test_string_filters_ignore_case(self, catalog):
+        """Case variants of indexed and JSON field values match like the API does."""
+        page = catalog.query(["armSkuName eq 'standard_d2s_v3'", "contains(skuName, 'd2S')"], "USD")
+        assert [item["armRegionName"] for item in page["Items"]] == ["eastus", "westus", "eastus"]
+        assert catalog.query(["reservationTerm eq '1 year'"], "USD")["Count"] == 1
+        assert catalog.query(["serviceName eq 'VIRTUAL MACHINES'", "retailPrice lt 1"], "USD")["Count"] == 5
+
+    def test_case_insensitive_lookups_use_indexes(self, catalog):
+        """Filters on indexed columns are answered from an index, not a table scan."""
+        plan = catalog._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT item FROM prices WHERE currency = ? AND arm_sku_name = ? COLLATE NOCASE",
+            ("USD", "standard_d2s_v3"),
+        ).fetchall()
+        assert "idx_prices_arm_sku_nocase" in " ".join(row[-1] for row in plan)
+
+    def test_limit_sets_has_more(self, catalog):
+        """A limit that cuts results short is reported."""
+        page = catalog.query(["priceType eq 'Consumption'"], "USD", limit=2)
+        assert page["Count"] == 2
+        assert page["HasMore"] is True
+        assert catalog.query(["priceType eq 'Consumption'"], "USD", limit=10)["HasMore"] is False
+
+    def test_results_are_paged(self, catalog):
+        """Matches come in pages of MAX_RESULTS_PER_REQUEST linked by a rowid cursor."""
+        with patch("azure_pricing_mcp.catalog.MAX_RESULTS_PER_REQUEST", 2):
+            first = catalog.query(["contains(skuName, 'D')"], "USD")
+            second = catalog.query_next_page(first["NextPageLink"])
+
+        assert [item["armRegionName"] for item in first["Items"]] == ["eastus", "westus"]
+        assert first["NextPageLink"].startswith("catalog:")
+        assert [item["skuName"] for item in second["Items"]] == ["D4s v3", "D2s v3"]
+        assert second["NextPageLink"] is None
+        assert not first["HasMore"] and not second["HasMore"]
+
+    def test_paged_limit_sets_has_more(self, catalog):
+        """The link carries the remaining limit; the page reaching it flags HasMore."""
+        with patch("azure_pricing_mcp.catalog.MAX_RESULTS_PER_REQUEST", 2):
+            first = catalog.query([], "USD", limit=3)
+            second = catalog.query_next_page(first["NextPageLink"])
+
+        assert second["Count"] == 1
+        assert second["NextPageLink"] is None
+        assert second["HasMore"] is True
+        assert catalog.query_next_page("catalog:?currency=USD") is None
+
+    def test_falls_back_for_unknown_currency_or_syntax(self, catalog):
+        """Unsynced currencies and unsupported filters are left to the API."""
+        assert catalog.query([], "EUR") is None
+        assert catalog.query(["startswith(skuName, 'D')"], "USD") is None
+
+    def test_distinct_skus(self, catalog):
+        """Each SKU of a service is listed once, as its first item."""
+        items = catalog.distinct_skus("Virtual Machines", "USD")
+        assert [(item["skuName"], item["armRegionName"]) for item in items] == [
+            ("D2s v3", "eastus"),
+            ("D4s v3", "eastus"),
+            ("Basic", "eastus"),
+        ]
+        assert catalog.distinct_skus("Virtual Machines", "EUR") is None
+
+    def test_distinct_skus_ignores_case(self, catalog):
+        """A case variant of the service name finds its SKUs through the index, like query() does."""
+        items = catalog.distinct_skus("virtual machines", "USD")
+        assert [item["skuName"] for item in items] == ["D2s v3", "D4s v3", "Basic"]
+
+        plan = catalog._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT item FROM prices WHERE currency = ? AND service_name = ? COLLATE NOCASE",
+            ("USD", "virtual machines"),
+        ).fetchall()
+        assert "idx_prices_service_nocase" in " ".join(row[-1] for row in plan)
+
+    def test_distinct_services(self, catalog):
+        """Each product of each service is listed once."""
+        items = catalog.distinct_services("USD")
+        assert [(item["serviceName"], item["productName"]) for item in items] == [
+            ("Virtual Machines", "Virtual Machines Dv3 Series"),
+            ("Virtual Machines", "Basic"),
+        ]
+        assert catalog.distinct_services("EUR") is None
+
+
+class TestCatalogMode:
+    """Tests for answering client and service queries from the catalog."""
+
+    @pytest.mark.asyncio
+    async def test_search_prices_answers_locally(self, catalog):
+        """search_prices uses the catalog without any upstream request."""
+        client = AzurePricingClient(catalog=catalog)
+        service = PricingService(client, RetirementService(client))
+
+        with patch.object(client, "make_request", AsyncMock()) as mock_request:
+            result = await service.search_prices(service_name="Virtual Machines", region="eastus", limit=2)
+
+        mock_request.assert_not_called()
+        assert result["count"] == 2
+        assert result["has_more"] is True
+
+    @pytest.mark.asyncio
+    async def test_sku_suggestions_answer_locally(self, catalog):
+        """SKU suggestions for a search without matches come from the catalog's SKU list."""
+        client = AzurePricingClient(catalog=catalog)
+        service = PricingService(client, RetirementService(client))
+
+        with patch.object(client, "make_request", AsyncMock()) as mock_request:
+            result = await service.search_prices(service_name="Virtual Machines", sku_name="D2sv3")
+
+        mock_request.assert_not_called()
+        assert result["sku_validation"]["suggestions"][0]["sku_name"] == "D2s v3"
+
+    @pytest.mark.asyncio
+    async def test_iter_price_pages_follows_catalog_links(self, catalog):
+        """Catalog pages are followed locally, one bounded page at a time."""
+        client = AzurePricingClient(catalog=catalog)
+
+        with patch("azure_pricing_mcp.catalog.MAX_RESULTS_PER_REQUEST", 2):
+            with patch.object(client, "make_request", AsyncMock()) as mock_request:
+                pages = [page async for page in client.iter_price_pages(["serviceName eq 'Virtual Machines'"])]
+
+        mock_request.assert_not_called()
+        assert [page["Count"] for page in pages] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_sync_replaces_snapshot(self, catalog):
+        """sync_catalog follows NextPageLink and replaces the currency's rows."""
+        client = AzurePricingClient()
+        pages = [
+            {"Items": [_item("E2s v5")], "NextPageLink": "https://next/1"},
+            {"Items": [_item("E4s v5")], "NextPageLink": None},
+        ]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)):
+            count = await sync_catalog(client, catalog, "USD")
+
+        assert count == 2
+        assert [item["skuName"] for item in catalog.query([], "USD")["Items"]] == ["E2s v5", "E4s v5"]
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_previous_snapshot(self, catalog):
+        """A sync that fails midway is rolled back."""
+        client = AzurePricingClient()
+        pages = [{"Items": [_item("E2s v5")], "NextPageLink": "https://next/1"}, RuntimeError("boom")]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)):
+            with pytest.raises(RuntimeError):
+                await sync_catalog(client, catalog, "USD")
+
+        assert catalog.query([], "USD")["Count"] == 5
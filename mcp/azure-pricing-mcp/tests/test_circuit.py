@@ -0,0 +1,152 @@
+"""Unit tests for the circuit breaker and stale response serving."""
+
+import asyncio
+import json
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from azure_pricing_mcp.budget import request_budget
+from azure_pricing_mcp.cache import PriceCache
+from azure_pricing_mcp.circuit import CircuitBreaker, CircuitOpenError
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.disk_cache import DiskCache
+
+
+def _page(skus: list[str]) -> dict[str, Any]:
+    """Build a fake Retail Prices API page."""
+    return {"Items": [{"skuName": sku} for sku in skus], "NextPageLink": None, "Count": len(skus)}
+
+
+def _server_error() -> aiohttp.ClientResponseError:
+    """Build a 503 response error."""
+    return aiohttp.ClientResponseError(MagicMock(), (), status=503, message="Service Unavailable")
+
+
+class TestCircuitBreaker:
+    """Tests for the breaker state machine."""
+
+    def test_opens_after_consecutive_failures(self):
+        """The circuit opens at the threshold and a success resets the count."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_background_probe_closes_circuit(self):
+        """The probe runs while open and closes the circuit once it succeeds."""
+        probe = AsyncMock(side_effect=[False, True])
+        breaker = CircuitBreaker(failure_threshold=1, probe_interval=0.01, probe=probe)
+
+        breaker.record_failure()
+        for _ in range(100):
+            if not breaker.is_open:
+                break
+            await asyncio.sleep(0.01)
+
+        assert breaker.state == "closed"
+        assert probe.call_count == 2
+        await breaker.aclose()
+
+
+class TestStaleServing:
+    """Tests for answering from the last good response when the API is degraded."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_serves_last_good_response(self):
+        """With the circuit open, a repeated query gets the last good response marked stale."""
+        client = AzurePricingClient(
+            cache=PriceCache(max_entries=0), circuit_breaker=CircuitBreaker(failure_threshold=1)
+        )
+        client.session = MagicMock()
+
+        with patch.object(client, "_request_with_retries", AsyncMock(side_effect=[_page(["A"]), _server_error()])):
+            await client.fetch_prices(["serviceName eq 'Storage'"])
+            with request_budget(timeout=5) as budget:
+                stale = await client.fetch_prices(["serviceName eq 'Storage'"])
+
+        assert client.circuit_breaker.is_open
+        assert stale["Items"] == [{"skuName": "A"}]
+        assert stale["Stale"] is True
+        assert budget.stale_age is not None
+
+        with patch.object(client, "_request_with_retries", AsyncMock()) as mock_request:
+            again = await client.fetch_prices(["serviceName eq 'Storage'"])
+        mock_request.assert_not_called()
+        assert again["Stale"] is True
+        await client.circuit_breaker.aclose()
+
+    @pytest.mark.asyncio
+    async def test_expired_disk_entry_is_served_when_degraded(self, tmp_path):
+        """Expired disk cache entries are a stale fallback after a restart."""
+        disk_cache = DiskCache(tmp_path / "cache.sqlite3")
+        client = AzurePricingClient(cache=PriceCache(max_entries=0), disk_cache=disk_cache)
+        key = PriceCache.make_key(
+            "https://prices.azure.com/api/retail/prices",
+            {"api-version": "2023-01-01-preview", "currencyCode": "USD"},
+        )
+        disk_cache.set(f"prices:{json.dumps(key)}", _page(["B"]), ttl=-60)
+
+        with patch.object(client, "_request_with_retries", AsyncMock(side_effect=asyncio.TimeoutError())):
+            stale = await client.fetch_prices()
+
+        assert stale["Items"] == [{"skuName": "B"}]
+        assert stale["StaleAgeSeconds"] >= 0
+        disk_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_age_counts_from_original_fetch(self, tmp_path):
+        """A response loaded from disk reports its age since it was fetched, not since it was loaded."""
+        disk_cache = DiskCache(tmp_path / "cache.sqlite3")
+        client = AzurePricingClient(cache=PriceCache(max_entries=0), disk_cache=disk_cache)
+        key = PriceCache.make_key(
+            "https://prices.azure.com/api/retail/prices",
+            {"api-version": "2023-01-01-preview", "currencyCode": "USD"},
+        )
+        disk_key = f"prices:{json.dumps(key)}"
+        fetched_at = time.time() - 7200
+        with patch("azure_pricing_mcp.disk_cache.time.time", return_value=fetched_at):
+            disk_cache.set(disk_key, _page(["C"]), ttl=86400)
+
+        assert (await client.fetch_prices())["Items"] == [{"skuName": "C"}]
+        disk_cache.delete(disk_key)
+        with patch.object(client, "_request_with_retries", AsyncMock(side_effect=asyncio.TimeoutError())):
+            stale = await client.fetch_prices()
+
+        assert 7200 <= stale["StaleAgeSeconds"] < 7260
+        disk_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_without_cached_data_fails_fast(self):
+        """Without a cached response, an open circuit raises immediately."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        client = AzurePricingClient(circuit_breaker=breaker)
+        client.session = MagicMock()
+
+        with pytest.raises(CircuitOpenError):
+            await client.fetch_prices(["serviceName eq 'Storage'"])
+
+    @pytest.mark.asyncio
+    async def test_bad_request_is_not_a_failure(self):
+        """Client errors such as a malformed filter neither trip the breaker nor serve stale data."""
+        client = AzurePricingClient(
+            cache=PriceCache(max_entries=0), circuit_breaker=CircuitBreaker(failure_threshold=1)
+        )
+        client.session = MagicMock()
+        bad_request = aiohttp.ClientResponseError(MagicMock(), (), status=400, message="Bad Request")
+
+        with patch.object(client, "_request_with_retries", AsyncMock(side_effect=[_page(["A"]), bad_request])):
+            await client.fetch_prices()
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.fetch_prices()
+
+        assert client.circuit_breaker.state == "closed"
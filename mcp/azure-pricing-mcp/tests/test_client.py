@@ -0,0 +1,284 @@
+"""Unit tests for the Azure Pricing HTTP client."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from azure_pricing_mcp.budget import BudgetExceededError, RequestBudget, current_budget, request_budget
+from azure_pricing_mcp.cache import PriceCache
+from azure_pricing_mcp.client import AzurePricingClient, ConditionalText
+
+
+def _page(skus: list[str], next_link: str | None = None, region: str = "eastus") -> dict[str, Any]:
+    """Build a fake Retail Prices API page."""
+    return {
+        "Items": [{"skuName": sku, "armRegionName": region, "retailPrice": 1.0} for sku in skus],
+        "NextPageLink": next_link,
+        "Count": len(skus),
+    }
+
+
+class TestPagination:
+    """Tests for NextPageLink pagination."""
+
+    @pytest.mark.asyncio
+    async def test_iter_prices_follows_next_page_link(self):
+        """All pages are walked when the consumer keeps iterating."""
+        client = AzurePricingClient()
+        pages = [_page(["A", "B"], "https://next/1"), _page(["C"], "https://next/2"), _page(["D"])]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)) as mock_request:
+            skus = [item["skuName"] async for item in client.iter_prices(["serviceName eq 'Virtual Machines'"])]
+
+        assert skus == ["A", "B", "C", "D"]
+        assert mock_request.call_count == 3
+        assert mock_request.call_args_list[1].kwargs["url"] == "https://next/1"
+
+    @pytest.mark.asyncio
+    async def test_iter_prices_is_lazy(self):
+        """Breaking out after the first page never requests the second."""
+        client = AzurePricingClient()
+        pages = [_page(["A", "B"], "https://next/1"), _page(["C"])]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)) as mock_request:
+            async for item in client.iter_prices():
+                if item["skuName"] == "B":
+                    break
+
+        assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_iter_prices_respects_limit_and_max_pages(self):
+        """Limit caps yielded items and max_pages caps round trips."""
+        client = AzurePricingClient()
+        pages = [_page(["A", "B"], "https://next/1"), _page(["C", "D"], "https://next/2"), _page(["E"])]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)):
+            limited = [item["skuName"] async for item in client.iter_prices(limit=3)]
+        assert limited == ["A", "B", "C"]
+
+        client = AzurePricingClient()
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)) as mock_request:
+            capped = [page async for page in client.iter_price_pages(max_pages=2)]
+        assert len(capped) == 2
+        assert mock_request.call_count == 2
+
+
+class TestShardedFetch:
+    """Tests for concurrent sharded fetching."""
+
+    @pytest.mark.asyncio
+    async def test_partition_shards_merge_in_value_order(self):
+        """Each partition value becomes one shard; results keep the value order."""
+        client = AzurePricingClient()
+
+        async def fake_fetch_prices(filter_conditions=None, currency_code="USD", limit=None, skip=None):
+            region = filter_conditions[-1].split("'")[1]
+            return _page([f"{region}-1", f"{region}-2"], region=region)
+
+        with patch.object(client, "fetch_prices", side_effect=fake_fetch_prices) as mock_fetch:
+            result = await client.fetch_prices_sharded(
+                ["serviceName eq 'Virtual Machines'"],
+                shard_field="armRegionName",
+                shard_values=["westus", "eastus"],
+                concurrency=2,
+            )
+
+        assert [item["skuName"] for item in result["Items"]] == ["westus-1", "westus-2", "eastus-1", "eastus-2"]
+        assert result["Complete"] is True
+        assert result["Pages"] == 2
+        assert mock_fetch.call_args_list[0].kwargs["filter_conditions"] == [
+            "serviceName eq 'Virtual Machines'",
+            "armRegionName eq 'westus'",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_offset_shards_stop_at_short_page(self):
+        """Offset mode requests $skip pages in waves and stops at the first short page."""
+        client = AzurePricingClient()
+        full = [f"S{i}" for i in range(1000)]
+
+        async def fake_fetch_prices(filter_conditions=None, currency_code="USD", limit=None, skip=None):
+            index = (skip or 0) // 1000
+            if index < 2:
+                return _page([f"{index}-{sku}" for sku in full], f"https://next/{index + 1}")
+            if index == 2:
+                return _page(["last"])
+            return _page([])
+
+        with patch.object(client, "fetch_prices", side_effect=fake_fetch_prices) as mock_fetch:
+            result = await client.fetch_prices_sharded(concurrency=4)
+
+        assert result["Count"] == 2001
+        assert result["Items"][1000]["skuName"] == "1-S0"
+        assert result["Items"][-1]["skuName"] == "last"
+        assert result["Pages"] == 3
+        assert result["Complete"] is True
+        # First page, then one wave of four offsets
+        assert mock_fetch.call_count == 5
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical concurrent requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_share_one_request(self):
+        """Concurrent identical fetch_prices calls make a single upstream request."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=0))
+        release = asyncio.Event()
+
+        async def slow_request(url=None, params=None):
+            await release.wait()
+            return _page(["A"])
+
+        with patch.object(client, "make_request", side_effect=slow_request) as mock_request:
+            tasks = [asyncio.ensure_future(client.fetch_prices(["serviceName eq 'Storage'"])) for _ in range(5)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks)
+
+        assert mock_request.call_count == 1
+        assert all(result["Items"][0]["skuName"] == "A" for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_waiter_keeps_shared_request(self):
+        """A cancelled waiter does not cancel the request other waiters need."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=0))
+        release = asyncio.Event()
+
+        async def slow_request(url=None, params=None):
+            await release.wait()
+            return _page(["A"])
+
+        with patch.object(client, "make_request", side_effect=slow_request):
+            first = asyncio.ensure_future(client.fetch_prices())
+            second = asyncio.ensure_future(client.fetch_prices())
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            result = await second
+
+        assert first.cancelled()
+        assert result["Items"][0]["skuName"] == "A"
+
+    @pytest.mark.asyncio
+    async def test_cancelling_last_waiter_cancels_request(self):
+        """The shared request is cancelled once nobody is waiting for it."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=0))
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def hanging_request(url=None, params=None):
+            started.set()
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with patch.object(client, "make_request", side_effect=hanging_request):
+            waiter = asyncio.ensure_future(client.fetch_prices())
+            await started.wait()
+            waiter.cancel()
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+            await asyncio.sleep(0)
+
+        assert client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_charged_to_their_own_budgets(self):
+        """The shared request runs under its own budget; each waiter pays one call and keeps its deadline."""
+        client = AzurePricingClient(cache=PriceCache(max_entries=0))
+        release = asyncio.Event()
+        request_budgets = []
+
+        async def slow_request(url=None, params=None):
+            budget = current_budget()
+            request_budgets.append(budget)
+            for _ in range(3):  # retries charge the shared request's budget
+                budget.charge()
+            await release.wait()
+            return _page(["A"])
+
+        async def fetch(timeout: float) -> tuple[RequestBudget, dict[str, Any]]:
+            with request_budget(timeout=timeout, max_upstream_calls=5) as budget:
+                return budget, await client.fetch_prices()
+
+        with patch.object(client, "make_request", side_effect=slow_request) as mock_request:
+            first = asyncio.ensure_future(fetch(0.05))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(fetch(5))
+            with pytest.raises(BudgetExceededError):
+                await first
+            release.set()
+            second_budget, result = await second
+
+        assert mock_request.call_count == 1
+        assert result["Items"][0]["skuName"] == "A"
+        assert second_budget.upstream_calls == 1
+        assert request_budgets[0] is not second_budget
+        assert request_budgets[0].upstream_calls == 3
+
+
+def _client_with_text_response(status: int, text: str = "", etag: str | None = None) -> AzurePricingClient:
+    """Client whose session answers every GET with `status`, `text` and an optional ETag."""
+    client = AzurePricingClient()
+    client.session = MagicMock()
+    response = MagicMock(status=status, headers={"ETag": etag} if etag else {})
+    response.text = AsyncMock(return_value=text)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    client.session.get.return_value = context
+    return client
+
+
+class TestConditionalText:
+    """Tests for ETag conditional text fetches."""
+
+    @pytest.mark.asyncio
+    async def test_returns_text_and_etag(self):
+        """A 200 response returns the text and its ETag, without a condition on the first fetch."""
+        client = _client_with_text_response(200, "| table |", etag='"v1"')
+
+        result = await client.fetch_text_conditional("https://example.com/sizes.md")
+
+        assert (result.text, result.etag, result.not_modified) == ("| table |", '"v1"', False)
+        assert client.session.get.call_args.kwargs["headers"] is None
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self):
+        """A 304 for the sent ETag reports not_modified and keeps the ETag."""
+        client = _client_with_text_response(304)
+
+        result = await client.fetch_text_conditional("https://example.com/sizes.md", etag='"v1"')
+
+        assert result == ConditionalText(text=None, etag='"v1"', not_modified=True)
+        assert client.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_request(self):
+        """Identical concurrent fetches, including plain fetch_text, are coalesced."""
+        client = _client_with_text_response(200, "| table |", etag='"v1"')
+
+        results = await asyncio.gather(
+            client.fetch_text_conditional("https://example.com/sizes.md"),
+            client.fetch_text("https://example.com/sizes.md"),
+        )
+
+        assert results[0].text == results[1] == "| table |"
+        client.session.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fetch_text_returns_empty_on_failure(self):
+        """fetch_text keeps its contract of an empty string for failed fetches."""
+        client = _client_with_text_response(404)
+        client.session.get.return_value.__aenter__.return_value.raise_for_status = MagicMock(
+            side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=404)
+        )
+
+        assert await client.fetch_text("https://example.com/missing.md") == ""
@@ -0,0 +1,112 @@
+"""Unit tests for columnar price snapshots and their kernels."""
+
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp import columnar
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.columnar import PriceColumns, RegionMinimums, percent_below_max, ri_savings
+from azure_pricing_mcp.services import PricingService, RetirementService
+
+
+def _item(sku: str, region: str | None = "eastus", price: float = 1.0, **extra: Any) -> dict[str, Any]:
+    """Build a fake Retail Prices API item."""
+    item = {"skuName": sku, "armRegionName": region, "retailPrice": price, "meterName": sku}
+    item.update(extra)
+    return item
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch) -> str:
+    """Run each test with the NumPy kernels and with the pure-Python fallback."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar, "np", None)
+    return str(request.param)
+
+
+class TestPriceColumns:
+    """Tests for the snapshot kernels on both backends."""
+
+    def test_first_by_sku(self, backend):
+        """SKUs map to their first row in order of appearance."""
+        columns = PriceColumns([_item("B"), _item("A"), _item("B"), _item("")])
+
+        assert list(columns.first_by_sku().items()) == [("B", 0), ("A", 1)]
+
+    def test_ri_savings(self, backend):
+        """Upfront RI prices become hourly rates by term; unmatched and unpriced rows are skipped."""
+        ri = PriceColumns(
+            [
+                _item("D2", price=438.0, reservationTerm="1 Year"),
+                _item("D4", price=1.0, reservationTerm="3 Years"),
+                _item("D8", price=0.05),
+            ]
+        )
+        od = PriceColumns([_item("D2", price=0.1), _item("D4", price=0.0), _item("D8", price=0.1)])
+
+        savings = ri_savings(ri, od, [0, 1, 2])
+
+        assert [saving.ri_row for saving in savings] == [0, 2]
+        assert savings[0].ri_hourly == pytest.approx(0.05)
+        assert savings[0].savings_percentage == pytest.approx(50.0)
+        assert savings[0].break_even_months == pytest.approx(6.0)
+        assert savings[0].annual_savings == pytest.approx(438.0)
+        assert savings[1].ri_hourly == pytest.approx(0.05)
+
+    def test_region_minimums_across_pages(self):
+        """Running minimums carry over between pages; earlier items win ties."""
+        minimums = RegionMinimums()
+        minimums.add([_item("D2", "eastus", 2.0), _item("D2 Spot", "eastus", 0.5)])
+        minimums.add([_item("D2", "eastus", 1.0), _item("D2", "westus", 3.0), _item("D2 Spot", "eastus", 0.5)])
+        minimums.add([_item("D2", "westus", 3.0, meterName="later")])
+
+        assert {region: item["retailPrice"] for region, item in minimums.on_demand.items()} == {
+            "eastus": 1.0,
+            "westus": 3.0,
+        }
+        assert minimums.on_demand["westus"]["meterName"] == "D2"
+        assert minimums.spot["eastus"]["retailPrice"] == 0.5
+        assert minimums.items_scanned == 6
+
+    def test_region_minimums_skip_unpriced_items(self):
+        """Items with a zero price or without a region are not candidates."""
+        minimums = RegionMinimums()
+        minimums.add([_item("D2", "northeurope", 0.0), _item("D2", None, 0.1), _item("D2 Low Priority", "eastus", 0.2)])
+
+        assert minimums.on_demand == {}
+        assert list(minimums.spot) == ["eastus"]
+
+    def test_percent_below_max(self, backend):
+        """Savings are relative to the highest price."""
+        assert percent_below_max([1.0, 2.0, 4.0]) == pytest.approx([75.0, 50.0, 0.0])
+        assert percent_below_max([0.0, 0.0]) == [0.0, 0.0]
+        assert percent_below_max([]) == []
+
+
+class TestAnalyticalTools:
+    """Tests that the pricing service keeps its output shape on the columnar path."""
+
+    @pytest.mark.asyncio
+    async def test_recommend_regions(self, backend):
+        """Recommendations are sorted by price with Spot prices attached."""
+        client = AzurePricingClient()
+        service = PricingService(client, RetirementService(client))
+        page = {
+            "Items": [
+                _item("D2 v3", "westus", 2.0),
+                _item("D2 v3", "eastus", 1.0),
+                _item("D2 v3 Spot", "westus", 0.4),
+            ],
+            "NextPageLink": None,
+        }
+
+        with patch.object(client, "make_request", AsyncMock(return_value=page)):
+            result = await service.recommend_regions("Virtual Machines", "D2 v3")
+
+        assert [rec["region"] for rec in result["recommendations"]] == ["eastus", "westus"]
+        assert result["recommendations"][1]["spot_price"] == 0.4
+        assert result["summary"]["max_savings_percentage"] == 50.0
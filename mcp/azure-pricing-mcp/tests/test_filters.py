@@ -0,0 +1,79 @@
+"""Unit tests for the OData filter parser."""
+
+import pytest
+
+from azure_pricing_mcp.filters import (
+    BoolOp,
+    Comparison,
+    Contains,
+    FilterEvaluationError,
+    FilterSyntaxError,
+    compile_predicate,
+    parse_conditions,
+    parse_filter,
+)
+
+
+class TestParseFilter:
+    """Tests for the supported OData subset."""
+
+    def test_comparison_and_escaped_quotes(self):
+        """String literals unescape doubled quotes; numbers become floats."""
+        assert parse_filter("meterName eq 'O''Brien'") == Comparison("meterName", "eq", "O'Brien")
+        assert parse_filter("retailPrice gt 0.5") == Comparison("retailPrice", "gt", 0.5)
+
+    def test_tier_keyword_disjunction(self):
+        """The parenthesized or-filter emitted for tier keywords parses."""
+        node = parse_filter("(contains(productName, 'Basic') or contains(skuName, 'Basic'))")
+        assert node == BoolOp("or", (Contains("productName", "Basic"), Contains("skuName", "Basic")))
+
+    def test_conditions_are_joined_with_and(self):
+        """A condition list becomes one conjunction."""
+        node = parse_conditions(["serviceName eq 'Storage'", "armRegionName eq 'eastus'"])
+        assert node == BoolOp(
+            "and", (Comparison("serviceName", "eq", "Storage"), Comparison("armRegionName", "eq", "eastus"))
+        )
+        assert parse_conditions([]) is None
+
+    @pytest.mark.parametrize(
+        "text",
+        ["startswith(skuName, 'D')", "serviceName eq", "serviceName like 'x'", "(serviceName eq 'x'", "not x eq 'y'"],
+    )
+    def test_unsupported_syntax(self, text):
+        """Anything outside the subset is rejected."""
+        with pytest.raises(FilterSyntaxError):
+            parse_filter(text)
+
+
+class TestCompilePredicate:
+    """Tests for evaluating parsed filters against items."""
+
+    def test_matches_service_filters(self):
+        """The conditions emitted by search_prices evaluate like the API."""
+        predicate = compile_predicate(
+            parse_conditions(
+                [
+                    "armRegionName eq 'eastus'",
+                    "(contains(productName, 'Basic') or contains(skuName, 'Basic'))",
+                    "retailPrice gt 0",
+                ]
+            )
+        )
+
+        assert predicate({"armRegionName": "eastus", "productName": "SQL Basic", "skuName": "B", "retailPrice": 5})
+        assert not predicate({"armRegionName": "westus", "productName": "SQL Basic", "skuName": "B", "retailPrice": 5})
+        assert not predicate({"armRegionName": "eastus", "productName": "SQL", "skuName": "S0", "retailPrice": 5})
+
+    def test_casefold(self):
+        """String comparisons are case-sensitive unless casefold is set."""
+        node = parse_filter("contains(skuName, 'd2s')")
+
+        assert not compile_predicate(node)({"skuName": "D2s v3"})
+        assert compile_predicate(node, casefold=True)({"skuName": "D2s v3"})
+
+    def test_uncertain_values_raise(self):
+        """Missing fields and type mismatches are not guessed."""
+        with pytest.raises(FilterEvaluationError):
+            compile_predicate(parse_filter("armRegionName eq 'eastus'"))({})
+        with pytest.raises(FilterEvaluationError):
+            compile_predicate(parse_filter("retailPrice gt 0"))({"retailPrice": "1"})
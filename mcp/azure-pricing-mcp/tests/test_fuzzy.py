@@ -0,0 +1,157 @@
+"""Unit tests for the fuzzy SKU and service name indexes."""
+
+from typing import Any
+
+from azure_pricing_mcp.fuzzy import ServiceIndex, SkuIndex, TrigramIndex, edit_distance, normalize_term
+
+
+def _item(sku: str, product: str = "Virtual Machines Dv3 Series", **extra: Any) -> dict[str, Any]:
+    """Build a fake Retail Prices API item."""
+    item = {"skuName": sku, "armSkuName": f"Standard_{sku.replace(' ', '_')}", "productName": product}
+    item.update(extra)
+    return item
+
+
+class TestTrigramIndex:
+    """Tests for trigram candidate selection and edit-distance ranking."""
+
+    def test_edit_distance(self):
+        """Levenshtein distance counts insertions, deletions and substitutions."""
+        assert edit_distance("d2s v3", "d2s v3") == 0
+        assert edit_distance("d2s v3", "d2 v3") == 1
+        assert edit_distance("kitten", "sitting") == 3
+        assert edit_distance("", "abc") == 3
+
+    def test_normalize_term(self):
+        """Case and underscores do not matter."""
+        assert normalize_term("Standard_D2s_v3") == "standard d2s v3"
+        assert normalize_term("  D2s   V3 ") == "d2s v3"
+
+    def test_typo_ranks_closest_first(self):
+        """A misspelled name finds the closest terms, nearest first."""
+        index: TrigramIndex[str] = TrigramIndex()
+        for term in ["D2s v3", "D4s v3", "D2 v3", "E2s v3", "F2s v2", "Premium LRS"]:
+            index.add(term, term)
+
+        matches = index.search("D2sv3")
+
+        assert matches[0].value == "D2s v3"
+        assert "Premium LRS" not in [match.value for match in matches]
+
+    def test_contained_terms_rank_first(self):
+        """Terms containing the query outrank closer but unrelated spellings."""
+        index: TrigramIndex[str] = TrigramIndex()
+        for term in ["D4", "D4s v5 Low Priority", "D4s v5"]:
+            index.add(term, term)
+
+        assert [match.value for match in index.search("D4s")][:2] == ["D4s v5", "D4s v5 Low Priority"]
+
+    def test_unrelated_query(self):
+        """Nothing is suggested for a query unlike every term."""
+        index: TrigramIndex[str] = TrigramIndex()
+        index.add("D2s v3", "D2s v3")
+
+        assert index.search("Premium SSD") == []
+        assert index.search("") == []
+
+
+class TestSkuIndex:
+    """Tests for per-service SKU suggestions."""
+
+    def test_suggest_distinct_skus(self):
+        """Suggestions have distinct SKU names and match armSkuName spellings."""
+        index = SkuIndex()
+        index.build(
+            "Virtual Machines",
+            [_item("D2s v3", armRegionName="eastus"), _item("D2s v3", armRegionName="westus"), _item("D4s v3")],
+        )
+
+        suggestions = index.suggest("virtual machines", "Standard_D2s_v3")
+
+        assert [item["skuName"] for item in suggestions] == ["D2s v3", "D4s v3"]
+        assert suggestions[0]["armRegionName"] == "eastus"
+
+    def test_indexes_are_per_service_and_currency(self):
+        """A service indexed in one currency is not indexed in another."""
+        index = SkuIndex()
+        index.build("Storage", [_item("Hot LRS", "Blob Storage")], currency_code="EUR")
+
+        assert index.has_service("storage", "EUR")
+        assert not index.has_service("Storage", "USD")
+        assert index.suggest("Storage", "Hot LRS") == []
+
+    def test_indexes_expire(self):
+        """Indexes expire after the TTL so suggested prices stay current."""
+        index = SkuIndex(ttl=0)
+        index.build("Storage", [_item("Hot LRS")])
+
+        assert not index.has_service("Storage")
+
+
+def _service_item(service: str, family: str, product: str) -> dict[str, Any]:
+    """Build a fake item of a service."""
+    return {"serviceName": service, "serviceFamily": family, "productName": product, "skuName": "S1"}
+
+
+class TestServiceIndex:
+    """Tests for resolving service hints."""
+
+    def _index(self) -> ServiceIndex:
+        index = ServiceIndex()
+        index.rebuild(
+            [
+                _service_item("Azure Cosmos DB", "Databases", "Azure Cosmos DB"),
+                _service_item("Azure Database for PostgreSQL", "Databases", "Az DB for PostgreSQL Flexible Server"),
+                _service_item("Azure Database for PostgreSQL", "Databases", "Az DB for PostgreSQL Single Server"),
+                _service_item("Virtual Machines", "Compute", "Virtual Machines Dv3 Series"),
+                _service_item("Storage", "Storage", "Blob Storage"),
+            ],
+            aliases={"vm": "Virtual Machines", "cosmos": "Azure Cosmos DB"},
+        )
+        return index
+
+    def test_partial_and_product_names(self):
+        """Hints contained in service or product names resolve to the service."""
+        index = self._index()
+
+        assert index.lookup("postgres")[0].entry.service_name == "Azure Database for PostgreSQL"
+        assert index.lookup("blob")[0].entry.service_name == "Storage"
+        assert index.lookup("VM")[0].entry.service_name == "Virtual Machines"
+
+    def test_typos_and_shared_words(self):
+        """Misspelled hints match by edit distance, and shared words rank related services."""
+        index = self._index()
+
+        assert index.lookup("cosmso db")[0].entry.service_name == "Azure Cosmos DB"
+        assert {match.entry.service_name for match in index.lookup("databases")} == {
+            "Azure Cosmos DB",
+            "Azure Database for PostgreSQL",
+        }
+
+    def test_family_filter(self):
+        """A service family restricts suggestions, or lists its services when no name is given."""
+        index = self._index()
+
+        assert [match.entry.service_name for match in index.lookup("", service_family="Databases")] == [
+            "Azure Cosmos DB",
+            "Azure Database for PostgreSQL",
+        ]
+        assert index.lookup("storage", service_family="Compute") == []
+
+    def test_samples_of_distinct_products(self):
+        """Each service keeps sample items of distinct products."""
+        entry = self._index().get("azure database for postgresql")
+
+        assert entry is not None
+        assert [item["productName"] for item in entry.sample_items] == [
+            "Az DB for PostgreSQL Flexible Server",
+            "Az DB for PostgreSQL Single Server",
+        ]
+
+    def test_staleness(self):
+        """An index is stale until built and again after its TTL."""
+        index = ServiceIndex(ttl=0)
+        assert index.is_stale()
+        index.rebuild()
+        assert index.is_stale()
+        assert not self._index().is_stale()
@@ -0,0 +1,100 @@
+"""Unit tests for the tool handlers."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp.types import TextContent
+
+from azure_pricing_mcp.handlers import ToolHandlers
+from azure_pricing_mcp.server import _call_with_budget
+
+
+def _text(text: str) -> list[TextContent]:
+    return [TextContent(type="text", text=text)]
+
+
+@pytest.fixture
+def handlers() -> ToolHandlers:
+    """Handlers whose services are mocks; tests patch the handler methods they use."""
+    return ToolHandlers(MagicMock(), MagicMock(), MagicMock())
+
+
+class TestBatchTool:
+    """Tests for azure_batch."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_order_with_errors(self, handlers):
+        """Results keep the request order; bad and failing calls only report their own error."""
+        handlers.handle_price_search = AsyncMock(return_value=_text("search result"))
+        handlers.handle_cost_estimate = AsyncMock(side_effect=RuntimeError("upstream down"))
+        calls = [
+            {"tool": "azure_cost_estimate", "arguments": {"sku_name": "D2s v3"}},
+            {"tool": "simulate_eviction", "arguments": {"vm_resource_id": "/subscriptions/x"}},
+            {"tool": "azure_price_search", "arguments": {"sku_name": "D2s v3"}},
+            {"tool": "azure_price_search", "arguments": 5},
+        ]
+
+        result = await handlers.handle_batch({"calls": calls})
+
+        text = result[0].text
+        assert text.startswith("## Batch of 4 calls (2 distinct), 3 failed")
+        assert text.index("[1] azure_cost_estimate") < text.index("[2] simulate_eviction")
+        assert "Error: upstream down" in text
+        assert "Error: Tool 'simulate_eviction' cannot be used in a batch" in text
+        assert "### [3] azure_price_search\n\nsearch result" in text
+        assert "Error: arguments must be an object" in text
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_run_once(self, handlers):
+        """Duplicate calls share one execution, regardless of argument order."""
+        handlers.handle_price_search = AsyncMock(return_value=_text("shared"))
+        calls = [
+            {"tool": "azure_price_search", "arguments": {"sku_name": "D2s v3", "region": "eastus"}},
+            {"tool": "azure_price_search", "arguments": {"region": "eastus", "sku_name": "D2s v3"}},
+        ]
+
+        result = await handlers.handle_batch({"calls": calls})
+
+        handlers.handle_price_search.assert_called_once()
+        assert result[0].text.count("shared") == 2
+        assert "[2] azure_price_search (same as an earlier call)" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, handlers):
+        """Sub-calls run concurrently, at most MAX_CONCURRENT_REQUESTS at a time."""
+        running = peak = 0
+
+        async def search(arguments: dict[str, Any]) -> list[TextContent]:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return _text(arguments["sku_name"])
+
+        handlers.handle_price_search = search
+        calls = [{"tool": "azure_price_search", "arguments": {"sku_name": f"S{i}"}} for i in range(6)]
+
+        with patch("azure_pricing_mcp.handlers.MAX_CONCURRENT_REQUESTS", 3):
+            await handlers.handle_batch({"calls": calls})
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_too_many_calls(self, handlers):
+        """Batches above the configured size are rejected."""
+        with patch("azure_pricing_mcp.handlers.TOOL_BATCH_MAX_CALLS", 1):
+            result = await handlers.handle_batch({"calls": [{"tool": "get_customer_discount"}] * 2})
+
+        assert result[0].text.startswith("Error: azure_batch accepts at most 1 calls")
+
+    @pytest.mark.asyncio
+    async def test_dispatched_by_server(self, handlers):
+        """The server routes azure_batch calls to the handler."""
+        handlers.handle_customer_discount = AsyncMock(return_value=_text("10%"))
+
+        result = await _call_with_budget(handlers, "azure_batch", {"calls": [{"tool": "get_customer_discount"}]})
+
+        assert "10%" in result[0].text
@@ -70,6 +70,8 @@ class TestHTTPTransportTools:
             "azure_price_search",
             "azure_price_compare",
             "azure_cost_estimate",
+            "azure_bom_estimate",
+            "azure_batch",
             "azure_discover_skus",
             "azure_sku_discovery",
             "get_customer_discount",
@@ -0,0 +1,163 @@
+"""Unit tests for client-side rate limiting."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.ratelimit import (
+    AdaptiveRateLimiter,
+    SharedRateLimitState,
+    create_rate_limiter,
+    parse_retry_after,
+)
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    def test_delta_seconds(self):
+        """Numeric values are seconds."""
+        assert parse_retry_after("7") == 7.0
+
+    def test_http_date_in_past(self):
+        """Dates in the past mean retry immediately."""
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_missing_or_invalid(self):
+        """Missing or unparseable values are ignored."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestAdaptiveRateLimiter:
+    """Tests for the AIMD token bucket."""
+
+    @pytest.mark.asyncio
+    async def test_additive_increase_and_multiplicative_decrease(self):
+        """Successes add a fixed step; throttles cut the rate by a factor."""
+        limiter = AdaptiveRateLimiter(initial_rate=4, min_rate=0.5, max_rate=10, increase_step=0.5)
+        await limiter.on_success()
+        assert limiter.rate == pytest.approx(4.5)
+        await limiter.on_throttle(0)
+        assert limiter.rate == pytest.approx(2.25)
+
+    @pytest.mark.asyncio
+    async def test_rate_bounds(self):
+        """The rate never leaves [min_rate, max_rate]."""
+        limiter = AdaptiveRateLimiter(initial_rate=1, min_rate=0.5, max_rate=1.2, increase_step=1)
+        await limiter.on_success()
+        assert limiter.rate == 1.2
+        for _ in range(5):
+            await limiter.on_throttle(0)
+        assert limiter.rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        """A full bucket allows a burst; later acquisitions are paced by the rate."""
+        limiter = AdaptiveRateLimiter(initial_rate=50, max_rate=50, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        assert time.monotonic() - start < 0.05
+
+        await limiter.acquire()
+        assert time.monotonic() - start >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_throttle_pauses_for_retry_after(self):
+        """After a throttle, acquire waits for the Retry-After pause."""
+        limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=100, burst=5)
+        await limiter.on_throttle(0.05)
+        start = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - start >= 0.04
+
+
+class TestSharedRateLimitState:
+    """Tests for the cross-process rate budget."""
+
+    @pytest.mark.asyncio
+    async def test_throttle_is_seen_by_other_limiters(self, tmp_path):
+        """A 429 in one process slows every limiter sharing the state file."""
+        path = tmp_path / "ratelimit.json"
+        first = AdaptiveRateLimiter(initial_rate=4, shared_state=SharedRateLimitState(path))
+        second = AdaptiveRateLimiter(initial_rate=4, shared_state=SharedRateLimitState(path))
+
+        assert await first.on_throttle(0.01) == pytest.approx(0.01)
+        await second.acquire()
+
+        assert first.rate == second.rate == pytest.approx(2.0)
+
+    @pytest.mark.asyncio
+    async def test_shared_updates_run_off_the_event_loop(self, tmp_path):
+        """Locked state file updates after a response run in a worker thread."""
+        limiter = AdaptiveRateLimiter(initial_rate=4, shared_state=SharedRateLimitState(tmp_path / "ratelimit.json"))
+
+        with patch("azure_pricing_mcp.ratelimit.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            await limiter.on_success()
+            await limiter.on_throttle(0)
+
+        assert [call.args[0] for call in to_thread.call_args_list] == [limiter._update_shared] * 2
+
+    @pytest.mark.asyncio
+    async def test_burst_is_shared(self, tmp_path):
+        """Limiters sharing a file draw tokens from one bucket."""
+        path = tmp_path / "ratelimit.json"
+        first = AdaptiveRateLimiter(initial_rate=20, max_rate=20, burst=2, shared_state=SharedRateLimitState(path))
+        second = AdaptiveRateLimiter(initial_rate=20, max_rate=20, burst=2, shared_state=SharedRateLimitState(path))
+
+        start = time.monotonic()
+        await first.acquire()
+        await second.acquire()
+        assert time.monotonic() - start < 0.04
+
+        await first.acquire()
+        assert time.monotonic() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_corrupt_state_file_is_reset(self, tmp_path):
+        """An unreadable state file is replaced with fresh state."""
+        path = tmp_path / "ratelimit.json"
+        path.write_text("not json")
+        limiter = AdaptiveRateLimiter(initial_rate=3, shared_state=SharedRateLimitState(path))
+
+        await limiter.acquire()
+
+        assert json.loads(path.read_text())["rate"] == pytest.approx(3.0)
+
+    def test_create_rate_limiter_falls_back_without_file_locking(self, tmp_path):
+        """Platforms without fcntl get a per-process limiter."""
+        with patch("azure_pricing_mcp.ratelimit.fcntl", None):
+            limiter = create_rate_limiter(tmp_path / "ratelimit.json")
+
+        assert limiter._shared_state is None
+
+
+class TestClientRateLimiting:
+    """Tests for rate limiting in make_request."""
+
+    @pytest.mark.asyncio
+    async def test_429_honours_retry_after_and_retries(self):
+        """A 429 with Retry-After slows the limiter and the request is retried."""
+        limiter = AdaptiveRateLimiter(initial_rate=10, max_rate=10)
+        client = AzurePricingClient(rate_limiter=limiter)
+        client.session = MagicMock()
+
+        throttled = MagicMock(status=429, headers={"Retry-After": "0"})
+        ok = MagicMock(status=200, headers={})
+        ok.json = AsyncMock(return_value={"Items": []})
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(side_effect=[throttled, ok])
+        context.__aexit__ = AsyncMock(return_value=False)
+        client.session.get.return_value = context
+
+        with patch.object(limiter, "on_throttle", wraps=limiter.on_throttle) as on_throttle:
+            result = await client.make_request()
+
+        assert result == {"Items": []}
+        on_throttle.assert_called_once_with(0.0)
+        assert limiter.rate == pytest.approx(5.0 + 0.1)
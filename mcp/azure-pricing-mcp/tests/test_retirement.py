@@ -0,0 +1,183 @@
+"""Unit tests for VM retirement lookups."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.client import ConditionalText
+from azure_pricing_mcp.config import RETIRED_SIZES_URL
+from azure_pricing_mcp.disk_cache import DiskCache
+from azure_pricing_mcp.models import RetirementStatus, VMSeriesRetirementInfo
+from azure_pricing_mcp.services import RetirementService
+from azure_pricing_mcp.services.retirement import RetirementTable, series_from_sku
+
+
+def _info(series: str, status: RetirementStatus = RetirementStatus.RETIREMENT_ANNOUNCED) -> VMSeriesRetirementInfo:
+    return VMSeriesRetirementInfo(series_name=f"{series}-series", status=status)
+
+
+class TestSeriesFromSku:
+    """Tests for SKU name to series key extraction."""
+
+    @pytest.mark.parametrize(
+        "sku_name, series",
+        [
+            ("Standard_D2s_v3", "Dsv3"),
+            ("D2s v3", "Dsv3"),
+            ("Standard_E64ds_v4", "Edsv4"),
+            ("basic_A1", "A"),
+            ("Standard_G5", "G"),
+            ("", None),
+            ("_", None),
+        ],
+    )
+    def test_extraction(self, sku_name, series):
+        """Prefixes, sizes and underscores are stripped from the series key."""
+        assert series_from_sku(sku_name) == series
+
+    def test_memoized(self):
+        """Repeated SKU names are answered from the memo."""
+        series_from_sku.cache_clear()
+        for _ in range(3):
+            series_from_sku("Standard_D4s_v3")
+
+        info = series_from_sku.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+
+class TestRetirementTable:
+    """Tests for the compiled retirement table."""
+
+    def test_exact_and_case_insensitive_versioned_match(self):
+        """Versioned series match regardless of case; unversioned ones only exactly."""
+        table = RetirementTable({"Dsv2": _info("Dsv2"), "G": _info("G")})
+
+        assert table.match("Dsv2").series_name == "Dsv2-series"
+        assert table.match("DSV2").series_name == "Dsv2-series"
+        assert table.match("G").series_name == "G-series"
+        assert table.match("g") is None
+        assert table.match("Dsv5") is None
+
+    def test_first_key_wins_on_case_collision(self):
+        """Keys folding to the same name resolve to the first one, as the linear scan did."""
+        table = RetirementTable({"Dsv2": _info("first"), "DSv2": _info("second")})
+
+        assert table.match("dsv2").series_name == "first-series"
+
+
+RETIRED_MD = """
+| Series name | Retirement status | Announcement date | Retirement date |
+|---|---|---|---|
+| Dv2-series | **Retirement announced** | May 1, 2025 | May 1, 2028 |
+"""
+
+PREVIOUS_GEN_MD = """
+| Series | Status |
+|---|---|
+| Ev4-series | [Next-gen available](https://learn.microsoft.com) |
+"""
+
+
+def _client(disk_cache: DiskCache | None = None) -> MagicMock:
+    """Client serving both retirement files, with ETags "retired" and "previous"."""
+
+    async def fetch(url: str, etag: str | None = None) -> ConditionalText:
+        name, text = ("retired", RETIRED_MD) if url == RETIRED_SIZES_URL else ("previous", PREVIOUS_GEN_MD)
+        if etag == name:
+            return ConditionalText(text=None, etag=etag, not_modified=True)
+        return ConditionalText(text=text, etag=name)
+
+    client = MagicMock(disk_cache=disk_cache)
+    client.fetch_text_conditional = AsyncMock(side_effect=fetch)
+    return client
+
+
+class TestRetirementService:
+    """Tests for retirement checks and the background refresh."""
+
+    @pytest.mark.asyncio
+    async def test_warnings_once_per_series(self):
+        """Each retiring series is reported once, with the first SKU seen as the example."""
+        service = RetirementService(MagicMock(session=None, disk_cache=None))
+        items = [{"skuName": "D2 v2"}, {"skuName": "D4 v2"}, {"armSkuName": "Standard_D2s_v5"}, {"skuName": "G5"}]
+
+        warnings = await service.check_skus_retirement_status(items)
+
+        assert [(w["series_name"], w["sku_example"]) for w in warnings] == [
+            ("Dv2-series", "D2 v2"),
+            ("G-series", "G5"),
+        ]
+        assert warnings[0]["retirement_date"] == "May 1, 2028"
+
+    @pytest.mark.asyncio
+    async def test_refresh_uses_conditional_requests(self):
+        """A second refresh sends the ETags; unchanged files keep the compiled table."""
+        client = _client()
+        service = RetirementService(client)
+
+        assert await service.refresh()
+        table = await service.get_retirement_table()
+        assert set(table.data) == {"Dv2", "Ev4"}
+
+        client.fetch_text_conditional.reset_mock()
+        assert await service.refresh()
+
+        assert {call.kwargs["etag"] for call in client.fetch_text_conditional.call_args_list} == {"retired", "previous"}
+        assert await service.get_retirement_table() is table
+
+    @pytest.mark.asyncio
+    async def test_failed_file_keeps_last_good_data(self):
+        """A file that fails to download keeps its previously parsed series."""
+        client = _client()
+        service = RetirementService(client)
+        await service.refresh()
+        client.fetch_text_conditional.side_effect = [ConditionalText(text="not a table", etag="x"), OSError("down")]
+
+        assert not await service.refresh()
+        assert set(await service.get_retirement_data()) == {"Dv2", "Ev4"}
+
+    @pytest.mark.asyncio
+    async def test_lookups_do_not_wait_for_refresh(self):
+        """Lookups answer from the fallback data while the first refresh runs in the background."""
+        release = asyncio.Event()
+        client = _client()
+        fetch = client.fetch_text_conditional.side_effect
+
+        async def slow_fetch(url: str, etag: str | None = None) -> ConditionalText:
+            await release.wait()
+            return await fetch(url, etag)
+
+        client.fetch_text_conditional.side_effect = slow_fetch
+        service = RetirementService(client)
+
+        assert "G" in (await service.get_retirement_table()).data
+        refresh = service._refresh_task
+        await asyncio.sleep(0)
+        assert "G" in (await service.get_retirement_data()).keys()
+        assert service._refresh_task is refresh and not refresh.done()
+
+        release.set()
+        assert await service._refresh_task
+        assert set(await service.get_retirement_data()) == {"Dv2", "Ev4"}
+        await service.aclose()
+
+    @pytest.mark.asyncio
+    async def test_persisted_table_survives_restart(self, tmp_path):
+        """A new service loads the parsed files and ETags saved by an earlier refresh."""
+        disk_cache = DiskCache(tmp_path / "cache.db")
+        await RetirementService(_client(disk_cache)).refresh()
+
+        client = _client(disk_cache)
+        service = RetirementService(client)
+        await service.start()
+        assert set((await service.get_retirement_table()).data) == {"Dv2", "Ev4"}
+        client.fetch_text_conditional.assert_not_called()
+
+        with patch("azure_pricing_mcp.services.retirement.RETIREMENT_CACHE_TTL", timedelta(0)):
+            service = RetirementService(client)
+            await service.start()
+            assert await service._refresh_task
+        assert {call.kwargs["etag"] for call in client.fetch_text_conditional.call_args_list} == {"retired", "previous"}
+        disk_cache.close()
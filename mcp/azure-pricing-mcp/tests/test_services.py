@@ -0,0 +1,626 @@
+"""Unit tests for the pricing and SKU services."""
+
+import asyncio
+import itertools
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp.budget import current_budget, request_budget
+from azure_pricing_mcp.client import AzurePricingClient
+from azure_pricing_mcp.config import SERVICE_NAME_MAPPINGS
+from azure_pricing_mcp.formatters import (
+    format_bom_estimate_response,
+    format_discover_skus_response,
+    format_ri_pricing_response,
+)
+from azure_pricing_mcp.fuzzy import ServiceIndex
+from azure_pricing_mcp.services import PricingService, RetirementService, SKUService, SpeculativePrefetcher
+from azure_pricing_mcp.services.pricing import BOM_MAX_LINES
+
+
+def _item(sku: str, region: str = "eastus", price: float = 1.0, **extra: Any) -> dict[str, Any]:
+    """Build a fake Retail Prices API item."""
+    item = {
+        "skuName": sku,
+        "armSkuName": f"Standard_{sku.replace(' ', '_')}",
+        "armRegionName": region,
+        "location": region,
+        "retailPrice": price,
+        "unitOfMeasure": "1 Hour",
+        "productName": "Storage",
+        "meterName": sku,
+        "serviceName": "Storage",
+    }
+    item.update(extra)
+    return item
+
+
+def _page(items: list[dict[str, Any]], next_link: str | None = None) -> dict[str, Any]:
+    """Build a fake Retail Prices API page."""
+    return {"Items": items, "NextPageLink": next_link, "Count": len(items)}
+
+
+@pytest.fixture
+def client() -> AzurePricingClient:
+    """Client whose network calls are patched per test."""
+    return AzurePricingClient()
+
+
+@pytest.fixture
+def pricing_service(client: AzurePricingClient) -> PricingService:
+    """Pricing service wired to the test client."""
+    return PricingService(client, RetirementService(client))
+
+
+class TestSearchPricesPagination:
+    """Tests for multi-page search results."""
+
+    @pytest.mark.asyncio
+    async def test_search_prices_collects_pages_up_to_limit(self, client, pricing_service):
+        """Limits above one page are honoured by following NextPageLink."""
+        pages = [
+            _page([_item(f"S{i}") for i in range(3)], "https://next/1"),
+            _page([_item(f"S{i}") for i in range(3, 6)], "https://next/2"),
+            _page([_item("S6")]),
+        ]
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)) as mock_request:
+            result = await pricing_service.search_prices(service_name="Storage", limit=5)
+
+        assert result["count"] == 5
+        assert result["has_more"] is True
+        assert mock_request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_limits_distinct_skus(self, client, pricing_service):
+        """discover_skus keeps reading pages until it has `limit` distinct SKUs."""
+        pages = [
+            _page([_item("A"), _item("A", region="westus")], "https://next/1"),
+            _page([_item("B"), _item("C")]),
+        ]
+        sku_service = SKUService(pricing_service)
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)):
+            result = await sku_service.discover_skus(service_name="Storage", limit=2)
+
+        assert [sku["sku_name"] for sku in result["skus"]] == ["A", "B"]
+        assert result["skus"][0]["available_regions"] == ["eastus", "westus"]
+        # SKU C was left out by the limit
+        assert result["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_exactly_at_limit_is_complete(self, client, pricing_service):
+        """Reaching `limit` on the last item of the last page is not a truncation."""
+        sku_service = SKUService(pricing_service)
+        with patch.object(client, "make_request", AsyncMock(return_value=_page([_item("A"), _item("B")]))):
+            result = await sku_service.discover_skus(service_name="Storage", limit=2)
+
+        assert result["total_skus"] == 2
+        assert result["truncated"] is False
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_stops_when_a_page_adds_no_sku(self, client, pricing_service):
+        """A page repeating known SKUs ends the scan, and the result is reported as truncated."""
+        pages = [
+            _page([_item("A"), _item("B")], "https://next/1"),
+            _page([_item("A", region="westus"), _item("B", region="westus")], "https://next/2"),
+            _page([_item("C")]),
+        ]
+        sku_service = SKUService(pricing_service)
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)) as mock_request:
+            result = await sku_service.discover_skus(service_name="Storage")
+
+        assert mock_request.call_count == 2
+        assert [sku["sku_name"] for sku in result["skus"]] == ["A", "B"]
+        assert result["skus"][0]["available_regions"] == ["eastus", "westus"]
+        assert (result["pages_scanned"], result["truncated"]) == (2, True)
+        assert "Stopped after 2 pages" in format_discover_skus_response(result)
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_page_cap(self, client, pricing_service):
+        """At most SKU_DISCOVERY_MAX_PAGES pages are read."""
+        sku_service = SKUService(pricing_service)
+
+        async def request(url=None, params=None):
+            index = int(url.rsplit("/", 1)[1]) if url else 0
+            return _page([_item(f"S{index}")], f"https://next/{index + 1}")
+
+        with patch("azure_pricing_mcp.services.sku.SKU_DISCOVERY_MAX_PAGES", 3):
+            with patch.object(client, "make_request", side_effect=request) as mock_request:
+                result = await sku_service.discover_skus(service_name="Storage")
+
+        assert mock_request.call_count == 3
+        assert result["total_skus"] == 3
+        assert result["truncated"] is True
+
+
+class TestSkuSuggestions:
+    """Tests for "did you mean" suggestions from the local SKU index."""
+
+    @pytest.mark.asyncio
+    async def test_index_built_once_per_service(self, client, pricing_service):
+        """The first miss indexes the service with one search; later misses need no upstream call."""
+        service_page = _page([_item("Hot LRS", price=0.02), _item("Cool LRS"), _item("Hot GRS"), _item("Archive LRS")])
+        responses = [_page([]), service_page]
+
+        with patch.object(client, "make_request", AsyncMock(side_effect=responses)) as mock_request:
+            first = await pricing_service.search_prices(service_name="Storage", sku_name="Hot LRSS")
+            second = await pricing_service.search_prices(service_name="Storage", sku_name="Cool GRS")
+
+        # The second search itself is answered from the cached service page
+        assert mock_request.call_count == 2
+        assert first["sku_validation"]["suggestions"][0] == {
+            "sku_name": "Hot LRS",
+            "product_name": "Storage",
+            "price": 0.02,
+            "unit": "1 Hour",
+            "region": "eastus",
+        }
+        assert [s["sku_name"] for s in second["sku_validation"]["suggestions"]][:2] == ["Cool LRS", "Hot GRS"]
+
+    @pytest.mark.asyncio
+    async def test_truncated_index_is_not_kept(self, client, pricing_service):
+        """An index built from a search the budget cut short is used once, then rebuilt."""
+
+        async def request(url=None, params=None):
+            current_budget().charge()
+            return _page([_item("Hot LRS")], f"https://next/{current_budget().upstream_calls}")
+
+        with request_budget(max_upstream_calls=1):
+            with patch.object(client, "make_request", side_effect=request):
+                result = await pricing_service._validate_and_suggest_skus("Storage", "Hot LRSS")
+
+        assert result["sku_validation"]["suggestions"][0]["sku_name"] == "Hot LRS"
+        assert not pricing_service._sku_index.has_service("Storage")
+
+
+class TestFindSimilarServices:
+    """Tests for resolving service hints with the local service index."""
+
+    @pytest.mark.asyncio
+    async def test_samples_fetched_in_one_request(self, client, pricing_service):
+        """Suggested services without sample items are sampled with one OR-filtered request."""
+        sku_service = SKUService(pricing_service)
+        index = sku_service._service_indexes["USD"] = ServiceIndex()
+        index.rebuild(aliases=SERVICE_NAME_MAPPINGS)
+        page = _page([_item("Basic", serviceName="Azure Cache for Redis", productName="Azure Redis Cache Basic")])
+
+        with patch.object(client, "make_request", AsyncMock(return_value=page)) as mock_request:
+            result = await sku_service._find_similar_services(service_name="redis cache")
+
+        mock_request.assert_called_once()
+        assert "serviceName eq 'Azure Cache for Redis'" in mock_request.call_args.kwargs["params"]["$filter"]
+        assert result["suggestions"][0]["service_name"] == "Azure Cache for Redis"
+        assert result["suggestions"][0]["sample_items"][0]["skuName"] == "Basic"
+        # Services the complete response shows to have no prices are not suggested
+        assert [s["service_name"] for s in result["suggestions"]] == ["Azure Cache for Redis"]
+
+    @pytest.mark.asyncio
+    async def test_seeding_the_index_is_the_only_request(self, client, pricing_service):
+        """Without a catalog, seeding a stale index uses up the one upstream request of a lookup."""
+        sku_service = SKUService(pricing_service)
+        # The seed page holds no Redis prices, and more pages exist
+        seed = _page([_item("Hot LRS")], "https://next/1")
+
+        with patch.object(client, "make_request", AsyncMock(return_value=seed)) as mock_request:
+            result = await sku_service._find_similar_services(service_name="redis cache")
+
+        mock_request.assert_called_once()
+        assert "$filter" not in mock_request.call_args.kwargs["params"]
+        assert result["suggestions"][0]["service_name"] == "Azure Cache for Redis"
+        assert result["suggestions"][0]["sample_items"] == []
+
+    @pytest.mark.asyncio
+    async def test_alias_lookup_is_the_only_request(self, client, pricing_service):
+        """An alias with no prices falls back to the index without seeding it."""
+        sku_service = SKUService(pricing_service)
+
+        with patch.object(client, "make_request", AsyncMock(return_value=_page([]))) as mock_request:
+            result = await sku_service._find_similar_services(service_name="redis")
+
+        mock_request.assert_called_once()
+        assert "serviceName eq 'Azure Cache for Redis'" in mock_request.call_args.kwargs["params"]["$filter"]
+        assert result["match_type"] == "suggestions_only"
+        assert sku_service._service_indexes["USD"].built_at is None
+
+    @pytest.mark.asyncio
+    async def test_second_lookup_is_local(self, client, pricing_service):
+        """Once sampled, a service is suggested again without any upstream request."""
+        sku_service = SKUService(pricing_service)
+        page = _page([_item("Hot LRS", serviceName="Storage", productName="Blob Storage")])
+
+        with patch.object(client, "make_request", AsyncMock(return_value=page)) as mock_request:
+            await sku_service._find_similar_services(service_name="blobs")
+            result = await sku_service._find_similar_services(service_name="blob storag")
+
+        mock_request.assert_called_once()
+        assert result["suggestions"][0]["service_name"] == "Storage"
+        assert result["suggestions"][0]["match_reason"] == "Partial match for 'blob storag'"
+
+    @pytest.mark.asyncio
+    async def test_unmapped_hint_without_catalog(self, client, pricing_service):
+        """Without a catalog, a hint matching no alias is resolved from the broad search seeding the index."""
+        sku_service = SKUService(pricing_service)
+        seed = _page(
+            [
+                _item("Standard", serviceName="Azure Managed Grafana", productName="Azure Managed Grafana"),
+                _item("Hot LRS"),
+            ]
+        )
+
+        with patch.object(client, "make_request", AsyncMock(return_value=seed)) as mock_request:
+            result = await sku_service._find_similar_services(service_name="grafana")
+            again = await sku_service._find_similar_services(service_name="managed grafana")
+
+        mock_request.assert_called_once()
+        assert "$filter" not in mock_request.call_args.kwargs["params"]
+        assert result["suggestions"][0]["service_name"] == "Azure Managed Grafana"
+        assert result["suggestions"][0]["sample_items"][0]["skuName"] == "Standard"
+        assert again["suggestions"][0]["service_name"] == "Azure Managed Grafana"
+
+
+class TestComparePrices:
+    """Tests for the concurrent region fan-out of compare_prices."""
+
+    @pytest.mark.asyncio
+    async def test_regions_are_looked_up_concurrently(self, client, pricing_service):
+        """Lookups overlap up to the concurrency cap and one failure only drops its region."""
+        in_flight = 0
+        peak = 0
+
+        async def request(url=None, params=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if "westus" in params["$filter"]:
+                raise RuntimeError("boom")
+            region = params["$filter"].split("armRegionName eq '")[1].split("'")[0]
+            return _page([_item("Hot LRS", region=region, price=len(region))])
+
+        regions = ["eastus", "westus", "northeurope", "eastus", "japaneast", "brazilsouth"]
+        with (
+            patch("azure_pricing_mcp.services.pricing.MAX_CONCURRENT_REQUESTS", 2),
+            patch.object(client, "make_request", side_effect=request),
+        ):
+            result = await pricing_service.compare_prices("Storage", sku_name="Hot LRS", regions=regions, max_regions=4)
+
+        assert peak == 2
+        assert [comparison["region"] for comparison in result["comparisons"]] == ["eastus", "japaneast", "northeurope"]
+        assert result["skipped_regions"] == ["brazilsouth"]
+        assert result["timing"]["regions_queried"] == 4
+        assert result["timing"]["sequential_seconds"] >= result["timing"]["wall_clock_seconds"]
+
+
+class TestRecommendRegions:
+    """Tests for the full region scan of recommend_regions."""
+
+    @pytest.mark.asyncio
+    async def test_scans_every_page(self, client, pricing_service):
+        """A region that only appears on a later page is still found."""
+        pages = [
+            _page([_item("D2s v3", region=f"region{i}", price=1.0 + i) for i in range(3)], "https://next/1"),
+            _page([_item("D2s v3 Spot", region="region0", price=0.2)], "https://next/2"),
+            _page([_item("D2s v3", region="cheapest", price=0.5)]),
+        ]
+        with patch.object(client, "make_request", AsyncMock(side_effect=pages)):
+            result = await pricing_service.recommend_regions("Storage", "D2s v3")
+
+        assert result["summary"]["cheapest_region"] == "cheapest"
+        assert result["total_regions_found"] == 4
+        assert result["recommendations"][1]["spot_price"] == 0.2
+        assert result["complete"] is True
+        assert result["pages_scanned"] == 3
+
+    @pytest.mark.asyncio
+    async def test_budget_cut_scan_is_incomplete(self, client, pricing_service):
+        """A scan stopped by the request budget reports partial coverage."""
+
+        links = itertools.count(1)
+
+        async def request(url=None, params=None):
+            return _page([_item("D2s v3", region="eastus")], f"https://next/{next(links)}")
+
+        with patch.object(client, "make_request", side_effect=request):
+            with request_budget(timeout=5, max_upstream_calls=2) as budget:
+                result = await pricing_service.recommend_regions("Storage", "D2s v3")
+
+        assert result["complete"] is False
+        assert result["pages_scanned"] == 2
+        assert budget.truncated
+
+
+class TestBomEstimate:
+    """Tests for bill-of-materials estimates."""
+
+    @pytest.mark.asyncio
+    async def test_lines_totals_and_savings_plans(self, client, pricing_service):
+        """Duplicate lookups are made once; totals add up lines and savings plans cover hourly lines only."""
+        savings_plan = [{"term": "1 Year", "retailPrice": 0.6}, {"term": "3 Years", "retailPrice": 0.4}]
+        vm = _item("D2s v3", price=1.0, savingsPlan=savings_plan)
+        disk = _item("P10 LRS", price=20.0, unitOfMeasure="1/Month")
+
+        async def request(url=None, params=None):
+            return _page([disk] if "P10" in params["$filter"] else [vm])
+
+        lines = [
+            {
+                "service_name": "Virtual Machines",
+                "sku_name": "D2s v3",
+                "region": "eastus",
+                "quantity": 2,
+                "label": "web",
+            },
+            {"service_name": "Virtual Machines", "sku_name": "D2s v3", "region": "eastus", "hours_per_month": 100},
+            {"service_name": "Storage", "sku_name": "P10 LRS", "region": "eastus", "quantity": 3},
+            {"service_name": "Storage", "sku_name": "P10 LRS"},
+        ]
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            result = await pricing_service.estimate_bom(lines)
+
+        assert mock_request.call_count == 2
+        assert result["lookups"] == {"distinct": 2, "deduplicated": 1}
+        assert [line.get("monthly_cost") for line in result["lines"]] == [1460.0, 100.0, 60.0, None]
+        assert result["lines"][2]["units_per_month"] == 1
+        assert "required" in result["lines"][3]["error"]
+        assert result["totals"] == {
+            "monthly_cost": 1620.0,
+            "yearly_cost": 19440.0,
+            "priced_lines": 3,
+            "failed_lines": 1,
+        }
+        one_year = result["savings_plan_totals"][0]
+        assert one_year["term"] == "1 Year"
+        assert one_year["monthly_cost"] == pytest.approx(0.6 * 1560 + 60)
+        assert one_year["annual_savings"] == pytest.approx(0.4 * 1560 * 12)
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_only_fails_its_lines(self, client, pricing_service):
+        """A lookup without results is reported on its line; other lines are still priced."""
+
+        async def request(url=None, params=None):
+            return _page([] if "Missing" in params["$filter"] else [_item("D2s v3", price=0.5)])
+
+        lines = [
+            {"service_name": "Virtual Machines", "sku_name": "Missing", "region": "eastus"},
+            {"service_name": "Virtual Machines", "sku_name": "D2s v3", "region": "eastus", "hours_per_month": 10},
+        ]
+        with patch.object(client, "make_request", side_effect=request):
+            result = await pricing_service.estimate_bom(lines, discount_percentage=20)
+
+        assert result["lines"][0]["error"] == "No pricing found for Missing in eastus"
+        assert result["lines"][1]["unit_price"] == 0.4
+        assert result["totals"]["monthly_cost"] == 4.0
+        assert result["discount_applied"]["percentage"] == 20
+        assert "Total:** 4.00 USD/month" in format_bom_estimate_response(result)
+
+    @pytest.mark.asyncio
+    async def test_invalid_numbers_only_fail_their_lines(self, client, pricing_service):
+        """Quantities and usage that are not non-negative numbers are reported on their own lines."""
+        line = {"service_name": "Virtual Machines", "sku_name": "D2s v3", "region": "eastus"}
+        lines = [
+            {**line, "quantity": "two"},
+            {**line, "quantity": None},
+            {**line, "hours_per_month": -1},
+            {**line, "units_per_month": "lots"},
+            {**line, "quantity": "2", "hours_per_month": 10},
+        ]
+        page = _page([_item("D2s v3", price=0.5)])
+        with patch.object(client, "make_request", AsyncMock(return_value=page)):
+            result = await pricing_service.estimate_bom(lines)
+
+        errors = [line_result.get("error") for line_result in result["lines"]]
+        assert errors == [
+            "quantity must be a number, got 'two'",
+            "quantity must be a number, got None",
+            "hours_per_month must be a non-negative number, got -1",
+            "units_per_month must be a number, got 'lots'",
+            None,
+        ]
+        assert result["totals"]["monthly_cost"] == 10.0
+        assert result["totals"]["failed_lines"] == 4
+
+    @pytest.mark.asyncio
+    async def test_too_many_lines(self, pricing_service):
+        """Oversized bills of materials are rejected."""
+        result = await pricing_service.estimate_bom([{}] * (BOM_MAX_LINES + 1))
+        assert "at most" in result["error"]
+
+
+class TestRIPricing:
+    """Tests for the Reserved Instance / On-Demand comparison."""
+
+    @pytest.mark.asyncio
+    async def test_join_across_pages(self, client, pricing_service):
+        """Both price types are read across pages and joined by ARM SKU, region and product."""
+        ri = {"type": "Reservation", "reservationTerm": "1 Year", "productName": "Dv3 Series"}
+        responses = {
+            "Reservation": _page([_item("D2s v3", price=438.0, **ri)], "https://next/ri"),
+            "https://next/ri": _page([_item("D4s v3", price=876.0, **ri), _item("D8s v3", price=1.0, **ri)]),
+            "Consumption": _page(
+                [
+                    _item("D2s v3 Spot", price=0.01, armSkuName="Standard_D2s_v3", productName="Dv3 Series"),
+                    _item("D2s v3", price=0.5, productName="Dv3 Series Windows"),
+                ],
+                "https://next/od",
+            ),
+            "https://next/od": _page(
+                [
+                    _item("D2s v3", price=0.1, productName="Dv3 Series"),
+                    _item("D4s v3", price=0.2, productName="Dv3 Series"),
+                ]
+            ),
+        }
+
+        async def request(url=None, params=None):
+            if url is not None:
+                return responses[url]
+            return responses["Reservation" if "'Reservation'" in params["$filter"] else "Consumption"]
+
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            result = await pricing_service.get_ri_pricing(service_name="Virtual Machines", region="eastus")
+
+        assert mock_request.call_count == 4
+        assert result["count"] == 3
+        assert [(row["sku"], row["od_hourly"]) for row in result["comparison"]] == [("D2s v3", 0.1), ("D4s v3", 0.2)]
+        assert result["comparison"][0]["savings_percentage"] == 50.0
+        assert result["unmatched"] == [
+            {
+                "sku": "D8s v3",
+                "arm_sku_name": "Standard_D8s_v3",
+                "region": "eastus",
+                "product_name": "Dv3 Series",
+                "term": "1 Year",
+                "reason": "No On-Demand meter found",
+            }
+        ]
+        assert result["on_demand_scanned"] == 4
+        assert result["on_demand_complete"] is True
+
+    @pytest.mark.asyncio
+    async def test_on_demand_scan_stops_once_every_reservation_is_matched(self, client, pricing_service):
+        """The On-Demand scan does not read further pages once every reservation has a price."""
+        pages = itertools.count(1)
+
+        async def request(url=None, params=None):
+            if params is not None and "'Reservation'" in params["$filter"]:
+                return _page([_item("D2s v3", price=438.0, type="Reservation", reservationTerm="1 Year")])
+            await asyncio.sleep(0.01)
+            return _page([_item("D2s v3", price=0.1)], f"https://next/od/{next(pages)}")
+
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            result = await pricing_service.get_ri_pricing(service_name="Virtual Machines", region="eastus")
+
+        assert mock_request.call_count == 2
+        assert result["comparison"][0]["od_hourly"] == 0.1
+        assert result["on_demand_complete"] is True
+
+    @pytest.mark.asyncio
+    async def test_on_demand_scan_is_capped(self, client, pricing_service):
+        """Without a match, the On-Demand scan stops at its page cap and reports it."""
+        pages = itertools.count(1)
+
+        async def request(url=None, params=None):
+            if params is not None and "'Reservation'" in params["$filter"]:
+                return _page([_item("D2s v3", price=438.0, type="Reservation", reservationTerm="1 Year")])
+            return _page([_item("D4s v3", price=0.2)], f"https://next/od/{next(pages)}")
+
+        with (
+            patch("azure_pricing_mcp.services.pricing.RI_ON_DEMAND_MAX_PAGES", 3),
+            patch.object(client, "make_request", side_effect=request) as mock_request,
+        ):
+            result = await pricing_service.get_ri_pricing(service_name="Virtual Machines", region="eastus")
+
+        assert mock_request.call_count == 4
+        assert result["on_demand_scanned"] == 3
+        assert result["on_demand_complete"] is False
+        assert result["on_demand_max_pages"] == 3
+        assert "at most 3 pages" in format_ri_pricing_response(result)
+
+    @pytest.mark.asyncio
+    async def test_budget_skips_comparison(self, client, pricing_service):
+        """When the budget only covers the reservation query, RI prices are returned without a comparison."""
+
+        async def request(url=None, params=None):
+            current_budget().charge()
+            if "'Reservation'" in params["$filter"]:
+                return _page([_item("D2s v3", type="Reservation")])
+            await asyncio.sleep(0.01)
+            return _page([_item("D2s v3")])
+
+        with patch.object(client, "make_request", side_effect=request):
+            with request_budget(timeout=5, max_upstream_calls=1):
+                result = await pricing_service.get_ri_pricing(service_name="Virtual Machines")
+
+        assert result["count"] == 1
+        assert "comparison" not in result
+
+    @pytest.mark.asyncio
+    async def test_on_demand_scan_is_finished_when_no_reservations(self, client, pricing_service):
+        """Without reservation prices the On-Demand scan is cancelled and awaited, not left running."""
+        od_cancelled = asyncio.Event()
+
+        async def request(url=None, params=None):
+            if "'Reservation'" in params["$filter"]:
+                await asyncio.sleep(0)
+                return _page([])
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                od_cancelled.set()
+                raise
+            return _page([_item("D2s v3")])
+
+        with patch.object(client, "make_request", side_effect=request):
+            result = await pricing_service.get_ri_pricing(service_name="Virtual Machines")
+
+        assert result["count"] == 0
+        assert od_cancelled.is_set()
+
+
+class TestSpeculativePrefetch:
+    """Tests for warming the cache with likely follow-up queries."""
+
+    @pytest.mark.asyncio
+    async def test_follow_up_tools_are_served_from_cache(self, client):
+        """After prefetching, cost estimate, RI pricing and region recommendation make no upstream calls."""
+        prefetcher = SpeculativePrefetcher()
+        pricing_service = PricingService(client, RetirementService(client), prefetcher)
+
+        async def request(url=None, params=None):
+            return _page([_item("D2s v3", productName="Virtual Machines Dv3 Series")])
+
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            pricing_service.prefetch_follow_ups("Virtual Machines", "D2s v3", "eastus")
+            await asyncio.gather(*prefetcher._tasks)
+            prefetched = mock_request.call_count
+
+            await pricing_service.estimate_costs("Virtual Machines", "D2s v3", "eastus")
+            await pricing_service.get_ri_pricing(service_name="Virtual Machines", sku_name="D2s v3", region="eastus")
+            await pricing_service.recommend_regions("Virtual Machines", "D2s v3")
+
+        assert prefetched == 4
+        assert prefetcher.completed == 4
+        assert mock_request.call_count == prefetched
+
+    @pytest.mark.asyncio
+    async def test_prefetch_uses_its_own_budget(self, client):
+        """Prefetching never charges the tool call that scheduled it."""
+        prefetcher = SpeculativePrefetcher(max_calls=1)
+        pricing_service = PricingService(client, RetirementService(client), prefetcher)
+
+        async def request(url=None, params=None):
+            current_budget().charge()
+            return _page([_item("D2s v3")])
+
+        with patch.object(client, "make_request", side_effect=request) as mock_request:
+            with request_budget(timeout=5, max_upstream_calls=10) as budget:
+                pricing_service.prefetch_follow_ups("Virtual Machines", "D2s v3", "eastus")
+            await asyncio.gather(*prefetcher._tasks)
+
+        assert budget.upstream_calls == 0
+        assert mock_request.call_count == 1  # the second query stops at the prefetch budget
+        assert prefetcher.completed == 1
+
+    @pytest.mark.asyncio
+    async def test_prefetch_waits_for_foreground_requests(self, client):
+        """Speculative queries only start once foreground requests have finished."""
+        busy = True
+        prefetcher = SpeculativePrefetcher(is_busy=lambda: busy)
+        pricing_service = PricingService(client, RetirementService(client), prefetcher)
+
+        with patch.object(client, "make_request", AsyncMock(return_value=_page([]))) as mock_request:
+            pricing_service.prefetch_follow_ups("Virtual Machines", "D2s v3")
+            await asyncio.sleep(0.1)
+            assert mock_request.call_count == 0
+
+            busy = False
+            await asyncio.gather(*prefetcher._tasks)
+
+        assert mock_request.call_count == 1
+
+    def test_disabled_without_prefetcher(self, pricing_service):
+        """Without a prefetcher, prefetch_follow_ups is a no-op."""
+        pricing_service.prefetch_follow_ups("Virtual Machines", "D2s v3", "eastus")
+        assert pricing_service.prefetcher is None
@@ -0,0 +1,194 @@
+"""Unit tests for the Spot VM service."""
+
+import re
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.server import AzurePricingServer
+from azure_pricing_mcp.services import SpotService
+
+
+def _credential_manager() -> MagicMock:
+    """Credential manager that is authenticated and hands out a token."""
+    manager = MagicMock()
+    manager.get_initialization_error.return_value = None
+    manager.is_authenticated.return_value = True
+    manager.get_token.return_value = "token"
+    return manager
+
+
+def _post_returning(session: Any, payload: dict[str, Any]) -> MagicMock:
+    """Patch `session.post` to answer every request with 200 and `payload`."""
+    response = MagicMock(status=200)
+    response.json = AsyncMock(return_value=payload)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    post = MagicMock(return_value=context)
+    session.post = post
+    return post
+
+
+class TestSpotSession:
+    """Tests for the pooled HTTP session."""
+
+    @pytest.mark.asyncio
+    async def test_queries_share_the_pooled_session(self):
+        """Queries reuse the session opened with the service instead of creating their own."""
+        async with SpotService(_credential_manager()) as spot:
+            session = spot.session
+            assert session is not None
+            post = _post_returning(session, {"data": []})
+
+            with patch("azure_pricing_mcp.services.spot.aiohttp.ClientSession") as session_class:
+                await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"])
+                await spot.get_price_history("Standard_D2s_v4", "eastus")
+
+            session_class.assert_not_called()
+            assert post.call_count == 2
+
+        assert spot.session is None
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_connector_limits_from_config(self):
+        """The connector uses the configured connection limit."""
+        with patch("azure_pricing_mcp.services.spot.SPOT_CONNECTION_LIMIT", 3):
+            async with SpotService(_credential_manager()) as spot:
+                assert spot.session.connector.limit == 3
+
+    @pytest.mark.asyncio
+    async def test_one_off_session_when_not_opened(self):
+        """A service used without `async with` still works with a session per request."""
+        spot = SpotService(_credential_manager())
+        session = MagicMock()
+        post = _post_returning(
+            session, {"data": [{"skuName": "Standard_D2s_v4", "location": "eastus", "evictionRate": "0-5"}]}
+        )
+        session_class = MagicMock()
+        session_class.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_class.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("azure_pricing_mcp.services.spot.aiohttp.ClientSession", session_class):
+            result = await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"])
+
+        assert result["count"] == 1
+        post.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_managed_by_server_lifecycle(self):
+        """The server opens the Spot session with its own and hands the service to the handlers."""
+        with patch("azure_pricing_mcp.server.RetirementService.start", AsyncMock()):
+            async with AzurePricingServer() as server:
+                spot = server.tool_handlers._spot_service
+                assert spot.session is not None and not spot.session.closed
+
+        assert spot.session is None
+
+
+def _fake_resource_graph(absent: set[tuple[str, str]] | None = None) -> AsyncMock:
+    """Resource Graph stub answering eviction rate queries for every requested pair except `absent`."""
+
+    async def execute(query: str) -> dict[str, Any]:
+        skus, locations = (re.findall(r"'([^']+)'", values) for values in re.findall(r"in~ \(([^)]*)\)", query))
+        return {
+            "data": [
+                {"skuName": sku.title(), "location": location, "evictionRate": "0-5"}
+                for sku in skus
+                for location in locations
+                if (sku, location) not in (absent or set())
+            ]
+        }
+
+    return AsyncMock(side_effect=execute)
+
+
+def _queried_pairs(execute: AsyncMock) -> set[tuple[str, str]]:
+    """Every (sku, location) pair covered by the queries made so far."""
+    pairs = set()
+    for call in execute.call_args_list:
+        skus, locations = (re.findall(r"'([^']+)'", values) for values in re.findall(r"in~ \(([^)]*)\)", call.args[0]))
+        pairs.update((sku, location) for sku in skus for location in locations)
+    return pairs
+
+
+class TestSpotCaches:
+    """Tests for the eviction rate and price history caches."""
+
+    @pytest.mark.asyncio
+    async def test_overlapping_requests_query_only_missing_pairs(self):
+        """Cached pairs are served locally; the rest are queried in groups sharing their SKUs."""
+        spot = SpotService(_credential_manager())
+        spot._execute_resource_graph_query = _fake_resource_graph()
+
+        await spot.get_eviction_rates(["Standard_D2s_v4", "Standard_D4s_v4"], ["eastus"])
+        spot._execute_resource_graph_query.reset_mock()
+        result = await spot.get_eviction_rates(
+            ["standard_d2s_v4", "Standard_D4s_v4", "Standard_D8s_v4"], ["EastUS", "westus2"]
+        )
+
+        assert _queried_pairs(spot._execute_resource_graph_query) == {
+            ("standard_d8s_v4", "eastus"),
+            ("standard_d2s_v4", "westus2"),
+            ("standard_d4s_v4", "westus2"),
+            ("standard_d8s_v4", "westus2"),
+        }
+        assert spot._execute_resource_graph_query.call_count == 2
+        assert result["count"] == 6
+        assert result["cached_pairs"] == 2
+        assert [(row["location"], row["skuName"]) for row in result["eviction_rates"]][:2] == [
+            ("eastus", "Standard_D2S_V4"),
+            ("eastus", "Standard_D4S_V4"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_pairs_without_data_are_cached(self):
+        """A pair Resource Graph has no rate for is not queried again."""
+        spot = SpotService(_credential_manager())
+        spot._execute_resource_graph_query = _fake_resource_graph(absent={("standard_m8ms", "eastus")})
+
+        first = await spot.get_eviction_rates(["Standard_M8ms"], ["eastus"])
+        second = await spot.get_eviction_rates(["Standard_M8ms"], ["eastus"])
+
+        assert first["count"] == second["count"] == 0
+        spot._execute_resource_graph_query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """A failed query is retried by the next request."""
+        spot = SpotService(_credential_manager())
+        spot._execute_resource_graph_query = AsyncMock(return_value={"error": "network_error", "message": "down"})
+
+        assert (await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"]))["error"] == "network_error"
+        spot._execute_resource_graph_query = _fake_resource_graph()
+        assert (await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"]))["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_price_history_cached_per_sku_location_and_os(self):
+        """Price history is cached per (sku, location, os_type), ignoring case."""
+        spot = SpotService(_credential_manager())
+        record = {"skuName": "Standard_D2s_v4", "location": "eastus", "osType": "Linux", "spotPrices": []}
+        spot._execute_resource_graph_query = AsyncMock(return_value={"data": [record]})
+
+        first = await spot.get_price_history("Standard_D2s_v4", "eastus")
+        first["sku"] = "changed by caller"
+        second = await spot.get_price_history("standard_d2s_v4", "EastUS", "Linux")
+        await spot.get_price_history("Standard_D2s_v4", "eastus", "windows")
+
+        assert second["sku"] == "Standard_D2s_v4"
+        assert spot._execute_resource_graph_query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self):
+        """Cached data is queried again after SPOT_CACHE_TTL."""
+        with patch("azure_pricing_mcp.services.spot.SPOT_CACHE_TTL", timedelta(0)):
+            spot = SpotService(_credential_manager())
+        spot._execute_resource_graph_query = _fake_resource_graph()
+
+        await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"])
+        await spot.get_eviction_rates(["Standard_D2s_v4"], ["eastus"])
+
+        assert spot._execute_resource_graph_query.call_count == 2